@@ -0,0 +1,59 @@
+# benchmarks/bench_candles.py
+"""Candlestick + volume render time vs. number of candles.
+
+"batched" is CandleTemplate drawing every candle (wicks, bodies and volume
+bars as three collections); "merged" is the default, which first merges
+neighbouring candles down to what the chart's width can show.
+
+Run from the repo root:
+    python -m benchmarks.bench_candles [--sizes 100,1000,10000,100000] [--renders 3]
+"""
+import argparse
+import time
+import numpy as np
+from charts import renderers
+
+
+def sample_candles(size: int) -> dict:
+    rng = np.random.default_rng(size)
+    closes = np.exp(np.cumsum(rng.normal(0, 0.01, size)))
+    opens = np.r_[closes[0], closes[:-1]]
+    return {
+        "times": np.arange(size, dtype=np.int64) * 3600 + 1_700_000_000,
+        "opens": opens,
+        "highs": np.maximum(opens, closes) * (1 + rng.random(size) * 0.01),
+        "lows": np.minimum(opens, closes) * (1 - rng.random(size) * 0.01),
+        "closes": closes,
+        "volumes": rng.random(size) * 1e6,
+        "title": "BENCH",
+    }
+
+
+def bench(fn, renders):
+    fn()
+    start = time.perf_counter()
+    for _ in range(renders):
+        fn()
+    return (time.perf_counter() - start) / renders * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="100,1000,10000,100000")
+    parser.add_argument("--renders", type=int, default=3)
+    args = parser.parse_args()
+
+    template = renderers.CandleTemplate(with_volume=True)
+    max_candles = template.max_candles
+    print(f"{'candles':>10}{'batched ms':>12}{'merged ms':>12}")
+    for size in map(int, args.sizes.split(",")):
+        payload = sample_candles(size)
+        template.max_candles = size
+        batched = bench(lambda: template.render(**payload), args.renders)
+        template.max_candles = max_candles
+        merged = bench(lambda: template.render(**payload), args.renders)
+        print(f"{size:>10}{batched:>12.1f}{merged:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# benchmarks/bench_chart_downsample.py
+"""Comparison chart render time vs. series length, with and without LTTB downsampling.
+
+"all points" converts every timestamp to a datetime and plots the whole
+series (what the old price chart did); "lttb" is the current comparison
+renderer, which reduces each series to the chart's pixel width first.
+
+Run from the repo root:
+    python -m benchmarks.bench_chart_downsample [--sizes 100,1000,10000,100000,1000000] [--renders 3]
+"""
+import argparse
+import time
+from datetime import datetime, UTC
+import numpy as np
+from charts import renderers
+from charts.downsample import lttb
+
+
+def all_points_render(template, times, changes) -> bytes:
+    dates = [datetime.fromtimestamp(int(t), tz=UTC) for t in times]
+    template.lines[0].set_data(dates, changes)
+    template.ax.set_xlim(dates[0], dates[-1])
+    return renderers._print_png(template.canvas)
+
+
+def sample_series(size: int):
+    rng = np.random.default_rng(size)
+    end = int(time.time())
+    times = np.arange(end - size * 60, end, 60, dtype=np.int64)
+    changes = (np.exp(np.cumsum(rng.normal(0, 0.002, size))) - 1) * 100
+    return times, changes
+
+
+def bench(fn, renders):
+    fn()
+    start = time.perf_counter()
+    for _ in range(renders):
+        fn()
+    return (time.perf_counter() - start) / renders * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="100,1000,10000,100000,1000000")
+    parser.add_argument("--renders", type=int, default=3)
+    args = parser.parse_args()
+
+    template = renderers.ComparisonTemplate()
+    print(f"{'points':>10}{'all points ms':>16}{'lttb ms':>10}{'of which lttb':>15}{'speedup':>10}")
+    for size in map(int, args.sizes.split(",")):
+        times, changes = sample_series(size)
+        new = bench(lambda: template.render(times, [changes], ["bench"]), args.renders)
+        old = bench(lambda: all_points_render(template, times, changes), args.renders)
+        downsample = bench(lambda: lttb(times, changes, template.max_points), args.renders)
+        print(f"{size:>10}{old:>16.1f}{new:>10.1f}{downsample:>15.2f}{old / new:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# benchmarks/bench_chart_templates.py
+"""Per-render time: reusable Figure templates vs. the old pyplot-per-call code.
+
+Run from the repo root:
+    python -m benchmarks.bench_chart_templates [--renders 50]
+"""
+import argparse
+import time
+from io import BytesIO
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+from charts import renderers
+
+
+def legacy_holders_chart(labels, balances, percentages, title, height=8, label_fontsize=7) -> bytes:
+    fig, ax1 = plt.subplots(figsize=(10, height))
+    ax1.bar(labels, balances, color="skyblue", alpha=0.6, label="Amount Held")
+    ax1.set_xlabel("Holder")
+    ax1.set_ylabel("Amount Held", color="skyblue")
+    ax1.tick_params(axis="y", labelcolor="skyblue")
+    ax1.set_xticks(range(len(labels)))
+    ax1.set_xticklabels(labels, rotation=90, ha="center", fontsize=label_fontsize)
+    ax2 = ax1.twinx()
+    ax2.plot(labels, percentages, color="orange", marker="o", label="% Supply Held")
+    ax2.set_ylabel("% Supply Held", color="orange")
+    ax2.tick_params(axis="y", labelcolor="orange")
+    plt.title(title)
+    lines1, labels1 = ax1.get_legend_handles_labels()
+    lines2, labels2 = ax2.get_legend_handles_labels()
+    ax1.legend(lines1 + lines2, labels1 + labels2, loc="upper right")
+    plt.tight_layout()
+    buf = BytesIO()
+    plt.savefig(buf, format="png", bbox_inches="tight")
+    plt.close()
+    return buf.getvalue()
+
+
+def legacy_distribution_chart(labels, values) -> bytes:
+    plt.figure(figsize=(10, 5))
+    plt.barh(labels, values, color='purple')
+    plt.xlabel('Number of NFTs')
+    plt.title('Top 10 NFT Holders')
+    plt.gca().invert_yaxis()
+    buf = BytesIO()
+    plt.savefig(buf, format='png', bbox_inches='tight')
+    plt.close()
+    return buf.getvalue()
+
+
+def sample_payloads():
+    holders = [
+        {"balance": 1_000_000 / (i + 1), "percentageOfSupplyHeld": 10 / (i + 1),
+         "ownerAddress": f"{i:04d}" + "x" * 36, "ownerName": "Exchange" if i % 4 == 0 else None}
+        for i in range(25)
+    ]
+    return {
+        "holders": renderers.holders_payload(holders, "Top 25 Holders of BENCH"),
+        "distribution": renderers.bar_payload([f"ab{i}..{i}" for i in range(10)], range(10, 0, -1)),
+    }
+
+
+def bench(fn, payload, renders):
+    fn(**payload)  # warm: fonts, template construction
+    start = time.perf_counter()
+    for _ in range(renders):
+        fn(**payload)
+    return (time.perf_counter() - start) / renders * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--renders", type=int, default=50)
+    args = parser.parse_args()
+
+    pairs = {
+        "holders": (legacy_holders_chart, renderers.render_holders_chart),
+        "distribution": (legacy_distribution_chart, renderers.render_distribution_chart),
+    }
+    payloads = sample_payloads()
+    print(f"{'chart':<14}{'pyplot ms':>12}{'template ms':>14}{'speedup':>10}")
+    for kind, (legacy, template) in pairs.items():
+        old = bench(legacy, payloads[kind], args.renders)
+        new = bench(template, payloads[kind], args.renders)
+        print(f"{kind:<14}{old:>12.1f}{new:>14.1f}{old / new:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
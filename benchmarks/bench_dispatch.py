@@ -0,0 +1,141 @@
+# benchmarks/bench_dispatch.py
+"""Updates/sec through PTB handler dispatch: per-pattern handlers vs. handlers/router.py.
+
+Both setups register the same commands, callback patterns and flow input
+patterns with no-op callbacks, so only dispatch cost is measured. Also
+reports how many messages reached the handler of the user's actual flow.
+
+Run from the repo root:
+    python -m benchmarks.bench_dispatch [--updates 20000]
+"""
+import argparse
+import asyncio
+import random
+import time
+from collections import Counter
+from telegram import Update
+from telegram.ext import (Application, ApplicationHandlerStop, CallbackContext, CallbackQueryHandler,
+                          CommandHandler, MessageHandler, filters)
+from handlers.state import USER_STATE
+from handlers import router
+
+MINT = "JBu1AL4obBcCMqKBBxhpWCNUt136ijcuMZLFvTP7iWdB"
+COMMANDS = ["addfavoriteaccount", "favoriteaccounts", "addfavoritetoken", "favoritetokens",
+            "refreshfavorites", "start", "help", "commands", "balance", "whalealert", "prices",
+            "tokenDetails", "topholders", "chart", "nft_analysis", "tutorial", "stats"]
+# Old bot.py order; "_"/":" suffix = prefix pattern, else exact.
+LEGACY_CALLBACKS = ["fav_acct:", "fav_token:", "acc_balance:", "tok_details:", "tok_holders:",
+                    "back_fav_acct", "back_fav_tok", "fav_refresh",
+                    "menu_accounts", "menu_prices", "menu_chart", "menu_holders", "menu_nft",
+                    "menu_pyth", "menu_tutorial", "menu_whale", "menu_fav_acct", "menu_fav_tok",
+                    "main_menu", "tutorial_", "menu_whale",
+                    "menu_chart", "chart_", "cancel_operation", "menu_pyth", "pyth_", "cancel_operation",
+                    "acct_", "cancel_operation", "menu_prices", "prices_", "cancel_operation",
+                    "menu_holders", "holders_", "cancel_operation", "menu_nft", "cancel_operation",
+                    "tutorial_", "whale_"]
+FLOW_TEXT = {"chart": MINT, "pyth": MINT, "accounts": MINT, "prices": "3",
+             "holders": f"{MINT} 10", "nft": MINT, "whale": "5000"}
+
+hits = Counter()
+
+
+def noop(tag):
+    async def callback(update, context):
+        hits[tag] += 1
+    return callback
+
+
+def legacy_handlers():
+    handlers = [CommandHandler(name, noop("command")) for name in COMMANDS]
+    for key in LEGACY_CALLBACKS:
+        pattern = f"^{key}" if key[-1] in "_:" else f"^{key}$"
+        handlers.append(CallbackQueryHandler(noop("callback"), pattern=pattern))
+    for flow, module in router.FLOWS:
+        pattern, _ = module.text_route
+        text_filter = filters.TEXT & ~filters.COMMAND
+        if flow != "whale":
+            text_filter = text_filter & filters.Regex(pattern)
+        handlers.append(MessageHandler(text_filter, noop(f"text:{flow}")))
+    return handlers
+
+
+def routed_handlers():
+    callbacks = router.CallbackRouter()
+    for key in LEGACY_CALLBACKS:
+        callbacks.add(key, noop("callback"))
+    text = router.TextRouter()
+    for flow, module in router.FLOWS:
+        text.add(flow, module.text_route[0], noop(f"text:{flow}"))
+    return [CommandHandler(name, noop("command")) for name in COMMANDS] + [
+        CallbackQueryHandler(callbacks.dispatch),
+        MessageHandler(filters.TEXT & ~filters.COMMAND, text.dispatch),
+    ]
+
+
+def make_updates(bot, count: int, rng) -> list:
+    flows = list(FLOW_TEXT)
+    callback_data = ["chart_7d", "pyth_price", "menu_chart", "main_menu", "cancel_operation",
+                     f"fav_acct:{MINT}", "whale_default", "tutorial_next"]
+    updates = []
+    for i in range(count):
+        uid = 1000 + i % 500
+        user = {"id": uid, "is_bot": False, "first_name": "u"}
+        chat = {"id": uid, "type": "private"}
+        if i % 2:
+            data = {"update_id": i, "message": {"message_id": i, "date": 0, "chat": chat, "from": user,
+                                                "text": FLOW_TEXT[flows[uid % len(flows)]]}}
+        else:
+            data = {"update_id": i, "callback_query": {"id": str(i), "from": user, "chat_instance": "x",
+                                                       "data": rng.choice(callback_data)}}
+        updates.append(Update.de_json(data, bot))
+    return updates
+
+
+async def process_update(app, update):
+    """Application.process_update's handler loop, minus the initialize() network check."""
+    context = None
+    for handlers in app.handlers.values():
+        try:
+            for handler in handlers:
+                check = handler.check_update(update)
+                if check is not None and check is not False:
+                    context = context or CallbackContext.from_update(update, app)
+                    await handler.handle_update(update, app, check, context)
+                    break
+        except ApplicationHandlerStop:
+            break
+
+
+async def run(handlers, updates) -> float:
+    app = Application.builder().token("123:abc").build()
+    app.add_handlers(handlers)
+    hits.clear()
+    start = time.perf_counter()
+    for update in updates:
+        await process_update(app, update)
+    return len(updates) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--updates", type=int, default=20000)
+    args = parser.parse_args()
+    flows = list(FLOW_TEXT)
+    for uid in range(1000, 1500):
+        USER_STATE[uid] = {"flow": flows[uid % len(flows)], "step": "input"}
+    bot = Application.builder().token("123:abc").build().bot
+    updates = make_updates(bot, args.updates, random.Random(0))
+    # Each text message should reach exactly the handler of its sender's flow.
+    expected = Counter(flows[u.effective_user.id % len(flows)] for u in updates if u.message)
+
+    rates = {}
+    for name, factory in (("per-pattern", legacy_handlers), ("router", routed_handlers)):
+        rates[name] = asyncio.run(run(factory(), updates))
+        correct = sum(min(hits[f"text:{flow}"], count) for flow, count in expected.items())
+        print(f"{name:<12}{rates[name]:>10.0f} updates/s   "
+              f"text reaching the user's flow: {correct}/{sum(expected.values())}")
+    print(f"speedup: {rates['router'] / rates['per-pattern']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
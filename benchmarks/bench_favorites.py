@@ -0,0 +1,110 @@
+# benchmarks/bench_favorites.py
+"""Favorites lookups/adds: whole-file JSON store vs. the SQLite (WAL) store.
+
+Run from the repo root:
+    python -m benchmarks.bench_favorites [--users 100000] [--ops 200]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from favorites_handlers import db
+
+
+def legacy_get(path, user_id):
+    with open(path, 'r') as f:
+        data = json.load(f)
+    return data.get(str(user_id), {"accounts": [], "tokens": []})
+
+
+def legacy_add(path, user_id, category, address):
+    with open(path, 'r') as f:
+        data = json.load(f)
+    favs = data.setdefault(str(user_id), {"accounts": [], "tokens": []})
+    if address not in favs[category]:
+        favs[category].append(address)
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2)
+    return favs[category]
+
+
+def make_dataset(users: int, per_category: int = 3) -> dict:
+    rng = random.Random(0)
+    alphabet = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+    addr = lambda: "".join(rng.choice(alphabet) for _ in range(44))
+    return {
+        str(uid): {"accounts": [addr() for _ in range(per_category)],
+                   "tokens": [addr() for _ in range(per_category)]}
+        for uid in range(1, users + 1)
+    }
+
+
+def ms_per_op(func, ops: int) -> float:
+    start = time.perf_counter()
+    for _ in range(ops):
+        func()
+    return (time.perf_counter() - start) * 1000 / ops
+
+
+async def bench_sqlite(users: int, ops: int, rng) -> tuple:
+    lookups = [rng.randint(1, users) for _ in range(ops)]
+    start = time.perf_counter()
+    for uid in lookups:
+        await db.get_user_favorites(uid)
+    get_ms = (time.perf_counter() - start) * 1000 / ops
+    start = time.perf_counter()
+    for i, uid in enumerate(lookups):
+        await db.add_favorite(uid, "tokens", f"bench-mint-{i}")
+    add_ms = (time.perf_counter() - start) * 1000 / ops
+    # Concurrent adds from many users: none may be lost.
+    await asyncio.gather(*(db.add_favorite(uid, "accounts", "bench-concurrent") for uid in range(1, ops + 1)))
+    added = sum(["bench-concurrent" in (await db.get_user_favorites(uid))["accounts"] for uid in range(1, ops + 1)])
+    return get_ms, add_ms, added
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--ops", type=int, default=200)
+    args = parser.parse_args()
+    rng = random.Random(1)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = os.path.join(tmp, "favorites.json")
+        with open(json_path, "w") as f:
+            json.dump(make_dataset(args.users), f, indent=2)
+        print(f"{args.users} users, favorites.json = {os.path.getsize(json_path) / 1e6:.1f} MB")
+
+        # The legacy store is slow enough that a handful of ops is representative.
+        legacy_ops = min(args.ops, 10)
+        json_get = ms_per_op(lambda: legacy_get(json_path, rng.randint(1, args.users)), legacy_ops)
+        json_add = ms_per_op(lambda: legacy_add(json_path, rng.randint(1, args.users), "tokens", str(rng.random())), legacy_ops)
+
+        db._db_path = os.path.join(tmp, "favorites.db")
+        start = time.perf_counter()
+        conn = sqlite3.connect(db._db_path)
+        conn.executescript(db.SCHEMA)
+        db._migrate_json(conn, json_path)
+        conn.close()
+        migrate_s = time.perf_counter() - start
+
+        async def run():
+            try:
+                return await bench_sqlite(args.users, args.ops, rng)
+            finally:
+                await db.close_db()
+        sqlite_get, sqlite_add, added = asyncio.run(run())
+
+    print(f"migration: {migrate_s:.2f} s")
+    print(f"{'op':<8}{'json ms':>10}{'sqlite ms':>12}{'speedup':>10}")
+    print(f"{'get':<8}{json_get:>10.2f}{sqlite_get:>12.3f}{json_get / sqlite_get:>9.0f}x")
+    print(f"{'add':<8}{json_add:>10.2f}{sqlite_add:>12.3f}{json_add / sqlite_add:>9.0f}x")
+    print(f"concurrent adds kept: {added}/{args.ops}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,66 +1,94 @@
 from telegram import InlineKeyboardMarkup, Update, InlineKeyboardButton
 from telegram.ext import Application, CommandHandler, MessageHandler, CallbackQueryHandler, filters, ContextTypes
-from config import TELEGRAM_TOKEN
+from config import TELEGRAM_TOKEN, LOOP_BLOCK_THRESHOLD_MS, LOOP_BLOCK_FAIL_FAST
+from services.vybe_client import start_client, close_client
+from services.browser_pool import start_pool, close_pool
+from services.chart_renderer import start_renderer, close_renderer
+from favorites_handlers.db import start_db, close_db
+from services.whale_feed import start_whale_feed, close_whale_feed
+from services.whale_push import start_whale_push
+from services.token_catalog import start_token_catalog, close_token_catalog
+from services.ohlcv_store import close_ohlcv_store
+from services import loop_guard
+from services import server
+from services.update_processor import update_processor
 from slashcommands.slashmain import (
-    handle_typos,
     get_balance,
     whale_alert,
     check_prices,
     token_details,
     top_token_holders,
     chart,
+    pyth_prices,
     nft_analysis,
-    tutorial_start,
-    tutorial_callback
+    tutorial_start
 )
-from handlers.state import USER_STATE  # Import global USER_STATE
+from handlers.state import USER_STATE, CANCEL_BUTTON
 import handlers.start as start_h
-import handlers.accounts as acct_h
-import handlers.prices as prices_h
-import handlers.chart as chart_h
-import handlers.holders as holders_h
-import handlers.nft_analysis as nft_h
-import handlers.pyth as pyth_h
-import handlers.tutorial as tut_h
-import handlers.whale_alert as whale_h
+import handlers.admin as admin_h
+import handlers.whale_subscriptions as whale_sub_h
+import handlers.router as router
 import logging
 
 # logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 # logger = logging.getLogger(__name__)
 
-app = Application.builder().token(TELEGRAM_TOKEN).build()
+async def post_init(application: Application):
+    """Open shared resources once the Application is initialized."""
+    loop_guard.install_guard(LOOP_BLOCK_THRESHOLD_MS, LOOP_BLOCK_FAIL_FAST)
+    # Fork chart workers before Chromium starts so they don't inherit its pipes.
+    await start_renderer(application)
+    await start_client(application)
+    await start_pool(application)
+    await start_db(application)
+    await start_whale_push(application)
+    await start_whale_feed(application)
+    await start_token_catalog(application)
+
+async def post_shutdown(application: Application):
+    """Release shared resources on shutdown."""
+    await close_token_catalog(application)
+    await close_whale_feed(application)
+    await close_pool(application)
+    await close_client(application)
+    await close_renderer(application)
+    await close_db(application)
+    await close_ohlcv_store(application)
+    if loop_guard.guard:
+        loop_guard.guard.uninstall()
+        loop_guard.guard.check()
+
+app = (
+    Application.builder()
+    .token(TELEGRAM_TOKEN)
+    .concurrent_updates(update_processor)
+    .post_init(post_init)
+    .post_shutdown(post_shutdown)
+    .build()
+)
 from favorites_handlers.add_favorite_account import add_favorite_account
 from favorites_handlers.favorite_accounts import favorite_accounts
 from favorites_handlers.add_favorite_token import add_favorite_token
 from favorites_handlers.favorite_tokens import favorite_tokens
-from favorites_handlers.callbacks import (
-    favorites_callback,
-    account_balance_cb,
-    token_details_cb,
-    token_holders_cb,
-    back_to_fav_accounts,
-    back_to_fav_tokens
-)
+from favorites_handlers.dashboard import favorites_dashboard
 
 app.add_handler(CommandHandler("addfavoriteaccount", add_favorite_account))
 app.add_handler(CommandHandler("favoriteaccounts", favorite_accounts))
 app.add_handler(CommandHandler("addfavoritetoken", add_favorite_token))
 app.add_handler(CommandHandler("favoritetokens", favorite_tokens))
-app.add_handler(CallbackQueryHandler(favorites_callback, pattern="^fav_(acct|token):"))
-app.add_handler(CallbackQueryHandler(account_balance_cb, pattern="^acc_balance:"))
-app.add_handler(CallbackQueryHandler(token_details_cb, pattern="^tok_details:"))
-app.add_handler(CallbackQueryHandler(token_holders_cb, pattern="^tok_holders:"))
-app.add_handler(CallbackQueryHandler(back_to_fav_accounts, pattern="^back_fav_acct$"))
-app.add_handler(CallbackQueryHandler(back_to_fav_tokens, pattern="^back_fav_tok$"))
+app.add_handler(CommandHandler("refreshfavorites", favorites_dashboard))
 
-# Modified handle_typos to skip chart flow
+# Fallback for text no flow claimed: handlers/router.py hands flow input to
+# the flow's handler and stops propagation, so anything reaching this group
+# wasn't valid input for the user's current step (or there's no flow).
 async def handle_typos(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    uid = update.effective_user.id
-    state = USER_STATE.get(uid, {})
-    if state.get("flow") == "chart":
-        # logger.info(f"handle_typos: Skipped for user {uid} in chart flow, state: {state}")
+    state = USER_STATE.get(update.effective_user.id)
+    if state is not None:
+        await update.message.reply_text(
+            "🤔 That isn't what this step expects. Check the format above and try again, or cancel.",
+            reply_markup=InlineKeyboardMarkup(CANCEL_BUTTON),
+        )
         return
-    # logger.info(f"handle_typos: User {uid}, input: '{update.message.text}'")
     keyboard =  [InlineKeyboardButton("ALPHAVYBE", url="https://vybe.fyi/")]
     await update.message.reply_text(
         "🤖Try these:\n"
@@ -81,29 +109,16 @@ app.add_handlers([
     CommandHandler("tokenDetails", token_details),
     CommandHandler("topholders", top_token_holders),
     CommandHandler("chart", chart),
+    CommandHandler("pyth", pyth_prices),
     CommandHandler("nft_analysis", nft_analysis),
-    CommandHandler("tutorial", tutorial_start)
+    CommandHandler("tutorial", tutorial_start),
+    *whale_sub_h.handlers,
+    *admin_h.handlers
 ])
 
-app.add_handlers([
-    *start_h.menu_handlers,
-    CallbackQueryHandler(tutorial_callback, pattern="^tutorial_"),
-    CallbackQueryHandler(whale_h.start_whale, pattern="^menu_whale$")
-])
-
-all_flow_handlers = [
-    *chart_h.handlers,
-    *pyth_h.handlers,
-    *acct_h.handlers,
-    *prices_h.handlers,
-    *holders_h.handlers,
-    *nft_h.handlers,
-    *tut_h.handlers,
-    *whale_h.handlers
-]
-
-for handler in all_flow_handlers:
-    app.add_handler(handler, group=0)
+# Callback queries and in-flow text input go through one router each
+# (see handlers/router.py) instead of one handler per pattern.
+app.add_handlers(router.handlers, group=0)
 
 app.add_handler(
     MessageHandler(
@@ -114,4 +129,4 @@ app.add_handler(
 )
 
 if __name__ == "__main__":
-    app.run_polling()
\ No newline at end of file
+    server.run(app)
\ No newline at end of file
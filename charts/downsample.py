@@ -0,0 +1,110 @@
+# charts/downsample.py
+"""Vectorized time-series helpers for the chart renderers.
+
+A 10-inch, 100-dpi chart is 1000 pixels wide, so plotting more points than
+that only costs time. lttb() reduces a series to a target number of points
+with Largest-Triangle-Three-Buckets, which keeps the visual shape (peaks and
+dips survive, unlike with stride sampling), without a Python-level loop.
+"""
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+import matplotlib.dates as mdates
+
+# Matplotlib date number of the Unix epoch (0.0 with matplotlib's default epoch).
+_UNIX_EPOCH = mdates.date2num(np.datetime64(0, 's'))
+# Points per block of buckets scored at once; keeps temporaries in cache.
+BLOCK_POINTS = 1 << 15
+
+
+def epoch_to_datenum(times) -> np.ndarray:
+    """Unix seconds -> matplotlib date numbers, in one array operation."""
+    return np.asarray(times, dtype=np.float64) / 86400.0 + _UNIX_EPOCH
+
+
+def _triangle_picks(x, y, starts, counts, ax, ay, cx, cy) -> np.ndarray:
+    """Index of the point in each bucket forming the largest triangle with (a, c)."""
+    width = int(counts.max())
+    windows_x = sliding_window_view(x, width)
+    windows_y = sliding_window_view(y, width)
+    # Twice the triangle area is |p*y + q*x + r| with per-bucket p, q, r.
+    p = ax - cx
+    q = cy - ay
+    r = -(p * ay + q * ax)
+    picks = np.empty(len(starts), dtype=np.int64)
+    # Rows are processed in cache-sized blocks; one row per bucket, with a
+    # short row's extra column (the next bucket's first point) masked out.
+    rows = max(1, BLOCK_POINTS // width)
+    for lo in range(0, len(starts), rows):
+        hi = lo + rows
+        area = windows_y[starts[lo:hi]] * p[lo:hi, None]
+        area += windows_x[starts[lo:hi]] * q[lo:hi, None]
+        area += r[lo:hi, None]
+        np.abs(area, out=area)
+        area[np.arange(width) >= counts[lo:hi, None]] = -1.0
+        picks[lo:hi] = area.argmax(axis=1)
+    return starts + picks
+
+
+def lttb(x, y, n_out: int):
+    """Downsample (x, y) to at most n_out points with Largest-Triangle-Three-Buckets.
+
+    Points that aren't finite are dropped first; the first and last points
+    are always kept. Classic LTTB anchors each bucket's triangle on the
+    point picked in the previous bucket, which is inherently sequential.
+    Here a first pass anchors on the previous bucket's mean and a second
+    pass re-picks every bucket against the first pass's choices, so each
+    pass scores whole blocks of buckets with array operations.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    finite = np.isfinite(x) & np.isfinite(y)
+    if not finite.all():
+        x, y = x[finite], y[finite]
+    n = len(x)
+    if n <= n_out or n_out < 3:
+        return x, y
+
+    # n_out - 2 buckets over the interior points 1 .. n-2.
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    starts = edges[:-1]
+    counts = np.diff(edges)
+    mean_x = np.add.reduceat(x[:n - 1], starts) / counts
+    mean_y = np.add.reduceat(y[:n - 1], starts) / counts
+    # Third vertex: the next bucket's mean, or the last point.
+    cx = np.append(mean_x[1:], x[-1])
+    cy = np.append(mean_y[1:], y[-1])
+
+    ax = np.insert(mean_x[:-1], 0, x[0])
+    ay = np.insert(mean_y[:-1], 0, y[0])
+    picks = _triangle_picks(x, y, starts, counts, ax, ay, cx, cy)
+    ax = np.insert(x[picks[:-1]], 0, x[0])
+    ay = np.insert(y[picks[:-1]], 0, y[0])
+    picks = _triangle_picks(x, y, starts, counts, ax, ay, cx, cy)
+
+    keep = np.concatenate(([0], picks, [n - 1]))
+    return x[keep], y[keep]
+
+
+def aggregate_ohlc(times, opens, highs, lows, closes, volumes, n_out: int):
+    """Merge runs of consecutive candles so at most n_out remain.
+
+    Each merged candle keeps the first time and open, the highest high,
+    the lowest low, the last close and the summed volume. volumes may be
+    None. Returns float64/int64 arrays (or None for volumes).
+    """
+    times = np.asarray(times, dtype=np.int64)
+    opens, highs, lows, closes = (np.asarray(a, dtype=np.float64) for a in (opens, highs, lows, closes))
+    volumes = None if volumes is None else np.nan_to_num(np.asarray(volumes, dtype=np.float64))
+    n = len(times)
+    if n <= n_out or n_out < 1:
+        return times, opens, highs, lows, closes, volumes
+    edges = np.linspace(0, n, n_out + 1).astype(np.int64)
+    starts, lasts = edges[:-1], edges[1:] - 1
+    return (
+        times[starts],
+        opens[starts],
+        np.maximum.reduceat(highs, starts),
+        np.minimum.reduceat(lows, starts),
+        closes[lasts],
+        None if volumes is None else np.add.reduceat(volumes, starts),
+    )
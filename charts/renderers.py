@@ -0,0 +1,419 @@
+# charts/renderers.py
+"""Chart renderers executed inside the chart worker processes.
+
+Every renderer takes compact, picklable inputs (arrays and short lists of
+primitives) and returns PNG bytes, so nothing but numbers crosses the
+process boundary. Renderers use the object-oriented Figure/FigureCanvasAgg
+API: each chart type has a template whose figure, axes, styling and layout
+are built once per worker; a render only updates the data artists.
+Time series are downsampled to the chart's pixel width before plotting;
+candlesticks are drawn as a few batched collections, not an artist per candle.
+"""
+from array import array
+from io import BytesIO
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import LineCollection, PolyCollection
+from matplotlib.colors import to_rgba
+from matplotlib.lines import Line2D
+from matplotlib.ticker import EngFormatter, PercentFormatter
+from matplotlib.patches import Patch
+import matplotlib.dates as mdates
+from charts.downsample import lttb, aggregate_ohlc, epoch_to_datenum
+
+
+def _print_png(canvas) -> bytes:
+    buf = BytesIO()
+    canvas.print_png(buf)
+    return buf.getvalue()
+
+
+# Payload builders (run in the bot process)
+
+def candle_payload(columns: dict, title: str = "Token Price (OHLC)") -> dict:
+    """Candlestick payload for OHLCVStore.query() columns, with USD volume."""
+    return {
+        "times": columns["time"],
+        "opens": columns["open"],
+        "highs": columns["high"],
+        "lows": columns["low"],
+        "closes": columns["close"],
+        "volumes": columns["volumeUsd"],
+        "title": title,
+    }
+
+
+def pyth_candle_payload(data_list: list, title: str = "Pyth Price (OHLC)") -> dict:
+    """Candlestick payload for /price/<feed>/pyth-price-ohlc items (no volume)."""
+    columns = {name: array('d') for name in ("open", "high", "low", "close")}
+    times = array('q')
+    for item in data_list:
+        try:
+            row = [float(item[name]) for name in columns]
+            time_ = int(item["timeBucketStart"])
+        except (KeyError, ValueError, TypeError):
+            continue
+        times.append(time_)
+        for column, value in zip(columns.values(), row):
+            column.append(value)
+    return {
+        "times": times,
+        "opens": columns["open"],
+        "highs": columns["high"],
+        "lows": columns["low"],
+        "closes": columns["close"],
+        "volumes": None,
+        "title": title,
+    }
+
+
+def comparison_payload(series: list, labels: list, time_start: int, time_end: int, step: int):
+    """Align OHLCVStore.query() columns on one time grid as % change.
+
+    Each grid point takes the series' last close at or before it (NaN before
+    its first candle); each series is then expressed relative to its first
+    aligned close. Series without usable closes are dropped. Returns None if
+    none are left.
+    """
+    grid = np.arange(time_start - time_start % step, time_end + 1, step, dtype=np.int64)
+    lines, kept = [], []
+    for columns, label in zip(series, labels):
+        times = np.asarray(columns["time"], dtype=np.int64)
+        closes = np.asarray(columns["close"], dtype=np.float64)
+        usable = np.isfinite(closes) & (closes > 0)
+        times, closes = times[usable], closes[usable]
+        if not len(times) or times[0] > grid[-1]:
+            continue
+        pos = np.searchsorted(times, grid, side="right") - 1
+        aligned = np.where(pos >= 0, closes[np.maximum(pos, 0)], np.nan)
+        base = aligned[np.argmax(pos >= 0)]
+        lines.append(array('d', (aligned / base - 1) * 100))
+        kept.append(label)
+    if not lines:
+        return None
+    return {"times": array('q', grid), "series": lines, "labels": kept}
+
+
+def holders_payload(holders: list, title: str, height: float = 8, label_fontsize: int = 7) -> dict:
+    balances = array('d')
+    percentages = array('d')
+    labels = []
+    for holder in holders:
+        try:
+            balance = float(holder.get("balance", 0))
+        except (ValueError, TypeError):
+            balance = 0.0
+        balances.append(balance)
+        try:
+            percentage = float(holder.get("percentageOfSupplyHeld", 0))
+        except (ValueError, TypeError):
+            percentage = 0.0
+        percentages.append(percentage)
+        name = holder.get("ownerName")
+        if name:
+            label = name[:20]
+        else:
+            addr = holder.get("ownerAddress", "Unknown")
+            label = f"{addr[:4]}...{addr[-4:]}"
+        labels.append(label)
+    return {
+        "labels": labels,
+        "balances": balances,
+        "percentages": percentages,
+        "title": title,
+        "height": height,
+        "label_fontsize": label_fontsize,
+    }
+
+
+def bar_payload(labels: list, values: list) -> dict:
+    return {"labels": list(labels), "values": array('d', values)}
+
+
+# Templates (run in the worker processes)
+
+UP_COLOR = to_rgba("#26a69a")
+DOWN_COLOR = to_rgba("#ef5350")
+
+
+class CandleTemplate:
+    """OHLC candlesticks plus an optional volume panel.
+
+    Wicks are one LineCollection, bodies and volume bars one PolyCollection
+    each; a render replaces their vertex arrays and colours in bulk.
+    """
+
+    def __init__(self, with_volume: bool):
+        self.fig = Figure(figsize=(10, 6 if with_volume else 5))
+        self.canvas = FigureCanvasAgg(self.fig)
+        if with_volume:
+            self.ax, self.vax = self.fig.subplots(2, 1, sharex=True, gridspec_kw={"height_ratios": [3, 1]})
+            self.volume = PolyCollection([], linewidths=0, alpha=0.6)
+            self.vax.add_collection(self.volume)
+            self.vax.set_ylabel('Volume (USD)')
+            self.vax.yaxis.set_major_formatter(EngFormatter())
+            self.vax.grid(True, alpha=0.3)
+        else:
+            self.ax, self.vax = self.fig.add_subplot(), None
+        self.wicks = LineCollection([], linewidths=0.8)
+        self.bodies = PolyCollection([], linewidths=0)
+        self.ax.add_collection(self.wicks)
+        self.ax.add_collection(self.bodies)
+        self.ax.set_ylabel('Price (USD)')
+        self.ax.grid(True, alpha=0.3)
+        self.title = self.ax.set_title('')
+        bottom = self.vax or self.ax
+        locator = mdates.AutoDateLocator()
+        bottom.xaxis.set_major_locator(locator)
+        bottom.xaxis.set_major_formatter(mdates.ConciseDateFormatter(locator))
+        self.fig.subplots_adjust(left=0.1, right=0.97, top=0.93, bottom=0.1, hspace=0.05)
+        # Narrower than ~3 px a candle is just a smear; merge neighbours instead.
+        self.max_candles = int(self.fig.get_figwidth() * self.fig.dpi) // 3
+
+    def render(self, times, opens, highs, lows, closes, volumes=None, title='') -> bytes:
+        times, opens, highs, lows, closes, volumes = aggregate_ohlc(
+            times, opens, highs, lows, closes, volumes, self.max_candles)
+        valid = np.isfinite(opens) & np.isfinite(highs) & np.isfinite(lows) & np.isfinite(closes)
+        x = epoch_to_datenum(times[valid])
+        opens, highs, lows, closes = opens[valid], highs[valid], lows[valid], closes[valid]
+        n = len(x)
+        half = 0.35 * (np.median(np.diff(x)) if n > 1 else 1.0)
+        colors = np.where((closes >= opens)[:, None], UP_COLOR, DOWN_COLOR)
+
+        self.wicks.set_segments(np.stack([np.column_stack([x, lows]), np.column_stack([x, highs])], axis=1))
+        self.wicks.set_color(colors)
+        left, right = x - half, x + half
+        bottom, top = np.minimum(opens, closes), np.maximum(opens, closes)
+        self.bodies.set_verts(np.stack([
+            np.column_stack([left, bottom]), np.column_stack([left, top]),
+            np.column_stack([right, top]), np.column_stack([right, bottom]),
+        ], axis=1))
+        self.bodies.set_facecolor(colors)
+
+        if n:
+            self.ax.set_xlim(x[0] - 2 * half, x[-1] + 2 * half)
+            low, high = lows.min(), highs.max()
+            pad = (high - low) * 0.05 or abs(high) * 0.05 or 1.0
+            self.ax.set_ylim(low - pad, high + pad)
+        if self.vax is not None:
+            volumes = volumes[valid] if volumes is not None else np.zeros(n)
+            zeros = np.zeros(n)
+            self.volume.set_verts(np.stack([
+                np.column_stack([left, zeros]), np.column_stack([left, volumes]),
+                np.column_stack([right, volumes]), np.column_stack([right, zeros]),
+            ], axis=1))
+            self.volume.set_facecolor(colors)
+            self.vax.set_ylim(0, (volumes.max() if n else 0) * 1.1 or 1)
+        self.title.set_text(title)
+        return _print_png(self.canvas)
+
+
+class ComparisonTemplate:
+    """Normalized-performance overlay: one % change line per token."""
+
+    def __init__(self):
+        self.fig = Figure(figsize=(10, 5))
+        self.canvas = FigureCanvasAgg(self.fig)
+        self.ax = self.fig.add_subplot()
+        self.lines = []
+        self.ax.axhline(0, color='grey', linewidth=0.8)
+        self.ax.set_ylabel('Change (%)')
+        self.ax.yaxis.set_major_formatter(PercentFormatter())
+        self.ax.set_title('Relative Performance')
+        self.ax.grid(True, alpha=0.3)
+        locator = mdates.AutoDateLocator()
+        self.ax.xaxis.set_major_locator(locator)
+        self.ax.xaxis.set_major_formatter(mdates.ConciseDateFormatter(locator))
+        self.fig.subplots_adjust(left=0.1, right=0.97, top=0.92, bottom=0.1)
+        # One point per horizontal pixel is all the PNG can show.
+        self.max_points = int(self.fig.get_figwidth() * self.fig.dpi)
+
+    def render(self, times, series, labels) -> bytes:
+        while len(self.lines) < len(series):
+            (line,) = self.ax.plot([], [], linewidth=1.6)
+            self.lines.append(line)
+        x = epoch_to_datenum(times)
+        for i, line in enumerate(self.lines):
+            visible = i < len(series)
+            line.set_visible(visible)
+            if visible:
+                # lttb also drops the NaNs before a series' first candle.
+                line.set_data(*lttb(x, series[i], self.max_points))
+                line.set_label(labels[i])
+        shown = self.lines[:len(series)]
+        self.ax.legend(shown, [line.get_label() for line in shown], loc='upper left')
+        if len(x):
+            self.ax.set_xlim(x[0], x[-1] if len(x) > 1 else x[0] + 1)
+        values = np.concatenate([np.asarray(s, dtype=float) for s in series] + [[0.0]])
+        low, high = np.nanmin(values), np.nanmax(values)
+        pad = (high - low) * 0.05 or 1.0
+        self.ax.set_ylim(low - pad, high + pad)
+        return _print_png(self.canvas)
+
+
+class _BarSlots:
+    """A reusable pool of bar rectangles; grows only when a render needs more."""
+
+    def __init__(self, ax, horizontal: bool = False, capacity: int = 10, **style):
+        self.ax = ax
+        self.horizontal = horizontal
+        self.style = style
+        self.bars = []
+        self._grow(capacity)
+
+    def _grow(self, capacity: int):
+        start = len(self.bars)
+        positions = np.arange(start, capacity)
+        zeros = np.zeros(len(positions))
+        container = (self.ax.barh if self.horizontal else self.ax.bar)(positions, zeros, **self.style)
+        self.bars.extend(container.patches)
+
+    def update(self, values):
+        if len(values) > len(self.bars):
+            self._grow(max(len(values), 2 * len(self.bars)))
+        for i, bar in enumerate(self.bars):
+            visible = i < len(values)
+            bar.set_visible(visible)
+            if visible:
+                (bar.set_width if self.horizontal else bar.set_height)(values[i])
+
+
+class HoldersTemplate:
+    """Dual-axis bars (amount held) + line (% supply held)."""
+
+    def __init__(self, height: float, label_fontsize: int):
+        self.label_fontsize = label_fontsize
+        self.fig = Figure(figsize=(10, height))
+        self.canvas = FigureCanvasAgg(self.fig)
+        self.ax1 = self.fig.add_subplot()
+        self.bars = _BarSlots(self.ax1, capacity=25, color="skyblue", alpha=0.6)
+        self.ax1.set_xlabel("Holder")
+        self.ax1.set_ylabel("Amount Held", color="skyblue")
+        self.ax1.tick_params(axis="y", labelcolor="skyblue")
+
+        self.ax2 = self.ax1.twinx()
+        (self.line,) = self.ax2.plot([], [], color="orange", marker="o")
+        self.ax2.set_ylabel("% Supply Held", color="orange")
+        self.ax2.tick_params(axis="y", labelcolor="orange")
+
+        self.title = self.ax1.set_title("")
+        self.ax1.legend(
+            [Patch(color="skyblue", alpha=0.6), Line2D([], [], color="orange", marker="o")],
+            ["Amount Held", "% Supply Held"],
+            loc="upper right",
+        )
+        # Fixed margins sized for 20-char vertical labels replace per-render tight_layout.
+        self.fig.subplots_adjust(left=0.1, right=0.9, top=0.94, bottom=min(0.4, 1.9 / height))
+
+    def render(self, labels, balances, percentages, title, **_) -> bytes:
+        n = len(labels)
+        self.bars.update(balances)
+        self.ax1.set_xticks(range(n))
+        self.ax1.set_xticklabels(labels, rotation=90, ha="center", fontsize=self.label_fontsize)
+        self.ax1.set_xlim(-0.6, n - 0.4)
+        self.ax1.set_ylim(0, (max(balances) if n else 0) * 1.05 or 1)
+        self.line.set_data(np.arange(n), np.asarray(percentages, dtype=float))
+        self.ax2.relim()
+        self.ax2.autoscale_view()
+        self.title.set_text(title)
+        return _print_png(self.canvas)
+
+
+class BarTemplate:
+    """Single-series bar chart (vertical or horizontal)."""
+
+    def __init__(self, title: str, xlabel: str = None, ylabel: str = None,
+                 horizontal: bool = False, label_rotation: float = 0):
+        self.horizontal = horizontal
+        self.label_rotation = label_rotation
+        self.fig = Figure(figsize=(10, 5))
+        self.canvas = FigureCanvasAgg(self.fig)
+        self.ax = self.fig.add_subplot()
+        self.bars = _BarSlots(self.ax, horizontal=horizontal, capacity=10, color='purple')
+        self.ax.set_title(title)
+        if xlabel:
+            self.ax.set_xlabel(xlabel)
+        if ylabel:
+            self.ax.set_ylabel(ylabel)
+        if horizontal:
+            self.ax.invert_yaxis()
+        self.fig.subplots_adjust(left=0.12, bottom=0.2 if label_rotation else 0.1)
+
+    def render(self, labels, values) -> bytes:
+        n = len(labels)
+        self.bars.update(values)
+        top = (max(values) if n else 0) * 1.05 or 1
+        if self.horizontal:
+            self.ax.set_yticks(range(n))
+            self.ax.set_yticklabels(labels)
+            self.ax.set_ylim(n - 0.4, -0.6)
+            self.ax.set_xlim(0, top)
+        else:
+            self.ax.set_xticks(range(n))
+            self.ax.set_xticklabels(labels, rotation=self.label_rotation)
+            self.ax.set_xlim(-0.6, n - 0.4)
+            self.ax.set_ylim(0, top)
+        return _print_png(self.canvas)
+
+
+_TEMPLATES = {}
+
+
+def _template(key, factory):
+    template = _TEMPLATES.get(key)
+    if template is None:
+        template = _TEMPLATES[key] = factory()
+    return template
+
+
+def render_candle_chart(times, opens, highs, lows, closes, volumes=None, title='') -> bytes:
+    with_volume = volumes is not None
+    template = _template(("candles", with_volume), lambda: CandleTemplate(with_volume))
+    return template.render(times, opens, highs, lows, closes, volumes, title)
+
+
+def render_comparison_chart(times, series, labels) -> bytes:
+    return _template("comparison", ComparisonTemplate).render(times, series, labels)
+
+
+def render_holders_chart(labels, balances, percentages, title, height=8, label_fontsize=7) -> bytes:
+    template = _template(("holders", height, label_fontsize), lambda: HoldersTemplate(height, label_fontsize))
+    return template.render(labels, balances, percentages, title)
+
+
+def render_distribution_chart(labels, values) -> bytes:
+    template = _template("distribution", lambda: BarTemplate(
+        'Top 10 NFT Holders', xlabel='Number of NFTs', horizontal=True))
+    return template.render(labels, values)
+
+
+def render_ownership_chart(labels, values) -> bytes:
+    template = _template("ownership", lambda: BarTemplate(
+        "Top Holder NFT Distribution", xlabel="Wallet Address", ylabel="Number of NFTs", label_rotation=45))
+    return template.render(labels, values)
+
+
+RENDERERS = {
+    "candles": render_candle_chart,
+    "comparison": render_comparison_chart,
+    "holders": render_holders_chart,
+    "distribution": render_distribution_chart,
+    "ownership": render_ownership_chart,
+}
+
+
+def warm_up():
+    """Process initializer: build the templates and load fonts before the first real job."""
+    for volumes in (array('d', [1.0, 1.0]), None):
+        render_candle_chart(array('q', [0, 86400]), *[array('d', [1.0, 1.0])] * 4, volumes)
+    render_comparison_chart(array('q', [0, 86400]), [array('d', [0.0, 1.0])], ["warm"])
+    render_distribution_chart(["warm"], [1.0])
+    render_ownership_chart(["warm"], [1.0])
+    for height, fontsize in ((8, 7), (7, 8)):
+        render_holders_chart(["warm"], [1.0], [1.0], "", height, fontsize)
+
+
+def run_job(kind: str, payload: dict) -> bytes:
+    """Worker entry point."""
+    return RENDERERS[kind](**payload)
@@ -5,4 +5,90 @@ load_dotenv()
 
 TELEGRAM_TOKEN = os.getenv("TELEGRAM_TOKEN")
 VYBE_API_KEY    = os.getenv("VYBE_API_KEY")
-VYBE_BASE_URL   = "https://api.vybenetwork.xyz"
\ No newline at end of file
+VYBE_BASE_URL   = "https://api.vybenetwork.xyz"
+# Event-loop blocking guard (test mode). 0 disables it.
+LOOP_BLOCK_THRESHOLD_MS = int(os.getenv("LOOP_BLOCK_THRESHOLD_MS", "0"))
+LOOP_BLOCK_FAIL_FAST    = os.getenv("LOOP_BLOCK_FAIL_FAST", "1") == "1"
+
+# Comma-separated Telegram user ids allowed to run /stats.
+ADMIN_USER_IDS  = {int(uid) for uid in os.getenv("ADMIN_USER_IDS", "").split(",") if uid.strip().isdigit()}
+
+# /tokenDetails screenshot browser pool
+BROWSER_POOL_SIZE    = int(os.getenv("BROWSER_POOL_SIZE", "2"))
+BROWSER_MAX_USES     = int(os.getenv("BROWSER_MAX_USES", "50"))
+BROWSER_MAX_WAITERS  = int(os.getenv("BROWSER_MAX_WAITERS", "10"))
+BROWSER_STORAGE_STATE  = os.getenv("BROWSER_STORAGE_STATE", os.path.join(os.path.dirname(__file__), "browser_state.json"))
+SCREENSHOT_BUDGET_SECS = float(os.getenv("SCREENSHOT_BUDGET_SECS", "20"))
+SCREENSHOT_TTL_SECS       = int(os.getenv("SCREENSHOT_TTL_SECS", "300"))
+SCREENSHOT_MAX_STALE_SECS = int(os.getenv("SCREENSHOT_MAX_STALE_SECS", "3600"))
+SCREENSHOT_CACHE_ENTRIES  = int(os.getenv("SCREENSHOT_CACHE_ENTRIES", "128"))
+
+# Chart rendering worker processes
+CHART_WORKERS      = int(os.getenv("CHART_WORKERS", "2"))
+CHART_MAX_PENDING  = int(os.getenv("CHART_MAX_PENDING", "32"))
+CHART_TIMEOUT_SECS = float(os.getenv("CHART_TIMEOUT_SECS", "15"))
+
+# Rendered /chart PNG cache, bounded by total bytes
+CHART_CACHE_MAX_BYTES = int(os.getenv("CHART_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+# /chart <token> <token> ...: max tokens per comparison, concurrent series fetches
+CHART_COMPARE_MAX         = int(os.getenv("CHART_COMPARE_MAX", "6"))
+CHART_FETCH_CONCURRENCY   = int(os.getenv("CHART_FETCH_CONCURRENCY", "4"))
+
+# Favorites database (SQLite, WAL mode); favorites.json is migrated on first start
+FAVORITES_DB_PATH = os.getenv("FAVORITES_DB_PATH", os.path.join(os.path.dirname(__file__), "favorites_handlers", "favorites.db"))
+
+# Local OHLCV candle store; only missing ranges are fetched from the API
+OHLCV_DB_PATH    = os.getenv("OHLCV_DB_PATH", os.path.join(os.path.dirname(__file__), "ohlcv.db"))
+OHLCV_MAX_SERIES = int(os.getenv("OHLCV_MAX_SERIES", "500"))
+# Candles asked for per request, and how long an empty answer must persist
+# before the range is trusted to have no trades
+OHLCV_REQUEST_LIMIT      = int(os.getenv("OHLCV_REQUEST_LIMIT", "1000"))
+OHLCV_EMPTY_CONFIRM_SECS = float(os.getenv("OHLCV_EMPTY_CONFIRM_SECS", "300"))
+
+# Favorites "refresh all" dashboard
+FAVORITES_REFRESH_CONCURRENCY = int(os.getenv("FAVORITES_REFRESH_CONCURRENCY", "8"))
+FAVORITES_REFRESH_TIMEOUT_SECS = float(os.getenv("FAVORITES_REFRESH_TIMEOUT_SECS", "10"))
+
+# Interactive flow state: abandoned flows expire after FLOW_IDLE_TTL_SECS
+FLOW_IDLE_TTL_SECS = int(os.getenv("FLOW_IDLE_TTL_SECS", "900"))
+FLOW_MAX_USERS     = int(os.getenv("FLOW_MAX_USERS", "10000"))
+
+# Serving: webhook mode when WEBHOOK_URL (public https base URL) is set, long polling otherwise.
+# Either way PORT serves GET /healthz.
+WEBHOOK_URL     = os.getenv("WEBHOOK_URL", "")
+WEBHOOK_PATH    = os.getenv("WEBHOOK_PATH", "telegram").strip("/")
+# Required with WEBHOOK_URL and shared by every replica (1-256 of A-Z a-z 0-9 _ -).
+WEBHOOK_SECRET  = os.getenv("WEBHOOK_SECRET", "")
+WEBHOOK_MAX_CONNECTIONS = int(os.getenv("WEBHOOK_MAX_CONNECTIONS", "40"))
+HTTP_HOST       = os.getenv("HTTP_HOST", "0.0.0.0")
+PORT            = int(os.getenv("PORT", "10000"))
+DRAIN_TIMEOUT_SECS = float(os.getenv("DRAIN_TIMEOUT_SECS", "25"))
+
+# Concurrent update processing: UPDATE_CONCURRENCY handlers run at once, each
+# chat's updates stay in order; past UPDATE_MAX_PENDING admitted, updates are
+# dropped with a "busy" reply.
+UPDATE_CONCURRENCY = int(os.getenv("UPDATE_CONCURRENCY", "16"))
+UPDATE_MAX_PENDING = int(os.getenv("UPDATE_MAX_PENDING", "256"))
+
+# Background whale-transfer poller (/whalealert is served from its buffer)
+WHALE_POLL_SECS   = float(os.getenv("WHALE_POLL_SECS", "10"))
+WHALE_BUFFER_SIZE = int(os.getenv("WHALE_BUFFER_SIZE", "5000"))
+WHALE_POLL_LIMIT  = int(os.getenv("WHALE_POLL_LIMIT", "1000"))
+WHALE_SUBSCRIBE_MIN_USD    = float(os.getenv("WHALE_SUBSCRIBE_MIN_USD", "1000"))
+WHALE_PUSH_CONCURRENCY     = int(os.getenv("WHALE_PUSH_CONCURRENCY", "10"))
+WHALE_PUSH_MAX_PER_MESSAGE = int(os.getenv("WHALE_PUSH_MAX_PER_MESSAGE", "5"))
+# Paged /token/transfers lookups for thresholds the buffer can't satisfy
+WHALE_FETCH_PAGE_SIZE = int(os.getenv("WHALE_FETCH_PAGE_SIZE", "100"))
+WHALE_FETCH_MAX_PAGES = int(os.getenv("WHALE_FETCH_MAX_PAGES", "5"))
+
+# Batched Pyth price lookups (/pyth and the Pyth menu's Price Feed)
+PYTH_MAX_FEEDS         = int(os.getenv("PYTH_MAX_FEEDS", "25"))
+PYTH_FETCH_CONCURRENCY = int(os.getenv("PYTH_FETCH_CONCURRENCY", "10"))
+PYTH_MAX_LISTS         = int(os.getenv("PYTH_MAX_LISTS", "10"))
+
+# Full /tokens catalog kept in memory for /prices
+TOKEN_CATALOG_REFRESH_SECS = float(os.getenv("TOKEN_CATALOG_REFRESH_SECS", "300"))
+TOKEN_CATALOG_PAGE_SIZE    = int(os.getenv("TOKEN_CATALOG_PAGE_SIZE", "1000"))
+TOKEN_CATALOG_MAX_PAGES    = int(os.getenv("TOKEN_CATALOG_MAX_PAGES", "100"))
+TOKEN_CATALOG_RETRY_SECS   = float(os.getenv("TOKEN_CATALOG_RETRY_SECS", "5"))    # first retry after a failed pass; doubles up to the refresh interval
+TOKEN_CATALOG_WAIT_SECS    = float(os.getenv("TOKEN_CATALOG_WAIT_SECS", "10"))    # how long a request waits for the first pass
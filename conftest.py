@@ -0,0 +1,3 @@
+# conftest.py
+# Present so pytest puts the repository root on sys.path and tests can import
+# the top-level packages (services, handlers, ...) without an install.
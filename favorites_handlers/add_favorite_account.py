@@ -8,5 +8,5 @@ async def add_favorite_account(update: Update, context: ContextTypes.DEFAULT_TYP
         await update.message.reply_text("Usage: /addfavoriteaccount <wallet_address>")
         return
     address = context.args[0]
-    new_list = add_favorite(user_id, "accounts", address)
+    new_list = await add_favorite(user_id, "accounts", address)
     await update.message.reply_text(f"✅ Added {address} to your favorite accounts. Total: {len(new_list)}")
\ No newline at end of file
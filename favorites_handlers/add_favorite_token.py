@@ -8,5 +8,5 @@ async def add_favorite_token(update: Update, context: ContextTypes.DEFAULT_TYPE)
         await update.message.reply_text("Usage: /addfavoritetoken <token_mint_address>")
         return
     mint = context.args[0]
-    new_list = add_favorite(user_id, "tokens", mint)
+    new_list = await add_favorite(user_id, "tokens", mint)
     await update.message.reply_text(f"✅ Added {mint} to your favorite tokens. Total: {len(new_list)}")
\ No newline at end of file
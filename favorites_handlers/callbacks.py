@@ -10,6 +10,7 @@ from slashcommands.slashutils import (
 )
 from .favorite_accounts import favorite_accounts
 from .favorite_tokens import favorite_tokens
+from .dashboard import favorites_dashboard
 
 async def favorites_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
@@ -89,3 +90,15 @@ async def back_to_fav_accounts(update: Update, context: ContextTypes.DEFAULT_TYP
 
 async def back_to_fav_tokens(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await favorite_tokens(update, context)
+
+# Registered with handlers/router.py
+callback_routes = [
+    ("fav_acct:", favorites_callback),
+    ("fav_token:", favorites_callback),
+    ("acc_balance:", account_balance_cb),
+    ("tok_details:", token_details_cb),
+    ("tok_holders:", token_holders_cb),
+    ("back_fav_acct", back_to_fav_accounts),
+    ("back_fav_tok", back_to_fav_tokens),
+    ("fav_refresh", favorites_dashboard),
+]
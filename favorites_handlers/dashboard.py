@@ -0,0 +1,116 @@
+# favorites_handlers/dashboard.py
+import asyncio
+import logging
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update
+from telegram.ext import ContextTypes
+from telegram.helpers import escape_markdown
+from config import FAVORITES_REFRESH_CONCURRENCY, FAVORITES_REFRESH_TIMEOUT_SECS
+from services.vybe_client import vybe
+from slashcommands.slashutils import chunk_lines
+from .db import get_user_favorites
+
+logger = logging.getLogger(__name__)
+
+
+def _short(addr: str) -> str:
+    return f"{addr[:6]}…{addr[-4:]}"
+
+
+async def _account_line(address: str) -> str:
+    data = await vybe.get(f"/account/token-balance/{address}")
+    return (
+        f"💼 `{_short(address)}`  ${float(data.get('totalTokenValueUsd', 0)):,.2f}"
+        f" · {float(data.get('stakedSolBalance', 0)):.4f} SOL"
+        f" · {int(data.get('totalTokenCount', 0)):,} tokens"
+    )
+
+
+async def _token_line(mint: str) -> str:
+    data = await vybe.get(f"/token/{mint}")
+    return (
+        f"🪙 {escape_markdown(data.get('symbol') or _short(mint))}  ${data.get('price', 0):.4f}"
+        f" · 1D {data.get('price1d', 0):+.2f}%"
+        f" · 7D {data.get('price7d', 0):+.2f}%"
+    )
+
+
+SECTIONS = (
+    ("accounts", "💼 *Accounts*", _account_line),
+    ("tokens", "🪙 *Tokens*", _token_line),
+)
+
+
+async def refresh_all(favs: dict, timeout: float = FAVORITES_REFRESH_TIMEOUT_SECS,
+                      concurrency: int = FAVORITES_REFRESH_CONCURRENCY) -> list:
+    """Fetch every favorite concurrently and return the dashboard lines.
+
+    At most `concurrency` lookups run at once. Lookups still running after
+    `timeout` seconds are reported as timed out, so the dashboard always
+    comes back with whatever finished in time. Only this dashboard stops
+    waiting for them: the API calls themselves are shared through vybe's
+    cache and keep running for anyone else waiting on them, and their
+    results are cached for the next refresh.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded(fetch, address):
+        async with semaphore:
+            return await fetch(address)
+
+    jobs = []   # (category, address, task)
+    for category, _, fetch in SECTIONS:
+        for address in favs.get(category, []):
+            jobs.append((category, address, asyncio.create_task(bounded(fetch, address))))
+    pending = set()
+    if jobs:
+        _, pending = await asyncio.wait([task for _, _, task in jobs], timeout=timeout)
+        for task in pending:
+            task.cancel()   # stops waiting; vybe.get shields the shared fetch
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    lines = []
+    for category, title, _ in SECTIONS:
+        rows = [(address, task) for cat, address, task in jobs if cat == category]
+        if not rows:
+            continue
+        lines.extend(["", title])
+        for address, task in rows:
+            if task in pending or task.cancelled():
+                lines.append(f"⏳ `{_short(address)}` timed out")
+            elif task.exception() is not None:
+                logger.warning(f"Favorite refresh failed for {address}: {task.exception()!r}")
+                lines.append(f"⚠️ `{_short(address)}` unavailable")
+            else:
+                lines.append(task.result())
+    return lines
+
+
+async def favorites_dashboard(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """
+    One-tap refresh of all favorite accounts and tokens.
+    Works as both a Slash Command (/refreshfavorites) and a CallbackQuery (fav_refresh).
+    """
+    if update.callback_query:
+        await update.callback_query.answer()
+        message = update.callback_query.message
+    else:
+        message = update.message
+
+    favs = await get_user_favorites(update.effective_user.id)
+    total = sum(len(favs[category]) for category, _, _ in SECTIONS)
+    if not total:
+        await message.reply_text(
+            "⭐ You have no favorites yet.\n"
+            "Use /addfavoriteaccount or /addfavoritetoken to add some."
+        )
+        return
+
+    status = await message.reply_text(f"⏳ Refreshing {total} favorites…")
+    lines = ["📊 *Favorites Dashboard*"] + await refresh_all(favs)
+    chunks = chunk_lines(lines)
+    keyboard = InlineKeyboardMarkup([[InlineKeyboardButton("🔄 Refresh All", callback_data="fav_refresh")]])
+    await status.edit_text(chunks[0], parse_mode="Markdown",
+                           reply_markup=keyboard if len(chunks) == 1 else None)
+    for i, chunk in enumerate(chunks[1:], start=2):
+        await message.reply_text(chunk, parse_mode="Markdown",
+                                 reply_markup=keyboard if i == len(chunks) else None)
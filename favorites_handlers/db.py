@@ -1,29 +1,210 @@
+# favorites_handlers/db.py
+import asyncio
 import json
+import logging
 import os
-from threading import Lock
-
-LOCK = Lock()
-DB_PATH = os.path.join(os.path.dirname(__file__), 'favorites.json')
-
-def _load_db():
-    if not os.path.exists(DB_PATH):
-        return {}
-    with open(DB_PATH, 'r') as f:
-        return json.load(f)
-
-def _save_db(data):
-    with LOCK:
-        with open(DB_PATH, 'w') as f:
-            json.dump(data, f, indent=2)
-
-def get_user_favorites(user_id: int):
-    db = _load_db()
-    return db.get(str(user_id), {"accounts": [], "tokens": []})
-
-def add_favorite(user_id: int, category: str, address: str):
-    db = _load_db()
-    favs = db.setdefault(str(user_id), {"accounts": [], "tokens": []})
-    if address not in favs[category]:
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from config import FAVORITES_DB_PATH
+
+logger = logging.getLogger(__name__)
+
+LEGACY_JSON_PATH = os.path.join(os.path.dirname(__file__), 'favorites.json')
+CATEGORIES = ("accounts", "tokens")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS favorites (
+    id       INTEGER PRIMARY KEY,
+    user_id  INTEGER NOT NULL,
+    category TEXT    NOT NULL,
+    address  TEXT    NOT NULL,
+    UNIQUE (user_id, category, address)
+);
+CREATE TABLE IF NOT EXISTS whale_subscriptions (
+    chat_id  INTEGER PRIMARY KEY,
+    min_usd  REAL    NOT NULL
+);
+CREATE TABLE IF NOT EXISTS pyth_lists (
+    user_id  INTEGER NOT NULL,
+    name     TEXT    NOT NULL,
+    feeds    TEXT    NOT NULL,
+    PRIMARY KEY (user_id, name)
+);
+"""
+
+# All SQLite work runs on this one thread: the connection never crosses
+# threads, the event loop never blocks on disk, and read-modify-write
+# sequences such as add-then-list can't interleave.
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="favorites-db")
+_conn = None
+_db_path = FAVORITES_DB_PATH
+
+
+def _connection() -> sqlite3.Connection:
+    global _conn
+    if _conn is None:
+        conn = sqlite3.connect(_db_path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        conn.executescript(SCHEMA)
+        try:
+            _migrate_json(conn)
+        except Exception:
+            # Leave _conn unset so the next call retries; the import is idempotent.
+            conn.close()
+            raise
+        _conn = conn
+    return _conn
+
+
+def _migrate_json(conn: sqlite3.Connection, json_path: str = LEGACY_JSON_PATH):
+    """Import the old favorites.json once, then rename it out of the way."""
+    if not os.path.exists(json_path):
+        return
+    with open(json_path, 'r') as f:
+        data = json.load(f)
+    rows = [
+        (int(user_id), category, address)
+        for user_id, favs in data.items()
+        for category in CATEGORIES
+        for address in favs.get(category, [])
+    ]
+    with conn:
+        conn.executemany(
+            "INSERT OR IGNORE INTO favorites (user_id, category, address) VALUES (?, ?, ?)",
+            rows,
+        )
+    os.replace(json_path, json_path + '.migrated')
+    logger.info(f"Migrated {len(rows)} favorites for {len(data)} users from {json_path}")
+
+
+def _get_user_favorites(user_id: int) -> dict:
+    favs = {category: [] for category in CATEGORIES}
+    rows = _connection().execute(
+        "SELECT category, address FROM favorites WHERE user_id = ? ORDER BY id",
+        (user_id,),
+    )
+    for category, address in rows:
         favs[category].append(address)
-        _save_db(db)
-    return favs[category]
\ No newline at end of file
+    return favs
+
+
+def _list(conn: sqlite3.Connection, user_id: int, category: str) -> list:
+    rows = conn.execute(
+        "SELECT address FROM favorites WHERE user_id = ? AND category = ? ORDER BY id",
+        (user_id, category),
+    )
+    return [address for (address,) in rows]
+
+
+def _add_favorite(user_id: int, category: str, address: str) -> list:
+    conn = _connection()
+    with conn:
+        conn.execute(
+            "INSERT OR IGNORE INTO favorites (user_id, category, address) VALUES (?, ?, ?)",
+            (user_id, category, address),
+        )
+    return _list(conn, user_id, category)
+
+
+def _set_whale_subscription(chat_id: int, min_usd: float):
+    conn = _connection()
+    with conn:
+        conn.execute(
+            "INSERT INTO whale_subscriptions (chat_id, min_usd) VALUES (?, ?) "
+            "ON CONFLICT (chat_id) DO UPDATE SET min_usd = excluded.min_usd",
+            (chat_id, min_usd),
+        )
+
+
+def _remove_whale_subscription(chat_id: int) -> bool:
+    conn = _connection()
+    with conn:
+        return conn.execute("DELETE FROM whale_subscriptions WHERE chat_id = ?", (chat_id,)).rowcount > 0
+
+
+def _load_whale_subscriptions() -> dict:
+    return dict(_connection().execute("SELECT chat_id, min_usd FROM whale_subscriptions"))
+
+
+def _save_pyth_list(user_id: int, name: str, feed_ids: list):
+    conn = _connection()
+    with conn:
+        conn.execute(
+            "INSERT INTO pyth_lists (user_id, name, feeds) VALUES (?, ?, ?) "
+            "ON CONFLICT (user_id, name) DO UPDATE SET feeds = excluded.feeds",
+            (user_id, name, ",".join(feed_ids)),
+        )
+
+
+def _remove_pyth_list(user_id: int, name: str) -> bool:
+    conn = _connection()
+    with conn:
+        return conn.execute(
+            "DELETE FROM pyth_lists WHERE user_id = ? AND name = ?", (user_id, name)
+        ).rowcount > 0
+
+
+def _get_pyth_lists(user_id: int) -> dict:
+    rows = _connection().execute(
+        "SELECT name, feeds FROM pyth_lists WHERE user_id = ? ORDER BY name", (user_id,)
+    )
+    return {name: feeds.split(",") for name, feeds in rows}
+
+
+def _close():
+    global _conn
+    if _conn is not None:
+        _conn.close()
+        _conn = None
+
+
+async def _run(func, *args):
+    return await asyncio.get_running_loop().run_in_executor(_executor, func, *args)
+
+
+async def get_user_favorites(user_id: int):
+    return await _run(_get_user_favorites, user_id)
+
+
+async def add_favorite(user_id: int, category: str, address: str):
+    if category not in CATEGORIES:
+        raise ValueError(f"Unknown favorites category: {category}")
+    return await _run(_add_favorite, user_id, category, address)
+
+
+async def set_whale_subscription(chat_id: int, min_usd: float):
+    await _run(_set_whale_subscription, chat_id, min_usd)
+
+
+async def remove_whale_subscription(chat_id: int) -> bool:
+    return await _run(_remove_whale_subscription, chat_id)
+
+
+async def load_whale_subscriptions() -> dict:
+    """chat_id -> min_usd for every subscribed chat."""
+    return await _run(_load_whale_subscriptions)
+
+
+async def save_pyth_list(user_id: int, name: str, feed_ids: list):
+    await _run(_save_pyth_list, user_id, name, feed_ids)
+
+
+async def remove_pyth_list(user_id: int, name: str) -> bool:
+    return await _run(_remove_pyth_list, user_id, name)
+
+
+async def get_pyth_lists(user_id: int) -> dict:
+    """name -> feed IDs for each Pyth feed list the user saved."""
+    return await _run(_get_pyth_lists, user_id)
+
+
+async def start_db(application=None):
+    """post_init hook: open the database (and migrate favorites.json) up front."""
+    await _run(_connection)
+
+
+async def close_db(application=None):
+    """post_shutdown hook: close the connection on its own thread."""
+    await _run(_close)
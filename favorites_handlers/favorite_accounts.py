@@ -16,7 +16,7 @@ async def favorite_accounts(update: Update, context: ContextTypes.DEFAULT_TYPE):
         send = update.message.reply_text
 
     user_id = update.effective_user.id
-    favs = get_user_favorites(user_id)["accounts"]
+    favs = (await get_user_favorites(user_id))["accounts"]
     if not favs:
         await send(
             "⭐ You have no favorite accounts yet.\n"
@@ -28,6 +28,7 @@ async def favorite_accounts(update: Update, context: ContextTypes.DEFAULT_TYPE):
         [InlineKeyboardButton(f"{addr[:6]}…{addr[-4:]}", callback_data=f"fav_acct:{addr}")]
         for addr in favs
     ]
+    buttons.append([InlineKeyboardButton("🔄 Refresh All", callback_data="fav_refresh")])
     await send(
         "🌟 Your Favorite Accounts:\n\n"
         "Click one to manage it:",
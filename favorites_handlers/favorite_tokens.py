@@ -16,7 +16,7 @@ async def favorite_tokens(update: Update, context: ContextTypes.DEFAULT_TYPE):
         send = update.message.reply_text
 
     user_id = update.effective_user.id
-    favs = get_user_favorites(user_id)["tokens"]
+    favs = (await get_user_favorites(user_id))["tokens"]
     if not favs:
         await send(
             "⭐ You have no favorite tokens yet.\n"
@@ -28,6 +28,7 @@ async def favorite_tokens(update: Update, context: ContextTypes.DEFAULT_TYPE):
         [InlineKeyboardButton(f"{mint[:6]}…{mint[-4:]}", callback_data=f"fav_token:{mint}")]
         for mint in favs
     ]
+    buttons.append([InlineKeyboardButton("🔄 Refresh All", callback_data="fav_refresh")])
     await send(
         "🌟 Your Favorite Tokens:\n\n"
         "Click one to manage it:",
@@ -1,59 +1,41 @@
 # handlers/accounts.py
-import requests
+import asyncio
+import logging
+import re
 import aiohttp
 from datetime import datetime
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update
-from telegram.ext import CallbackQueryHandler, MessageHandler, filters, ContextTypes
+from telegram.ext import ContextTypes
 from handlers.state import USER_STATE, CANCEL_BUTTON
+from services.vybe_client import vybe
+
+logger = logging.getLogger(__name__)
 
 def chunk_message(text: str, size: int = 4096) -> list:
     return [text[i:i+size] for i in range(0, len(text), size)]
 
 async def fetch_known_accounts() -> list:
     """Fetch known accounts from Vybe API"""
-    url = "https://api.vybenetwork.xyz/account/known-accounts"
-    headers = {
-        "accept": "application/json",
-        "X-API-KEY": __import__("os").getenv("VYBE_API_KEY")
-    }
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, headers=headers) as resp:
-                resp.raise_for_status()
-                data = await resp.json()
-                return data.get("accounts", [])
+        data = await vybe.get("/account/known-accounts")
+        return data.get("accounts", [])
     except Exception as e:
-        print(f"Error fetching known accounts: {e}")
+        logger.warning(f"Error fetching known accounts: {e!r}")
         return []
 
 async def fetch_balance_ts(owner: str) -> list:
     """Fetch balance time series for a wallet"""
-    url = f"https://api.vybenetwork.xyz/account/token-balance-ts/{owner}"
-    headers = {
-        "accept": "application/json",
-        "X-API-KEY": __import__("os").getenv("VYBE_API_KEY")
-    }
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, headers=headers) as resp:
-                resp.raise_for_status()
-                data = await resp.json()
-                return data.get("data", [])
+        data = await vybe.get(f"/account/token-balance-ts/{owner}")
+        return data.get("data", [])
     except Exception as e:
-        print(f"Error fetching balance time series: {e}")
+        logger.warning(f"Error fetching balance time series for {owner}: {e!r}")
         return []
 
 async def get_wallet_balance(wallet_address: str) -> str:
     """Get formatted wallet balance"""
-    url = f"https://api.vybenetwork.xyz/account/token-balance/{wallet_address}"
-    headers = {
-        "accept": "application/json",
-        "X-API-KEY": __import__("os").getenv("VYBE_API_KEY")
-    }
     try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-        data = response.json()
+        data = await vybe.get(f"/account/token-balance/{wallet_address}")
         
         ts = data.get('date')
         formatted_date = datetime.fromtimestamp(ts/1000).strftime('%Y-%m-%d %H:%M:%S') if ts else "Unknown"
@@ -71,7 +53,7 @@ async def get_wallet_balance(wallet_address: str) -> str:
             f"💵 Value: ${val:.2f}\n"
             f"🔒 Staked SOL: {staked:.4f}"
         )
-    except requests.exceptions.RequestException as e:
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
         return f"❌ Error fetching balance: {str(e)}"
     except Exception as e:
         return f"❌ Unexpected error: {str(e)}"
@@ -211,11 +193,8 @@ async def cancel_operation(update: Update, context: ContextTypes.DEFAULT_TYPE):
         ])
     )
 
-handlers = [
-    CallbackQueryHandler(accounts_callback, pattern="^acct_"),
-    CallbackQueryHandler(cancel_operation, pattern="^cancel_operation$"),
-    MessageHandler(
-        filters.TEXT & ~filters.COMMAND & filters.Regex(r'^[1-9A-HJ-NP-Za-km-z]{32,44}$'),
-        handle_accounts_input
-    )
-]
\ No newline at end of file
+# Registered with handlers/router.py
+callback_routes = [
+    ("acct_", accounts_callback),
+]
+text_route = (re.compile(r'^[1-9A-HJ-NP-Za-km-z]{32,44}$'), handle_accounts_input)
\ No newline at end of file
@@ -0,0 +1,56 @@
+# handlers/admin.py
+from telegram import Update
+from telegram.ext import CommandHandler, ContextTypes
+from config import ADMIN_USER_IDS
+from services.vybe_client import vybe
+from services.browser_pool import browser_pool
+from services.screenshots import screenshot_cache
+from services.chart_renderer import chart_renderer
+from services.chart_cache import chart_cache
+from services import cached_photo
+from handlers.state import USER_STATE
+from handlers.router import stats as router_stats
+from services.update_processor import update_processor
+from services.whale_feed import whale_feed
+from services.whale_push import whale_pusher
+from services.token_catalog import token_catalog
+from services.ohlcv_store import ohlcv_store
+
+# Named stat providers shown by /stats; add a service's stats() here to show it.
+STATS_PROVIDERS = {
+    "api_cache": vybe.stats,
+    "browser_pool": browser_pool.stats,
+    "screenshots": screenshot_cache.stats,
+    "chart_renderer": chart_renderer.stats,
+    "chart_cache": chart_cache.stats,
+    "photo_sends": cached_photo.stats,
+    "flows": USER_STATE.stats,
+    "routing": router_stats,
+    "updates": update_processor.stats,
+    "whale_feed": whale_feed.stats,
+    "whale_push": whale_pusher.stats,
+    "token_catalog": token_catalog.stats,
+    "ohlcv_store": ohlcv_store.stats,
+}
+
+def collect_stats() -> dict:
+    """Snapshot the counters of every service in STATS_PROVIDERS."""
+    return {name: provider() for name, provider in STATS_PROVIDERS.items()}
+
+def format_stats(stats: dict) -> str:
+    lines = ["📟 *Bot Stats*"]
+    for name, values in stats.items():
+        lines.append(f"\n*{name}*")
+        for key, value in values.items():
+            lines.append(f"• {key}: `{value}`")
+    return "\n".join(lines)
+
+async def show_stats(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Admin-only /stats command with cache and service counters."""
+    if update.effective_user.id not in ADMIN_USER_IDS:
+        return
+    await update.message.reply_text(format_stats(collect_stats()), parse_mode="Markdown")
+
+handlers = [
+    CommandHandler("stats", show_stats)
+]
@@ -1,9 +1,11 @@
 # handlers/chart.py
+import re
 import time
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update
-from telegram.ext import CallbackQueryHandler, MessageHandler, filters, ContextTypes
+from telegram.ext import ContextTypes
 from datetime import datetime, UTC
-from slashcommands.slashutils import fetch_ohlcv_data, generate_price_chart, get_token_name_for_chart
+from slashcommands.slashutils import get_price_chart, get_token_name_for_chart
+from services.cached_photo import reply_cached_photo
 from handlers.state import USER_STATE, CANCEL_BUTTON
 import logging
 
@@ -63,6 +65,11 @@ async def chart_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 async def handle_chart_input(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Process user input like /chart command"""
+    # One input at a time per user, so a message sent mid-render can't start a second chart.
+    async with USER_STATE.lock(update.effective_user.id):
+        return await _handle_chart_input(update, context)
+
+async def _handle_chart_input(update: Update, context: ContextTypes.DEFAULT_TYPE):
     uid = update.effective_user.id
     state = USER_STATE.get(uid, {})
     text = update.message.text.strip()
@@ -108,19 +115,13 @@ async def handle_chart_input(update: Update, context: ContextTypes.DEFAULT_TYPE)
             time_end = int(time.time())
             time_start = time_end - (days * 24 * 60 * 60)
             
-            logger.debug(f"handle_chart_input: User {uid} fetching OHLCV for mint {mint_address}, {days} days")
-            ohlcv_data = await fetch_ohlcv_data(mint_address, resolution, time_start, time_end)
-            if not ohlcv_data:
+            logger.debug(f"handle_chart_input: User {uid} fetching chart for mint {mint_address}")
+            chart_image = await get_price_chart(mint_address, resolution, time_start, time_end)
+            if not chart_image:
                 logger.warning(f"handle_chart_input: No OHLCV data for mint {mint_address}")
                 await update.message.reply_text("No data available for the provided mint address.")
                 return True  # Stop propagation
                 
-            logger.debug(f"handle_chart_input: User {uid} generating chart for mint {mint_address}")
-            chart_image = await generate_price_chart(ohlcv_data)
-            if not chart_image:
-                logger.error(f"handle_chart_input: Failed to generate chart for mint {mint_address}")
-                raise ValueError("Failed to generate price chart")
-                
             logger.debug(f"handle_chart_input: User {uid} fetching token name for mint {mint_address}")
             token_name = await get_token_name_for_chart(mint_address)
             if not token_name:
@@ -128,7 +129,7 @@ async def handle_chart_input(update: Update, context: ContextTypes.DEFAULT_TYPE)
                 logger.warning(f"handle_chart_input: No token name for mint {mint_address}")
                 
             await update.message.reply_text(f"*{token_name}* 📈 Price Chart:", parse_mode="Markdown")
-            await update.message.reply_photo(photo=chart_image)
+            await reply_cached_photo(update.message, chart_image)
             await update.message.reply_text(
                 f"🔔 See more insights: https://alpha.vybenetwork.com/tokens/{mint_address}",
                 parse_mode="Markdown"
@@ -141,19 +142,13 @@ async def handle_chart_input(update: Update, context: ContextTypes.DEFAULT_TYPE)
                 raise ValueError("Invalid mint address. Use 32-44 base58 characters (e.g., JBu1AL4obBcCMqKBBxhpWCNUt136ijcuMZLFvTP7iWdB)")
                 
             resolution = "1d"
-            logger.debug(f"handle_chart_input: User {uid} fetching custom OHLCV for mint {mint_address}")
-            ohlcv_data = await fetch_ohlcv_data(mint_address, resolution, state["start"], state["end"])
-            if not ohlcv_data:
+            logger.debug(f"handle_chart_input: User {uid} fetching custom chart for mint {mint_address}")
+            chart_image = await get_price_chart(mint_address, resolution, state["start"], state["end"])
+            if not chart_image:
                 logger.warning(f"handle_chart_input: No OHLCV data for mint {mint_address}")
                 await update.message.reply_text("No data available for the provided mint address.")
                 return True  # Stop propagation
                 
-            logger.debug(f"handle_chart_input: User {uid} generating custom chart for mint {mint_address}")
-            chart_image = await generate_price_chart(ohlcv_data)
-            if not chart_image:
-                logger.error(f"handle_chart_input: Failed to generate custom chart for mint {mint_address}")
-                raise ValueError("Failed to generate price chart")
-                
             logger.debug(f"handle_chart_input: User {uid} fetching token name for mint {mint_address}")
             token_name = await get_token_name_for_chart(mint_address)
             if not token_name:
@@ -161,7 +156,7 @@ async def handle_chart_input(update: Update, context: ContextTypes.DEFAULT_TYPE)
                 logger.warning(f"handle_chart_input: No token name for mint {mint_address}")
                 
             await update.message.reply_text(f"*{token_name}* 📈 Price Chart:", parse_mode="Markdown")
-            await update.message.reply_photo(photo=chart_image)
+            await reply_cached_photo(update.message, chart_image)
             await update.message.reply_text(
                 f"🔔 See more insights: https://alpha.vybenetwork.com/tokens/{mint_address}",
                 parse_mode="Markdown"
@@ -208,15 +203,15 @@ async def cancel_operation(update: Update, context: ContextTypes.DEFAULT_TYPE):
         ])
     )
 
-handlers = [
-    CallbackQueryHandler(start_chart, pattern="^menu_chart$"),
-    CallbackQueryHandler(chart_callback, pattern="^chart_"),
-    CallbackQueryHandler(cancel_operation, pattern="^cancel_operation$"),
-    MessageHandler(
-        filters.TEXT & ~filters.COMMAND & (
-            filters.Regex(r'^[1-9A-HJ-NP-Za-km-z]{32,44}$') |  # Mint address
-            filters.Regex(r'^\d+\s+\d+$')  # Timestamps
-        ),
-        handle_chart_input
-    )
-]
\ No newline at end of file
+# Registered with handlers/router.py
+callback_routes = [
+    ("menu_chart", start_chart),
+    ("chart_", chart_callback),
+]
+text_route = (
+    re.compile(
+        r'^[1-9A-HJ-NP-Za-km-z]{32,44}$'  # Mint address
+        r'|^\d+\s+\d+$'                   # Timestamps
+    ),
+    handle_chart_input
+)
\ No newline at end of file
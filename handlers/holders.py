@@ -1,49 +1,36 @@
-import aiohttp
+import logging
+import re
 from datetime import datetime
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update
-from telegram.ext import CallbackQueryHandler, MessageHandler, filters, ContextTypes
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
+from telegram.ext import ContextTypes
 from io import BytesIO
 
 from handlers.state import USER_STATE, CANCEL_BUTTON
+from services.vybe_client import vybe
+from services.chart_renderer import chart_renderer
+from charts import renderers
+
+logger = logging.getLogger(__name__)
 
 def chunk_message(text: str, size: int = 4096) -> list:
     return [text[i:i+size] for i in range(0, len(text), size)]
 
 async def fetch_top_holders(mint: str, count: int) -> list:
     """Fetch top holders from Vybe API"""
-    url = f"https://api.vybenetwork.xyz/token/{mint}/top-holders"
-    headers = {
-        "accept": "application/json",
-        "X-API-KEY": __import__("os").getenv("VYBE_API_KEY"),
-    }
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, headers=headers) as resp:
-                resp.raise_for_status()
-                data = await resp.json()
-                return data.get("data", [])[:count]
+        data = await vybe.get(f"/token/{mint}/top-holders")
+        return data.get("data", [])[:count]
     except Exception as e:
-        print(f"Error fetching top holders: {e}")
+        logger.warning(f"Error fetching top holders for {mint}: {e!r}")
         return []
 
 async def fetch_holders_ts(mint: str) -> list:
     """Fetch holders time series data"""
-    url = f"https://api.vybenetwork.xyz/token/{mint}/holders-ts"
-    headers = {
-        "accept": "application/json",
-        "X-API-KEY": __import__("os").getenv("VYBE_API_KEY"),
-    }
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, headers=headers) as resp:
-                resp.raise_for_status()
-                data = await resp.json()
-                return data.get("data", [])
+        data = await vybe.get(f"/token/{mint}/holders-ts")
+        return data.get("data", [])
     except Exception as e:
-        print(f"Error fetching holders TS: {e}")
+        logger.warning(f"Error fetching holders TS for {mint}: {e!r}")
         return []
 
 async def start_holders(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -111,7 +98,7 @@ async def handle_holders_input(update: Update, context: ContextTypes.DEFAULT_TYP
             
             holders = await fetch_top_holders(mint, count)
             if holders:
-                buf = generate_holders_chart(holders, mint, count)
+                buf = await generate_holders_chart(holders, mint, count)
                 if buf:
                     token_symbol = holders[0].get("tokenSymbol", "N/A")
                     display_name = token_symbol if token_symbol != "N/A" else mint
@@ -140,63 +127,15 @@ async def handle_holders_input(update: Update, context: ContextTypes.DEFAULT_TYP
         USER_STATE.pop(uid, None)
         await show_followup_menu(update)
 
-def generate_holders_chart(holders, mint, count):
+async def generate_holders_chart(holders, mint, count):
     """Generate a bar chart for top holders"""
     try:
-        # Prepare data
-        balances = []
-        percentages = []
-        labels = []
-        for holder in holders:
-            try:
-                balance = float(holder.get("balance", 0))
-            except (ValueError, TypeError):
-                balance = 0.0
-            balances.append(balance)
-            try:
-                percentage = float(holder.get("percentageOfSupplyHeld", 0))
-            except (ValueError, TypeError):
-                percentage = 0.0
-            percentages.append(percentage)
-            name = holder.get("ownerName")
-            if name:
-                label = name[:20]
-            else:
-                addr = holder.get("ownerAddress", "Unknown")
-                label = f"{addr[:4]}...{addr[-4:]}"
-            labels.append(label)
-
-        # Generate chart
-        fig, ax1 = plt.subplots(figsize=(10, 8))
-        ax1.bar(labels, balances, color="skyblue", alpha=0.6, label="Amount Held")
-        ax1.set_xlabel("Holder")
-        ax1.set_ylabel("Amount Held", color="skyblue")
-        ax1.tick_params(axis="y", labelcolor="skyblue")
-        ax1.set_xticks(range(len(labels)))
-        ax1.set_xticklabels(labels, rotation=90, ha="center", fontsize=7)
-
-        ax2 = ax1.twinx()
-        ax2.plot(labels, percentages, color="orange", marker="o", label="% Supply Held")
-        ax2.set_ylabel("% Supply Held", color="orange")
-        ax2.tick_params(axis="y", labelcolor="orange")
-
         token_symbol = holders[0].get("tokenSymbol", None)
         display_name = token_symbol if token_symbol and token_symbol != "N/A" else mint
-        plt.title(f"Top {count} Holders of {display_name}")
-
-        lines1, labels1 = ax1.get_legend_handles_labels()
-        lines2, labels2 = ax2.get_legend_handles_labels()
-        ax1.legend(lines1 + lines2, labels1 + labels2, loc="upper right")
-
-        plt.tight_layout()
-
-        buf = BytesIO()
-        plt.savefig(buf, format="png", bbox_inches="tight")
-        buf.seek(0)
-        plt.close()
-        return buf
+        payload = renderers.holders_payload(holders, f"Top {count} Holders of {display_name}")
+        return BytesIO(await chart_renderer.render("holders", payload))
     except Exception as e:
-        print(f"Error generating chart: {e}")
+        logger.error(f"Error generating holders chart for {mint}: {e!r}")
         return None
 
 def format_top_holders(mint: str, holders: list) -> str:
@@ -262,15 +201,12 @@ async def cancel_operation(update: Update, context: ContextTypes.DEFAULT_TYPE):
         ])
     )
 
-handlers = [
-    CallbackQueryHandler(start_holders, pattern="^menu_holders$"),
-    CallbackQueryHandler(holders_callback, pattern="^holders_"),
-    CallbackQueryHandler(cancel_operation, pattern="^cancel_operation$"),
-    MessageHandler(
-        filters.TEXT & ~filters.COMMAND & (
-            filters.Regex(r'^[1-9A-HJ-NP-Za-km-z]{32,44}\s+\d+$') |  # Mint + count
-            filters.Regex(r'^[1-9A-HJ-NP-Za-km-z]{32,44}$')  # Mint only
-        ),
-        handle_holders_input
-    )
-]
\ No newline at end of file
+# Registered with handlers/router.py
+callback_routes = [
+    ("menu_holders", start_holders),
+    ("holders_", holders_callback),
+]
+text_route = (
+    re.compile(r'^[1-9A-HJ-NP-Za-km-z]{32,44}(\s+\d+)?$'),  # Mint, optionally followed by a count
+    handle_holders_input
+)
\ No newline at end of file
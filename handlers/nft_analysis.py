@@ -1,31 +1,27 @@
 # handlers/nft_analysis.py
-import aiohttp
+import logging
+import re
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update
-from telegram.ext import CallbackQueryHandler, MessageHandler, filters, ContextTypes
+from telegram.ext import ContextTypes
 from handlers.state import USER_STATE, CANCEL_BUTTON
-import matplotlib.pyplot as plt
+from services.vybe_client import vybe
+from services.chart_renderer import chart_renderer
+from charts import renderers
 from io import BytesIO
 from collections import defaultdict
 
+logger = logging.getLogger(__name__)
+
 def chunk_message(text: str, size: int = 4096) -> list:
     return [text[i:i+size] for i in range(0, len(text), size)]
 
 async def fetch_nft_owners(collection_address: str) -> list:
     """Fetch NFT collection owners from Vybe API"""
-    url = f"https://api.vybenetwork.xyz/nft/collection-owners/{collection_address}"
-    headers = {
-        "accept": "application/json",
-        "X-API-KEY": __import__("os").getenv("VYBE_API_KEY"),
-    }
-    
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, headers=headers) as resp:
-                resp.raise_for_status()
-                data = await resp.json()
-                return data.get("data", [])
+        data = await vybe.get(f"/nft/collection-owners/{collection_address}")
+        return data.get("data", [])
     except Exception as e:
-        print(f"Error fetching NFT owners: {e}")
+        logger.warning(f"Error fetching NFT owners for {collection_address}: {e!r}")
         return []
 
 def analyze_nft_distribution(owners: list) -> dict:
@@ -36,23 +32,14 @@ def analyze_nft_distribution(owners: list) -> dict:
         distribution[address] += 1
     return dict(sorted(distribution.items(), key=lambda x: x[1], reverse=True))
 
-def generate_distribution_chart(distribution: dict) -> BytesIO:
+async def generate_distribution_chart(distribution: dict) -> BytesIO:
     """Generate ownership distribution chart"""
     top_holders = list(distribution.items())[:10]
     labels = [f"{addr[:3]}..{addr[-3]}" for addr, _ in top_holders]
     counts = [count for _, count in top_holders]
 
-    plt.figure(figsize=(10, 5))
-    plt.barh(labels, counts, color='purple')
-    plt.xlabel('Number of NFTs')
-    plt.title('Top 10 NFT Holders')
-    plt.gca().invert_yaxis()
-    
-    buf = BytesIO()
-    plt.savefig(buf, format='png', bbox_inches='tight')
-    plt.close()
-    buf.seek(0)
-    return buf
+    png = await chart_renderer.render("distribution", renderers.bar_payload(labels, counts))
+    return BytesIO(png)
 
 async def start_nft(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Initiate NFT analysis flow"""
@@ -85,7 +72,7 @@ async def handle_nft_input(update: Update, context: ContextTypes.DEFAULT_TYPE):
             raise ValueError("No owners found for this collection")
             
         distribution = analyze_nft_distribution(owners)
-        chart_image = generate_distribution_chart(distribution)
+        chart_image = await generate_distribution_chart(distribution)
         
         # Build response message
         total_owners = len(distribution)
@@ -157,11 +144,8 @@ async def cancel_operation(update: Update, context: ContextTypes.DEFAULT_TYPE):
         ])
     )
 
-handlers = [
-    CallbackQueryHandler(start_nft, pattern="^menu_nft$"),
-    CallbackQueryHandler(cancel_operation, pattern="^cancel_operation$"),
-    MessageHandler(
-        filters.TEXT & ~filters.COMMAND & filters.Regex(r'^[1-9A-HJ-NP-Za-km-z]{32,44}$'),
-        handle_nft_input
-    )
-]
\ No newline at end of file
+# Registered with handlers/router.py
+callback_routes = [
+    ("menu_nft", start_nft),
+]
+text_route = (re.compile(r'^[1-9A-HJ-NP-Za-km-z]{32,44}$'), handle_nft_input)
\ No newline at end of file
@@ -1,47 +1,32 @@
 # handlers/prices.py
-import aiohttp
+import logging
+import re
 from datetime import datetime, UTC
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update
-from telegram.ext import CallbackQueryHandler, MessageHandler, filters, ContextTypes
+from telegram.ext import ContextTypes
 from handlers.state import USER_STATE, CANCEL_BUTTON
+from services.vybe_client import vybe
+from services.token_catalog import token_catalog
+
+logger = logging.getLogger(__name__)
 
 def chunk_message(text: str, size: int = 4096) -> list:
     return [text[i:i+size] for i in range(0, len(text), size)]
 
-async def fetch_tokens(page: int = 1) -> list:
-    """Fetch tokens from Vybe API with pagination"""
-    url = "https://api.vybenetwork.xyz/tokens"
-    headers = {
-        "accept": "application/json",
-        "X-API-KEY": __import__("os").getenv("VYBE_API_KEY"),
-    }
-    params = {"page": page}
-    
+async def fetch_tokens(count: int) -> list:
+    """First `count` tokens from the in-memory token catalog"""
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, headers=headers, params=params) as resp:
-                resp.raise_for_status()
-                data = await resp.json()
-                return data.get("data", [])
+        return await token_catalog.top(count, filter_zero_price=False)
     except Exception as e:
-        print(f"Error fetching tokens: {e}")
+        logger.warning(f"Error fetching tokens: {e!r}")
         return []
 
 async def fetch_token_details(mint: str) -> dict:
     """Fetch detailed information for a single token"""
-    url = f"https://api.vybenetwork.xyz/token/{mint}"
-    headers = {
-        "accept": "application/json",
-        "X-API-KEY": __import__("os").getenv("VYBE_API_KEY"),
-    }
-    
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, headers=headers) as resp:
-                resp.raise_for_status()
-                return await resp.json()
+        return await vybe.get(f"/token/{mint}")
     except Exception as e:
-        print(f"Error fetching token details: {e}")
+        logger.warning(f"Error fetching token details for {mint}: {e!r}")
         return {}
 
 async def start_prices(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -106,8 +91,8 @@ async def handle_prices_input(update: Update, context: ContextTypes.DEFAULT_TYPE
             if count < 1 or count > 25:
                 raise ValueError("Please enter between 1-25")
             
-            tokens = await fetch_tokens()
-            response = format_top_tokens(tokens[:count])
+            tokens = await fetch_tokens(count)
+            response = format_top_tokens(tokens)
             
         else:
             mint = text
@@ -198,15 +183,15 @@ async def cancel_operation(update: Update, context: ContextTypes.DEFAULT_TYPE):
         ])
     )
 
-handlers = [
-    CallbackQueryHandler(start_prices, pattern="^menu_prices$"),
-    CallbackQueryHandler(prices_callback, pattern="^prices_"),
-    CallbackQueryHandler(cancel_operation, pattern="^cancel_operation$"),
-    MessageHandler(
-        filters.TEXT & ~filters.COMMAND & (
-            filters.Regex(r"^\d+$") |  # Number input
-            filters.Regex(r"^[1-9A-HJ-NP-Za-km-z]{32,44}$")  # Mint address
-        ),
-        handle_prices_input
-    )
-]
\ No newline at end of file
+# Registered with handlers/router.py
+callback_routes = [
+    ("menu_prices", start_prices),
+    ("prices_", prices_callback),
+]
+text_route = (
+    re.compile(
+        r"^\d+$"                          # Number input
+        r"|^[1-9A-HJ-NP-Za-km-z]{32,44}$"  # Mint address
+    ),
+    handle_prices_input
+)
\ No newline at end of file
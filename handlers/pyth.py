@@ -1,8 +1,9 @@
-import aiohttp
+import asyncio
 import re
+import time
 from datetime import datetime, timedelta, UTC
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update
-from telegram.ext import CallbackQueryHandler, MessageHandler, filters, ContextTypes
+from telegram.ext import ContextTypes
 import logging
 
 # Setup logging
@@ -10,29 +11,69 @@ logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(name)s - %(leve
 logger = logging.getLogger(__name__)
 
 from handlers.state import USER_STATE, CANCEL_BUTTON
+from services.vybe_client import vybe
+from services.chart_renderer import chart_renderer
+from services.chart_cache import chart_cache, chart_key
+from services.cached_photo import reply_cached_photo
+from charts import renderers
+from config import PYTH_MAX_FEEDS, PYTH_FETCH_CONCURRENCY
+from favorites_handlers import db
+
+FEED_ID = re.compile(r'^[1-9A-HJ-NP-Za-km-z]{32,44}$')
+# Shorter than any feed ID, so a list name can't be mistaken for one.
+LIST_NAME = re.compile(r'^[A-Za-z][\w-]{0,23}$')
 
 def chunk_message(text: str, size: int = 4096) -> list:
     return [text[i:i+size] for i in range(0, len(text), size)]
 
 async def fetch_pyth_data(endpoint: str, identifier: str, params: dict = None) -> dict:
     """Generic Pyth data fetcher"""
-    url = f"https://api.vybenetwork.xyz/price/{identifier}/{endpoint}"
-    headers = {
-        "accept": "application/json",
-        "X-API-KEY": __import__("os").getenv("VYBE_API_KEY"),
-    }
-    
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, headers=headers, params=params) as resp:
-                resp.raise_for_status()
-                data = await resp.json()
-                logger.debug(f"fetch_pyth_data: Fetched {endpoint} for {identifier} with params {params}: {data}")
-                return data
+        data = await vybe.get(f"/price/{identifier}/{endpoint}", params=params)
+        logger.debug(f"fetch_pyth_data: Fetched {endpoint} for {identifier} with params {params}: {data}")
+        return data
     except Exception as e:
         logger.error(f"Pyth API Error ({endpoint}, {identifier}, params={params}): {e}")
         return {}
 
+def parse_feed_ids(text: str) -> list:
+    """Feed IDs separated by spaces and/or commas, deduplicated in order."""
+    feed_ids = list(dict.fromkeys(part for part in re.split(r'[\s,]+', text) if part))
+    invalid = [part for part in feed_ids if not FEED_ID.match(part)]
+    if invalid:
+        raise ValueError(f"Invalid Price Feed Code: {invalid[0]}. Use valid codes (32-44 characters).")
+    if not feed_ids:
+        raise ValueError("Enter at least one Price Feed Code.")
+    if len(feed_ids) > PYTH_MAX_FEEDS:
+        raise ValueError(f"At most {PYTH_MAX_FEEDS} feeds per lookup.")
+    return feed_ids
+
+async def resolve_feed_ids(user_id: int, text: str) -> list:
+    """Feed IDs from text, or from the user's saved list when text is a list name."""
+    text = text.strip()
+    if LIST_NAME.match(text):
+        feed_ids = (await db.get_pyth_lists(user_id)).get(text.lower())
+        if feed_ids is None:
+            raise ValueError(f"No saved list named '{text}'. Save one with /pyth save <name> <feed IDs>")
+        return feed_ids
+    return parse_feed_ids(text)
+
+async def fetch_pyth_prices(feed_ids: list) -> dict:
+    """feed_id -> pyth-price result ({} on failure), fetched concurrently.
+
+    Each feed goes through vybe.get, so feeds looked up in the last few
+    seconds are served from its per-request cache and identical lookups in
+    flight are shared.
+    """
+    slots = asyncio.Semaphore(PYTH_FETCH_CONCURRENCY)
+
+    async def fetch(feed_id):
+        async with slots:
+            return await fetch_pyth_data(endpoint="pyth-price", identifier=feed_id)
+
+    results = await asyncio.gather(*(fetch(feed_id) for feed_id in feed_ids))
+    return dict(zip(feed_ids, results))
+
 async def start_pyth(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Initiate Pyth oracle menu"""
     await update.callback_query.answer()
@@ -66,7 +107,7 @@ async def pyth_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     }
     
     prompts = {
-        "price": "🔎 Enter the Price Feed Code (e.g., JBu1AL4obBcCMqKBBxhpWCNUt136ijcuMZLFvTP7iWdB):",
+        "price": "🔎 Enter one or more Price Feed Codes separated by spaces or commas (e.g., JBu1AL4obBcCMqKBBxhpWCNUt136ijcuMZLFvTP7iWdB), or the name of a list saved with /pyth save:",
         "ohlc": "📝 Format: <FeedID> <Interval> <Start> <End>\nExample: `JBu1AL4obBcCMqKBBxhpWCNUt136ijcuMZLFvTP7iWdB hourly 2025-04-24 2025-04-30`",
         "ts": "📝 Format: <FeedID> <Interval> <Start> <End>\nExample: `JBu1AL4obBcCMqKBBxhpWCNUt136ijcuMZLFvTP7iWdB every 4 hours 2025-04-24 2025-04-30`"
     }
@@ -102,20 +143,25 @@ async def handle_pyth_input(update: Update, context: ContextTypes.DEFAULT_TYPE):
         logger.debug(f"handle_pyth_input: Skipping, not in pyth flow for user {uid}")
         return False  # Allow other handlers to process
     
+    data_type = state.get("type")
+    if data_type is None:
+        # Still on the menu: no data type chosen, so the text isn't input for us.
+        logger.debug(f"handle_pyth_input: Skipping, no data type chosen yet for user {uid}")
+        return False
+
     text = update.message.text.strip()
-    data_type = state["type"]
+    chart_image = None
     
     try:
         if data_type == "price":
-            # Validate ID as Solana public key (32-44 base58 characters)
-            if not (32 <= len(text) <= 44 and all(c in "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz" for c in text)):
-                raise ValueError("Invalid Price Feed Code. Use a valid code (32-44 characters).")
-                
-            # Simple ID-based lookup
-            result = await fetch_pyth_data(endpoint="pyth-price", identifier=text)
-            if not result:
+            feed_ids = await resolve_feed_ids(uid, text)
+            results = await fetch_pyth_prices(feed_ids)
+            if not any(results.values()):
                 raise ValueError("No data returned from API")
-            response = format_simple_result(result, data_type)
+            if len(feed_ids) == 1:
+                response = format_simple_result(results[feed_ids[0]], data_type)
+            else:
+                response = format_price_table(results)
             
         else:
             # OHLC/TS requires parameters parsing
@@ -167,10 +213,14 @@ async def handle_pyth_input(update: Update, context: ContextTypes.DEFAULT_TYPE):
             if not data or not data.get("data"):
                 raise ValueError("No data available for the specified time range")
             response = format_time_data(data, data_type)
+            if data_type == "ohlc":
+                chart_image = await get_pyth_candle_chart(feed_id, api_resolution, time_start, time_end, data["data"])
             
         # Send response in chunks
         for chunk in chunk_message(response):
             await update.message.reply_text(chunk, parse_mode="Markdown")
+        if chart_image:
+            await reply_cached_photo(update.message, chart_image)
             
     except ValueError as e:
         error_msg = f"❌ Invalid input: {str(e)}\nPlease try again:"
@@ -188,6 +238,17 @@ async def handle_pyth_input(update: Update, context: ContextTypes.DEFAULT_TYPE):
         logger.info(f"handle_pyth_input: User {uid} stopping propagation")
         return True  # Stop propagation
 
+async def get_pyth_candle_chart(feed_id: str, resolution: str, time_start: int, time_end: int, data_list: list):
+    """Candlestick chart of pyth-price-ohlc items, cached like the token charts"""
+    async def render():
+        payload = renderers.pyth_candle_payload(data_list, f"Pyth Price ({resolution} candles)")
+        if not len(payload["times"]):
+            return None
+        return await chart_renderer.render("candles", payload)
+
+    key, ttl = chart_key("pyth-candles", feed_id, resolution, time_start, time_end)
+    return await chart_cache.get_or_render(key, ttl, render)
+
 def format_simple_result(data: dict, data_type: str) -> str:
     """Format simple price response"""
     if not data:
@@ -205,6 +266,40 @@ def format_simple_result(data: dict, data_type: str) -> str:
         )
     return "❌ Invalid data type"
 
+def _short_id(feed_id: str) -> str:
+    return f"{feed_id[:4]}…{feed_id[-4:]}"
+
+def _format_price(value: float) -> str:
+    return f"{value:,.2f}" if abs(value) >= 1 else f"{value:.4g}"
+
+def _format_age(seconds: float) -> str:
+    if seconds < 60:
+        return f"{seconds:.0f}s"
+    if seconds < 3600:
+        return f"{seconds / 60:.0f}m"
+    return f"{seconds / 3600:.0f}h"
+
+def format_price_table(results: dict) -> str:
+    """One monospace table for several pyth-price results, in the order given."""
+    now = time.time()
+    rows = []
+    for feed_id, data in results.items():
+        try:
+            price = float(data["price"])
+            confidence = float(data.get("confidence") or 0)
+        except (KeyError, TypeError, ValueError):
+            rows.append((_short_id(feed_id), "n/a", "", ""))
+            continue
+        updated = data.get("lastUpdated")
+        age = _format_age(max(0, now - updated)) if updated else ""
+        rows.append((_short_id(feed_id), _format_price(price), "±" + _format_price(confidence), age))
+    widths = [max(len(row[i]) for row in rows) for i in range(4)]
+    lines = [
+        f"{feed:<{widths[0]}}  {price:>{widths[1]}}  {conf:>{widths[2]}}  {age:>{widths[3]}}".rstrip()
+        for feed, price, conf, age in rows
+    ]
+    return f"📈 *Current Prices ({len(results)} feeds)*\n```\n" + "\n".join(lines) + "\n```"
+
 def format_time_data(data: dict, data_type: str) -> str:
     """Format time series data"""
     data_list = data.get('data', [])
@@ -271,15 +366,16 @@ async def cancel_operation(update: Update, context: ContextTypes.DEFAULT_TYPE):
         ])
     )
 
-handlers = [
-    CallbackQueryHandler(start_pyth, pattern="^menu_pyth$"),
-    CallbackQueryHandler(pyth_callback, pattern="^pyth_"),
-    CallbackQueryHandler(cancel_operation, pattern="^cancel_operation$"),
-    MessageHandler(
-        filters.TEXT & ~filters.COMMAND & (
-            filters.Regex(r'^\s*[1-9A-HJ-NP-Za-km-z]{32,44}\s*$') |  # Solana public key
-            filters.Regex(r'^\s*[1-9A-HJ-NP-Za-km-z]{32,44}\s+(hourly|every\s+4\s+hours|daily|every\s+minute|every\s+5\s+minutes|every\s+15\s+minutes|every\s+30\s+minutes)\s+\d{4}-\d{2}-\d{2}\s+\d{4}-\d{2}-\d{2}\s*$')  # FeedID Interval YYYY-MM-DD YYYY-MM-DD
-        ),
-        handle_pyth_input
-    )
-]
\ No newline at end of file
+# Registered with handlers/router.py
+callback_routes = [
+    ("menu_pyth", start_pyth),
+    ("pyth_", pyth_callback),
+]
+text_route = (
+    re.compile(
+        r'^\s*[1-9A-HJ-NP-Za-km-z]{32,44}(?:[\s,]+[1-9A-HJ-NP-Za-km-z]{32,44})*[\s,]*$'  # one or more feed IDs
+        r'|^\s*[A-Za-z][\w-]{0,23}\s*$'  # saved feed list name
+        r'|^\s*[1-9A-HJ-NP-Za-km-z]{32,44}\s+(hourly|every\s+4\s+hours|daily|every\s+minute|every\s+5\s+minutes|every\s+15\s+minutes|every\s+30\s+minutes)\s+\d{4}-\d{2}-\d{2}\s+\d{4}-\d{2}-\d{2}\s*$'  # FeedID Interval YYYY-MM-DD YYYY-MM-DD
+    ),
+    handle_pyth_input
+)
\ No newline at end of file
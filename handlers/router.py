@@ -0,0 +1,171 @@
+# handlers/router.py
+"""Central dispatch for free-text input and callback queries.
+
+Instead of registering one MessageHandler per flow (each re-running its
+regex filters on every message, with only the first match ever firing) and
+one CallbackQueryHandler per pattern, the bot registers one handler of
+each kind here:
+
+* text: look up the user's active flow once and hand the message to that
+  flow's input handler if it matches the flow's input pattern, then stop
+  later handler groups (handle_typos) from seeing it.
+* callbacks: look callback_data up in a table of exact keys and prefixes
+  (keys ending in "_" or ":"). A route can be scoped to a flow, which is
+  how each flow gets its own cancel_operation.
+"""
+import logging
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update
+from telegram.ext import ApplicationHandlerStop, CallbackQueryHandler, MessageHandler, filters, ContextTypes
+from handlers.state import USER_STATE
+import handlers.start as start_h
+import handlers.accounts as acct_h
+import handlers.prices as prices_h
+import handlers.chart as chart_h
+import handlers.holders as holders_h
+import handlers.nft_analysis as nft_h
+import handlers.pyth as pyth_h
+import handlers.tutorial as tut_h
+import handlers.whale_alert as whale_h
+import favorites_handlers.callbacks as fav_cb
+from slashcommands.slashmain import tutorial_callback as slash_tutorial_callback
+
+logger = logging.getLogger(__name__)
+
+PREFIX_SEPARATORS = "_:"
+
+
+class CallbackRouter:
+    """callback_data -> handler via exact keys and prefixes, O(len(data))."""
+
+    def __init__(self):
+        self._routes = {}   # key -> [(flow or None, callback), ...]
+        self.dispatched = 0
+        self.unrouted = 0
+
+    def add(self, key: str, callback, flow: str = None):
+        """Register callback for key; the first registration for a (key, flow) wins."""
+        routes = self._routes.setdefault(key, [])
+        if any(existing == flow for existing, _ in routes):
+            logger.debug(f"Callback route {key!r} (flow={flow}) already registered, ignoring {callback.__name__}")
+            return
+        routes.append((flow, callback))
+
+    def add_all(self, routes):
+        for key, callback in routes:
+            self.add(key, callback)
+
+    def resolve(self, data: str, flow: str = None):
+        """Return the handler for data, preferring routes scoped to flow."""
+        for key in self._candidates(data):
+            routes = self._routes.get(key)
+            if not routes:
+                continue
+            fallback = None
+            for route_flow, callback in routes:
+                if route_flow is None:
+                    fallback = fallback or callback
+                elif route_flow == flow:
+                    return callback
+            if fallback is not None:
+                return fallback
+        return None
+
+    @staticmethod
+    def _candidates(data: str):
+        yield data
+        for i in range(len(data) - 1, 0, -1):
+            if data[i - 1] in PREFIX_SEPARATORS:
+                yield data[:i]
+
+    async def dispatch(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        query = update.callback_query
+        state = USER_STATE.get(query.from_user.id)
+        callback = self.resolve(query.data or "", state.flow if state else None)
+        if callback is None:
+            self.unrouted += 1
+            logger.debug(f"No callback route for {query.data!r}")
+            return
+        self.dispatched += 1
+        await callback(update, context)
+
+
+class TextRouter:
+    """Routes free text to the input handler of the user's active flow."""
+
+    def __init__(self):
+        self._routes = {}   # flow -> (compiled pattern, callback)
+        self.dispatched = 0
+        self.unmatched = 0
+
+    def add(self, flow: str, pattern, callback):
+        self._routes[flow] = (pattern, callback)
+
+    async def dispatch(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        state = USER_STATE.get(update.effective_user.id)
+        route = self._routes.get(state.flow) if state else None
+        if route is None:
+            return
+        pattern, callback = route
+        if not pattern.match(update.message.text):
+            self.unmatched += 1
+            return
+        self.dispatched += 1
+        await callback(update, context)
+        # The flow consumed the message; don't let handle_typos answer it too.
+        raise ApplicationHandlerStop
+
+
+async def cancel_operation(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Cancel button pressed with no (or an expired) flow."""
+    query = update.callback_query
+    await query.answer()
+    USER_STATE.pop(query.from_user.id, None)
+    await query.message.edit_text(
+        "❌ Operation cancelled",
+        reply_markup=InlineKeyboardMarkup([
+            [InlineKeyboardButton("🏠 Main Menu", callback_data="main_menu")]
+        ])
+    )
+
+
+# Flows with their own callbacks, cancel_operation and/or text_route.
+FLOWS = [
+    ("chart", chart_h),
+    ("pyth", pyth_h),
+    ("accounts", acct_h),
+    ("prices", prices_h),
+    ("holders", holders_h),
+    ("nft", nft_h),
+    ("whale", whale_h),
+]
+
+callback_router = CallbackRouter()
+text_router = TextRouter()
+
+callback_router.add_all(fav_cb.callback_routes)
+callback_router.add_all(start_h.callback_routes)
+# The menu tutorial keeps its step in USER_STATE, /tutorial in context.user_data.
+callback_router.add("tutorial_", tut_h.tutorial_callback, flow="tutorial")
+callback_router.add("tutorial_", slash_tutorial_callback)
+for flow, module in FLOWS:
+    callback_router.add_all(getattr(module, "callback_routes", []))
+    if hasattr(module, "cancel_operation"):
+        callback_router.add("cancel_operation", module.cancel_operation, flow=flow)
+    if hasattr(module, "text_route"):
+        text_router.add(flow, *module.text_route)
+callback_router.add("cancel_operation", cancel_operation)
+
+
+def stats() -> dict:
+    return {
+        "callbacks": callback_router.dispatched,
+        "callbacks_unrouted": callback_router.unrouted,
+        "text": text_router.dispatched,
+        "text_unmatched": text_router.unmatched,
+    }
+
+
+handlers = [
+    CallbackQueryHandler(callback_router.dispatch),
+    MessageHandler(filters.TEXT & ~filters.COMMAND, text_router.dispatch),
+]
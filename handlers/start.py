@@ -1,5 +1,5 @@
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update
-from telegram.ext import CallbackQueryHandler, ContextTypes
+from telegram.ext import ContextTypes
 from telegram.error import BadRequest
 from handlers.state import USER_STATE
 
@@ -37,14 +37,16 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
         "📈 /chart <mint> — Token price chart from Birdeye\n"
         "📊 /prices [mint] [count] — Top token prices or specific token\n"
         "🐋 /whalealert [threshold] [count] — Recent large transactions\n"
+        "🔔 /whalesubscribe <usd> — Get pushed new whale transfers\n"
         "🔎 /tokendetails <mint> — Details like supply, holders, volume\n"
         "👑 /topholders <mint> [count] — Richest holders of any token\n"
         "🖼 /nft_analysis <collection> — Floor price, volume & more\n"
-        "⚙️ /pyth <feed_id> — Get real-time Pyth oracle data\n"
+        "⚙️ /pyth <feed_id ...|list> — Real-time Pyth oracle prices for one or many feeds\n"
         "⭐ /addfavoriteaccount <account> — Save wallet to your list\n"
         "⭐ /favoriteaccounts — View your saved accounts\n"
         "⭐ /addfavoritetoken <mint> — Save a token to your list\n"
         "⭐ /favoritetokens — View your saved tokens\n"
+        "🔄 /refreshfavorites — Live dashboard of all your favorites\n"
         "🎓 /tutorial — Learn how to use the bot step-by-step\n"
         "📃 /commands — View all available commands\n"
     )
@@ -89,11 +91,14 @@ async def generate_menu_text():
         "• /chart\n"
         "• /prices\n"
         "• /whalealert\n"
+        "• /whalesubscribe\n"
+        "• /whaleunsubscribe\n"
         "• /tokendetails\n"
         "• /topholders\n"
         "• /nft_analysis\n"
         "• /favoriteaccounts\n"
         "• /favoritetokens\n"
+        "• /refreshfavorites\n"
         "• /pyth\n"
         "• /tutorial\n"
     )
@@ -124,6 +129,7 @@ async def show_commands(update: Update, context: ContextTypes.DEFAULT_TYPE):
         "📈 /chart <mint> — Token chart from Birdeye\n"
         "📊 /prices [mint] [count] — Show token prices\n"
         "🐋 /whalealert [threshold] [count] — Whale transfers\n"
+        "🔔 /whalesubscribe <usd> — Whale alert push (/whaleunsubscribe)\n"
         "🔎 /tokendetails <mint> — Token info & stats\n"
         "👑 /topholders <mint> [count] — Richest token holders\n"
         "🖼 /nft_analysis <collection> — Floor, listings, volume\n"
@@ -131,7 +137,7 @@ async def show_commands(update: Update, context: ContextTypes.DEFAULT_TYPE):
         "⭐ /favoriteaccounts — Your saved wallets\n"
         "⭐ /addfavoritetoken <mint> — Save a token\n"
         "⭐ /favoritetokens — Your saved tokens\n"
-        "⚙️ /pyth <feed_id> — Real-time oracle feed\n"
+        "⚙️ /pyth <feed_id ...|list> — Oracle prices (/pyth save <list> <ids>)\n"
         "🎓 /tutorial — Learn to use the bot\n"
         "📃 /commands — This list\n"
     )
@@ -156,16 +162,17 @@ from slashcommands.slashmain import whale_alert
 from favorites_handlers.favorite_accounts import favorite_accounts
 from favorites_handlers.favorite_tokens import favorite_tokens
 
-menu_handlers = [
-    CallbackQueryHandler(start_accounts, pattern="^menu_accounts$"),
-    CallbackQueryHandler(start_prices, pattern="^menu_prices$"),
-    CallbackQueryHandler(start_chart, pattern="^menu_chart$"),
-    CallbackQueryHandler(start_holders, pattern="^menu_holders$"),
-    CallbackQueryHandler(start_nft, pattern="^menu_nft$"),
-    CallbackQueryHandler(start_pyth, pattern="^menu_pyth$"),
-    CallbackQueryHandler(tutorial_start, pattern="^menu_tutorial$"),
-    CallbackQueryHandler(whale_alert, pattern="^menu_whale$"),
-    CallbackQueryHandler(favorite_accounts, pattern="^menu_fav_acct$"),
-    CallbackQueryHandler(favorite_tokens, pattern="^menu_fav_tok$"),
-    CallbackQueryHandler(main_menu_callback, pattern="^main_menu$")
+# Registered with handlers/router.py
+callback_routes = [
+    ("menu_accounts", start_accounts),
+    ("menu_prices", start_prices),
+    ("menu_chart", start_chart),
+    ("menu_holders", start_holders),
+    ("menu_nft", start_nft),
+    ("menu_pyth", start_pyth),
+    ("menu_tutorial", tutorial_start),
+    ("menu_whale", whale_alert),
+    ("menu_fav_acct", favorite_accounts),
+    ("menu_fav_tok", favorite_tokens),
+    ("main_menu", main_menu_callback),
 ]
\ No newline at end of file
@@ -1,5 +1,142 @@
 # handlers/state.py
+import asyncio
+import time
+import weakref
+from collections import Counter, OrderedDict
 from telegram import InlineKeyboardButton
+from config import FLOW_IDLE_TTL_SECS, FLOW_MAX_USERS
 
-USER_STATE = {}
-CANCEL_BUTTON = [[InlineKeyboardButton("❌ Cancel", callback_data="cancel_operation")]]
\ No newline at end of file
+
+class FlowState:
+    """One user's position in an interactive flow.
+
+    Slotted, so a record costs a few machine words instead of a dict. It
+    keeps the mapping-style access (state["step"], state.get("flow"),
+    state.update(...)) the flow handlers already use; unset fields read as
+    missing.
+    """
+    __slots__ = ("flow", "step", "type", "timeframe", "message_id",
+                 "start", "end", "threshold", "touched")
+    FIELDS = __slots__[:-1]
+
+    def __init__(self, flow=None, step=None, **fields):
+        for name in self.FIELDS:
+            setattr(self, name, None)
+        self.flow = flow
+        self.step = step
+        self.update(fields)
+        self.touched = time.monotonic()
+
+    def __getitem__(self, key):
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        if key not in self.FIELDS:
+            raise KeyError(f"Unknown flow state field: {key}")
+        setattr(self, key, value)
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def get(self, key, default=None):
+        value = getattr(self, key, None) if key in self.FIELDS else None
+        return default if value is None else value
+
+    def update(self, fields: dict):
+        for key, value in fields.items():
+            self[key] = value
+
+    def as_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.FIELDS if getattr(self, name) is not None}
+
+    def __repr__(self):
+        return f"FlowState({self.as_dict()})"
+
+
+class FlowStateStore:
+    """user_id -> FlowState, bounded in size and evicted after idle_ttl.
+
+    Entries are kept in least-recently-touched order, so expiry only ever
+    has to look at the front of the dict and the size cap drops the user
+    who has been idle longest. Reads and writes both count as activity.
+    """
+
+    def __init__(self, idle_ttl: float = FLOW_IDLE_TTL_SECS, max_users: int = FLOW_MAX_USERS):
+        self.idle_ttl = idle_ttl
+        self.max_users = max_users
+        self._states = OrderedDict()
+        self._locks = weakref.WeakValueDictionary()   # user_id -> asyncio.Lock while in use
+        self.expired = 0
+        self.evicted = 0
+
+    def _sweep(self, now: float):
+        states = self._states
+        while states:
+            uid, state = next(iter(states.items()))
+            if now - state.touched < self.idle_ttl:
+                break
+            del states[uid]
+            self.expired += 1
+
+    def get(self, uid, default=None):
+        now = time.monotonic()
+        self._sweep(now)
+        state = self._states.get(uid)
+        if state is None:
+            return default
+        state.touched = now
+        self._states.move_to_end(uid)
+        return state
+
+    def __getitem__(self, uid):
+        state = self.get(uid)
+        if state is None:
+            raise KeyError(uid)
+        return state
+
+    def __setitem__(self, uid, state):
+        if not isinstance(state, FlowState):
+            state = FlowState(**state)
+        now = time.monotonic()
+        self._sweep(now)
+        state.touched = now
+        self._states[uid] = state
+        self._states.move_to_end(uid)
+        while len(self._states) > self.max_users:
+            self._states.popitem(last=False)
+            self.evicted += 1
+
+    def __contains__(self, uid):
+        return self.get(uid) is not None
+
+    def __len__(self):
+        self._sweep(time.monotonic())
+        return len(self._states)
+
+    def pop(self, uid, default=None):
+        return self._states.pop(uid, default)
+
+    def lock(self, uid) -> asyncio.Lock:
+        """Per-user lock for read-modify-write sequences that span an await."""
+        lock = self._locks.get(uid)
+        if lock is None:
+            lock = self._locks[uid] = asyncio.Lock()
+        return lock
+
+    def stats(self) -> dict:
+        self._sweep(time.monotonic())
+        by_flow = Counter(state.flow for state in self._states.values())
+        return {
+            "active": len(self._states),
+            **{f"flow_{flow}": count for flow, count in sorted(by_flow.items(), key=lambda item: str(item[0]))},
+            "expired": self.expired,
+            "evicted": self.evicted,
+            "locks": len(self._locks),
+        }
+
+
+USER_STATE = FlowStateStore()
+CANCEL_BUTTON = [[InlineKeyboardButton("❌ Cancel", callback_data="cancel_operation")]]
@@ -1,8 +1,7 @@
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup
-from telegram.ext import CallbackQueryHandler, ContextTypes
+from telegram.ext import ContextTypes
 from telegram import Update
-
-USER_STATE = {}
+from handlers.state import USER_STATE
 
 async def tutorial_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     USER_STATE[update.effective_user.id] = {"flow": "tutorial", "step": 1}
@@ -25,17 +24,22 @@ async def tutorial_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     q = update.callback_query
     await q.answer()
     uid = q.from_user.id
-    state = USER_STATE.get(uid, {"step": 1})
-    step = state["step"]
+    # Serialize rapid Next/Back taps so each one sees the previous step.
+    async with USER_STATE.lock(uid):
+        state = USER_STATE.get(uid, {"step": 1})
+        step = state["step"]
 
-    if q.data == "tutorial_next":
-        step += 1
-    elif q.data == "tutorial_back":
-        step = max(1, step - 1)
-    elif q.data == "tutorial_restart":
-        step = 1
+        if q.data == "tutorial_next":
+            step += 1
+        elif q.data == "tutorial_back":
+            step = max(1, step - 1)
+        elif q.data == "tutorial_restart":
+            step = 1
 
-    USER_STATE[uid]["step"] = step
+        if step > 3:
+            USER_STATE.pop(uid, None)
+        else:
+            USER_STATE[uid] = {"flow": "tutorial", "step": step}
 
     if step == 1:
         text = (
@@ -75,8 +79,3 @@ async def tutorial_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
         reply_markup=InlineKeyboardMarkup(kb),
         parse_mode="Markdown"
     )
-
-
-handlers = [
-    CallbackQueryHandler(tutorial_callback, pattern="^tutorial_")
-]
@@ -1,36 +1,17 @@
 import aiohttp
+import re
 from datetime import datetime
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update
-from telegram.ext import CallbackQueryHandler, MessageHandler, filters, ContextTypes
+from telegram.ext import ContextTypes
+from services.whale_feed import whale_feed
+from handlers.state import USER_STATE
 
-# Per-user state for interactive flows
-USER_STATE = {}
-
-async def detect_whale_transfers(cap: float = 1000.0) -> list:
-    """Fetch transfers ≥ cap USD and return filtered list."""
-    url = "https://api.vybenetwork.xyz/token/transfers"
-    headers = {"accept": "application/json", "X-API-KEY": __import__("os").getenv("VYBE_API_KEY")}
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url, headers=headers) as resp:
-            if resp.status != 200:
-                return []
-            data = await resp.json()
-    out = []
-    for t in data.get("transfers", []):
-        try:
-            v = float(t.get("valueUsd", "0"))
-        except:
-            continue
-        if v >= cap:
-            out.append({
-                "signature": t.get("signature"),
-                "sender":    t.get("senderAddress"),
-                "receiver":  t.get("receiverAddress"),
-                "amount":    t.get("calculatedAmount"),
-                "value":     v,
-                "time":      t.get("blockTime")
-            })
-    return out
+async def detect_whale_transfers(cap: float = 1000.0, count: int = None) -> list:
+    """Return buffered transfers ≥ cap USD, newest first."""
+    try:
+        return await whale_feed.query(min_usd=cap, count=count)
+    except aiohttp.ClientResponseError:
+        return []
 
 def chunk_message(text: str, size: int = 4096) -> list:
     """Split a long text into Telegram-safe chunks."""
@@ -61,18 +42,22 @@ async def whale_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     if q.data == "whale_default":
         # Immediately fetch with default cap=1000, count=7
-        alerts = await detect_whale_transfers(1000.0)
+        alerts = await detect_whale_transfers(1000.0, count=7)
         await _send_alerts(q.message.chat_id, alerts, threshold=1000.0, count=7, context=context)
         USER_STATE.pop(uid, None)
 
     elif q.data == "whale_custom":
         # Ask for threshold first
-        USER_STATE[uid]["step"] = "threshold"
+        USER_STATE[uid] = {"flow": "whale", "step": "threshold"}
         await q.message.reply_text("📊 Send me the USD threshold (e.g. `5000`):")
 
 async def handle_whale_input(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Process text inputs for custom threshold/count."""
     uid = update.effective_user.id
+    async with USER_STATE.lock(uid):
+        await _handle_whale_step(update, context, uid)
+
+async def _handle_whale_step(update: Update, context: ContextTypes.DEFAULT_TYPE, uid: int):
     state = USER_STATE.get(uid)
     if not state or state.get("flow") != "whale":
         return
@@ -93,7 +78,7 @@ async def handle_whale_input(update: Update, context: ContextTypes.DEFAULT_TYPE)
         try:
             cnt = int(text)
             thr = state.get("threshold", 1000.0)
-            alerts = await detect_whale_transfers(thr)
+            alerts = await detect_whale_transfers(thr, count=cnt)
             await _send_alerts(update.message.chat_id, alerts, threshold=thr, count=cnt, context=context)
         except:
             await update.message.reply_text("❌ Invalid count. Send a whole number like `7`.")
@@ -112,14 +97,14 @@ async def _send_alerts(chat_id: int, alerts: list, threshold: float, count: int,
 
     lines = [f"🐋 **Top {len(alerts)} Whale Transfers** (≥ ${threshold:.0f}):\n"]
     for i, t in enumerate(alerts, start=1):
-        ts = t["time"]
+        ts = t["blockTime"]
         ts_str = datetime.fromtimestamp(ts).strftime('%Y-%m-%d %H:%M:%S') if ts else "N/A"
         lines.append(
             f"**{i}.** \n • Signature : `{t['signature']}`\n"
-            f"  • From: `{t['sender']}`\n"
-            f"  • To:   `{t['receiver']}`\n"
-            f"  • Amount: {t['amount']}\n"
-            f"  • Value:  ${t['value']:.2f}\n"
+            f"  • From: `{t['senderAddress']}`\n"
+            f"  • To:   `{t['receiverAddress']}`\n"
+            f"  • Amount: {t['calculatedAmount']}\n"
+            f"  • Value:  ${t['valueUsd']:.2f}\n"
             f"  • Time:   {ts_str} UTC\n"
         )
 
@@ -127,7 +112,8 @@ async def _send_alerts(chat_id: int, alerts: list, threshold: float, count: int,
     for chunk in chunk_message(text):
         await context.bot.send_message(chat_id, chunk, parse_mode="Markdown")
 
-handlers = [
-    CallbackQueryHandler(whale_callback, pattern="^whale_"),
-    MessageHandler(filters.TEXT & ~filters.COMMAND, handle_whale_input)
+# Registered with handlers/router.py
+callback_routes = [
+    ("whale_", whale_callback),
 ]
+text_route = (re.compile(r'.*', re.S), handle_whale_input)
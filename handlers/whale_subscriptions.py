@@ -0,0 +1,45 @@
+# handlers/whale_subscriptions.py
+import math
+from telegram import Update
+from telegram.ext import CommandHandler, ContextTypes
+from config import WHALE_SUBSCRIBE_MIN_USD
+from services.whale_push import whale_pusher
+
+async def whale_subscribe(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """/whalesubscribe <usd> — push new transfers worth at least <usd> to this chat."""
+    chat_id = update.effective_chat.id
+    if not context.args:
+        current = whale_pusher.index.get(chat_id)
+        status = f"🔔 Subscribed to transfers ≥ ${current:,.0f}.\n" if current else "🔕 Not subscribed.\n"
+        await update.message.reply_text(
+            status +
+            "Usage: /whalesubscribe <usd> (e.g. /whalesubscribe 50000)\n"
+            "Stop with /whaleunsubscribe"
+        )
+        return
+    try:
+        min_usd = float(context.args[0].replace(",", "").lstrip("$"))
+        if not math.isfinite(min_usd):
+            raise ValueError(min_usd)
+    except ValueError:
+        await update.message.reply_text("❌ Threshold must be a number, e.g. /whalesubscribe 50000")
+        return
+    if min_usd < WHALE_SUBSCRIBE_MIN_USD:
+        await update.message.reply_text(f"❌ Minimum threshold is ${WHALE_SUBSCRIBE_MIN_USD:,.0f}.")
+        return
+    await whale_pusher.subscribe(chat_id, min_usd)
+    await update.message.reply_text(
+        f"✅ You'll be alerted about new transfers ≥ ${min_usd:,.0f}.\n"
+        "Stop with /whaleunsubscribe"
+    )
+
+async def whale_unsubscribe(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    if await whale_pusher.unsubscribe(update.effective_chat.id):
+        await update.message.reply_text("🔕 Whale alerts stopped.")
+    else:
+        await update.message.reply_text("You weren't subscribed. Use /whalesubscribe <usd> to start.")
+
+handlers = [
+    CommandHandler("whalesubscribe", whale_subscribe),
+    CommandHandler("whaleunsubscribe", whale_unsubscribe),
+]
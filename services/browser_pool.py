@@ -0,0 +1,215 @@
+# services/browser_pool.py
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
+from playwright.async_api import async_playwright
+from config import BROWSER_POOL_SIZE, BROWSER_MAX_USES, BROWSER_MAX_WAITERS, BROWSER_STORAGE_STATE
+
+logger = logging.getLogger(__name__)
+
+LAUNCH_ARGS = ["--no-sandbox", "--disable-dev-shm-usage", "--disable-gpu"]
+VIEWPORT = {"width": 1280, "height": 900}
+
+
+class BrowserPoolBusy(RuntimeError):
+    """Raised when the wait queue is full or no page frees up in time."""
+
+
+class _Slot:
+    __slots__ = ("context", "page", "uses", "generation")
+
+    def __init__(self, context, page, generation):
+        self.context = context
+        self.page = page
+        self.uses = 0
+        self.generation = generation
+
+
+class BrowserPool:
+    """Long-lived Chromium with a bounded pool of pre-warmed pages.
+
+    At most `size` pages render at once; up to `max_waiters` further callers
+    queue for a free page and the rest are rejected with BrowserPoolBusy.
+    Each page's context is recycled after `max_uses` renders or any error,
+    and the browser is relaunched if it crashes or disconnects. New contexts
+    load the persisted storage_state, so accepted cookie banners stay gone.
+    """
+
+    def __init__(
+        self,
+        size: int = BROWSER_POOL_SIZE,
+        max_uses: int = BROWSER_MAX_USES,
+        max_waiters: int = BROWSER_MAX_WAITERS,
+        acquire_timeout: float = 30,
+        storage_state: str = BROWSER_STORAGE_STATE,
+    ):
+        self.size = size
+        self.max_uses = max_uses
+        self.max_waiters = max_waiters
+        self.acquire_timeout = acquire_timeout
+        self.storage_state = storage_state
+        self._playwright = None
+        self._browser = None
+        self._generation = 0
+        self._idle = asyncio.Queue()
+        self._waiters = 0
+        self._launch_lock = asyncio.Lock()
+        self._started = False
+        self.launches = 0
+        self.recycled = 0
+        self.renders = 0
+        self.rejected = 0
+
+    async def start(self):
+        """Launch the browser and pre-warm `size` pages."""
+        if self._started:
+            return
+        self._started = True
+        try:
+            self._playwright = await async_playwright().start()
+            await self._ensure_browser()
+        except Exception:
+            # No slots were queued; reset so the next page() tries again
+            # instead of waiting out acquire_timeout on an empty pool.
+            await self.close()
+            raise
+        for _ in range(self.size):
+            try:
+                self._idle.put_nowait(await self._new_slot())
+            except Exception as e:
+                logger.error(f"BrowserPool: pre-warm failed: {e}")
+                self._idle.put_nowait(None)
+        logger.info(f"BrowserPool started with {self.size} pages")
+
+    async def close(self):
+        """Close every page, the browser and Playwright."""
+        while not self._idle.empty():
+            await self._close_slot(self._idle.get_nowait())
+        if self._browser is not None:
+            try:
+                await self._browser.close()
+            except Exception as e:
+                logger.warning(f"BrowserPool: browser close failed: {e}")
+        if self._playwright is not None:
+            try:
+                await self._playwright.stop()
+            except Exception as e:
+                logger.warning(f"BrowserPool: playwright stop failed: {e}")
+        self._browser = None
+        self._playwright = None
+        self._started = False
+
+    async def _ensure_browser(self):
+        async with self._launch_lock:
+            if self._browser is not None and self._browser.is_connected():
+                return
+            if self._browser is not None:
+                logger.warning("BrowserPool: browser disconnected, relaunching")
+                try:
+                    await self._browser.close()
+                except Exception:
+                    pass
+            self._browser = await self._playwright.chromium.launch(headless=True, args=LAUNCH_ARGS)
+            self._generation += 1
+            self.launches += 1
+
+    async def _new_slot(self) -> _Slot:
+        state = self.storage_state if self.storage_state and os.path.exists(self.storage_state) else None
+        context = await self._browser.new_context(viewport=VIEWPORT, storage_state=state)
+        page = await context.new_page()
+        return _Slot(context, page, self._generation)
+
+    async def save_storage_state(self, page):
+        """Persist a page's cookies/localStorage for future contexts."""
+        if not self.storage_state:
+            return
+        try:
+            await page.context.storage_state(path=self.storage_state)
+        except Exception as e:
+            logger.warning(f"BrowserPool: could not save storage state: {e}")
+
+    @staticmethod
+    async def _close_slot(slot):
+        if slot is None:
+            return
+        try:
+            await slot.context.close()
+        except Exception:
+            pass
+
+    async def _recycle(self, slot):
+        """Replace a worn-out or broken slot in the background."""
+        await self._close_slot(slot)
+        self.recycled += 1
+        try:
+            await self._ensure_browser()
+            replacement = await self._new_slot()
+        except Exception as e:
+            logger.error(f"BrowserPool: recycle failed: {e}")
+            replacement = None
+        self._idle.put_nowait(replacement)
+
+    @asynccontextmanager
+    async def page(self):
+        """Borrow a pre-warmed page for one render."""
+        if not self._started:
+            await self.start()
+        if self._waiters >= self.max_waiters:
+            self.rejected += 1
+            raise BrowserPoolBusy("Too many screenshot requests queued")
+
+        self._waiters += 1
+        try:
+            slot = await asyncio.wait_for(self._idle.get(), self.acquire_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise BrowserPoolBusy("Timed out waiting for a browser page")
+        finally:
+            self._waiters -= 1
+
+        healthy = False
+        try:
+            await self._ensure_browser()
+            if slot is None or slot.generation != self._generation or slot.page.is_closed():
+                await self._close_slot(slot)
+                slot = await self._new_slot()
+            yield slot.page
+            healthy = True
+            self.renders += 1
+        finally:
+            if slot is not None:
+                slot.uses += 1
+            if healthy and slot.uses < self.max_uses:
+                self._idle.put_nowait(slot)
+            else:
+                asyncio.get_running_loop().create_task(self._recycle(slot))
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size,
+            "idle": self._idle.qsize(),
+            "waiting": self._waiters,
+            "renders": self.renders,
+            "recycled": self.recycled,
+            "launches": self.launches,
+            "rejected": self.rejected,
+            "connected": bool(self._browser and self._browser.is_connected()),
+        }
+
+
+browser_pool = BrowserPool()
+
+
+async def start_pool(application):
+    """Application post_init hook; a failed launch falls back to lazy start."""
+    try:
+        await browser_pool.start()
+    except Exception as e:
+        logger.error(f"BrowserPool: startup failed, will retry on first use: {e}")
+        await browser_pool.close()
+
+
+async def close_pool(application):
+    """Application post_shutdown hook."""
+    await browser_pool.close()
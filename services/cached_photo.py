@@ -0,0 +1,44 @@
+# services/cached_photo.py
+import time
+from telegram.error import BadRequest
+
+_counters = {"uploads": 0, "file_id_sends": 0, "stale_file_ids": 0}
+
+
+class CachedPhoto:
+    """Rendered PNG bytes plus the Telegram file_id once uploaded."""
+    __slots__ = ("png", "file_id", "created_at")
+
+    def __init__(self, png: bytes):
+        self.png = png
+        self.file_id = None
+        self.created_at = time.monotonic()
+
+    @property
+    def size(self) -> int:
+        return len(self.png)
+
+
+async def reply_cached_photo(message, cached: CachedPhoto, **kwargs):
+    """Send a cached photo, as a zero-byte file_id reference when possible.
+
+    The first upload records the file_id Telegram assigns; if Telegram later
+    rejects that file_id the bytes are uploaded again.
+    """
+    if cached.file_id:
+        try:
+            sent = await message.reply_photo(photo=cached.file_id, **kwargs)
+            _counters["file_id_sends"] += 1
+            return sent
+        except BadRequest:
+            _counters["stale_file_ids"] += 1
+            cached.file_id = None
+    sent = await message.reply_photo(photo=cached.png, **kwargs)
+    _counters["uploads"] += 1
+    if sent is not None and sent.photo:
+        cached.file_id = sent.photo[-1].file_id
+    return sent
+
+
+def stats() -> dict:
+    return dict(_counters)
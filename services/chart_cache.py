@@ -0,0 +1,115 @@
+# services/chart_cache.py
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from config import CHART_CACHE_MAX_BYTES
+from services.cached_photo import CachedPhoto
+from services.vybe_client import resolution_seconds, OHLCV_MAX_BUCKET
+
+logger = logging.getLogger(__name__)
+
+# Charts over windows that ended before the current bucket never change.
+HISTORICAL_TTL = 6 * 3600
+
+
+def chart_key(kind: str, mint: str, resolution: str, time_start: int, time_end: int):
+    """Return (cache_key, ttl) for a chart of mint over [time_start, time_end].
+
+    Uses the same time buckets as the OHLCV response cache, so "last 30 days"
+    requests made minutes apart map to one chart until the bucket rolls over.
+    """
+    bucket = min(resolution_seconds(resolution), OHLCV_MAX_BUCKET)
+    now = time.time()
+    start_bucket, end_bucket = int(time_start) // bucket, int(time_end) // bucket
+    if end_bucket * bucket + bucket > now:
+        ttl = bucket - (now % bucket)
+    else:
+        ttl = HISTORICAL_TTL
+    return (kind, mint, resolution, start_bucket, end_bucket), ttl
+
+
+class ChartCache:
+    """Rendered chart PNGs (and their Telegram file_ids) bounded by total bytes.
+
+    Identical concurrent requests share one render; least recently used
+    charts are evicted once the cached PNGs exceed max_bytes.
+    """
+
+    def __init__(self, max_bytes: int = CHART_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._entries = OrderedDict()   # key -> (CachedPhoto, expires_at)
+        self._inflight = {}             # key -> asyncio.Task
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    async def get_or_render(self, key, ttl: float, render):
+        """Return the cached chart for key, calling render() on a miss.
+
+        render is an async callable returning PNG bytes, or None when there
+        is nothing to draw; None and exceptions are never cached.
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            chart, expires_at = entry
+            if time.monotonic() < expires_at:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return chart
+            self._drop(key)
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            task = asyncio.get_running_loop().create_task(self._render(key, ttl, render))
+            self._inflight[key] = task
+        return await asyncio.shield(task)
+
+    async def _render(self, key, ttl: float, render):
+        try:
+            png = await render()
+            if not png:
+                return None
+            chart = CachedPhoto(png)
+            self._store(key, chart, ttl)
+            return chart
+        finally:
+            self._inflight.pop(key, None)
+
+    def _store(self, key, chart: CachedPhoto, ttl: float):
+        if chart.size > self.max_bytes:
+            logger.warning(f"Chart {key} ({chart.size} bytes) exceeds the cache budget, not caching")
+            return
+        self._drop(key)
+        self._entries[key] = (chart, time.monotonic() + ttl)
+        self.total_bytes += chart.size
+        while self.total_bytes > self.max_bytes:
+            old_key = next(iter(self._entries))
+            self._drop(old_key)
+            self.evictions += 1
+
+    def _drop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.total_bytes -= entry[0].size
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "entries": len(self._entries),
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "rendering": len(self._inflight),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+chart_cache = ChartCache()
@@ -0,0 +1,128 @@
+# services/chart_renderer.py
+import asyncio
+import functools
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from config import CHART_WORKERS, CHART_MAX_PENDING, CHART_TIMEOUT_SECS
+from charts import renderers
+
+logger = logging.getLogger(__name__)
+
+
+class ChartQueueFull(RuntimeError):
+    """Raised when too many chart renders are already pending."""
+
+
+class ChartRenderTimeout(RuntimeError):
+    """Raised when a render job exceeds its timeout."""
+
+
+class ChartRenderer:
+    """Renders matplotlib charts in a pool of pre-warmed worker processes.
+
+    Jobs are (kind, payload) pairs handled by charts.renderers.run_job and
+    come back as PNG bytes, so the event loop never runs pyplot. At most
+    max_pending jobs may be queued or running; a job that exceeds its
+    timeout gets its worker pool recycled so it cannot wedge a worker.
+    """
+
+    def __init__(
+        self,
+        workers: int = CHART_WORKERS,
+        max_pending: int = CHART_MAX_PENDING,
+        timeout: float = CHART_TIMEOUT_SECS,
+    ):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._pool = None
+        self._pending = 0
+        self.rendered = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.restarts = 0
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=self.workers, initializer=renderers.warm_up)
+
+    async def start(self):
+        """Spawn the workers and wait until each one is warm."""
+        if self._pool is not None:
+            return
+        self._pool = self._new_pool()
+        loop = asyncio.get_running_loop()
+        # ProcessPoolExecutor spawns lazily; one no-op per worker forces them all up.
+        await asyncio.gather(*(loop.run_in_executor(self._pool, int) for _ in range(self.workers)))
+        logger.info(f"ChartRenderer started with {self.workers} workers")
+
+    async def close(self):
+        if self._pool is not None:
+            pool, self._pool = self._pool, None
+            await asyncio.get_running_loop().run_in_executor(
+                None, functools.partial(pool.shutdown, wait=True, cancel_futures=True)
+            )
+
+    def _recycle_pool(self, failed):
+        """Kill the failed pool's workers (e.g. one is stuck) and start fresh ones."""
+        if failed is not self._pool:
+            return  # another job already replaced it
+        old, self._pool = self._pool, self._new_pool()
+        self.restarts += 1
+        if old is not None:
+            for process in list((old._processes or {}).values()):
+                process.terminate()
+            # Reap the dead pool off the event loop thread.
+            asyncio.get_running_loop().run_in_executor(
+                None, functools.partial(old.shutdown, wait=True, cancel_futures=True)
+            )
+
+    async def render(self, kind: str, payload: dict, timeout: float = None) -> bytes:
+        """Render a chart in a worker and return PNG bytes."""
+        if self._pending >= self.max_pending:
+            self.rejected += 1
+            raise ChartQueueFull("Chart renderer is busy, please try again shortly")
+        if self._pool is None:
+            await self.start()
+
+        self._pending += 1
+        pool = self._pool
+        try:
+            future = asyncio.get_running_loop().run_in_executor(pool, renderers.run_job, kind, payload)
+            png = await asyncio.wait_for(future, timeout or self.timeout)
+            self.rendered += 1
+            return png
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            logger.error(f"ChartRenderer: {kind} render timed out, recycling workers")
+            self._recycle_pool(pool)
+            raise ChartRenderTimeout(f"{kind} chart took too long to render")
+        except BrokenProcessPool:
+            logger.error("ChartRenderer: worker pool broke, recycling workers")
+            self._recycle_pool(pool)
+            raise
+        finally:
+            self._pending -= 1
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "pending": self._pending,
+            "rendered": self.rendered,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+            "restarts": self.restarts,
+        }
+
+
+chart_renderer = ChartRenderer()
+
+
+async def start_renderer(application):
+    """Application post_init hook."""
+    await chart_renderer.start()
+
+
+async def close_renderer(application):
+    """Application post_shutdown hook."""
+    await chart_renderer.close()
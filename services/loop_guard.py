@@ -0,0 +1,66 @@
+# services/loop_guard.py
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class BlockingCallError(RuntimeError):
+    """Raised when a callback holds the event loop longer than allowed."""
+
+
+class LoopBlockGuard(logging.Handler):
+    """Test mode that fails when any callback blocks the event loop.
+
+    Puts the running loop in asyncio debug mode with slow_callback_duration
+    set to the threshold, then listens for asyncio's "Executing ... took"
+    warnings. With fail_fast the first violation raises BlockingCallError
+    out of the loop, which stops the bot; otherwise violations are collected
+    and reported by check().
+    """
+
+    def __init__(self, threshold_ms: int, fail_fast: bool = True):
+        super().__init__(level=logging.WARNING)
+        self.threshold = threshold_ms / 1000
+        self.fail_fast = fail_fast
+        self.violations = []
+
+    def install(self, loop: asyncio.AbstractEventLoop = None):
+        loop = loop or asyncio.get_running_loop()
+        loop.set_debug(True)
+        loop.slow_callback_duration = self.threshold
+        logging.getLogger("asyncio").addHandler(self)
+        logger.warning("Loop block guard active: threshold %.0f ms", self.threshold * 1000)
+
+    def uninstall(self):
+        logging.getLogger("asyncio").removeHandler(self)
+
+    def emit(self, record: logging.LogRecord):
+        if not str(record.msg).startswith("Executing") or len(record.args or ()) != 2:
+            return
+        handle, duration = record.args
+        self.violations.append((handle, duration))
+        message = f"Event loop blocked for {duration * 1000:.0f} ms by {handle}"
+        logger.error(message)
+        if self.fail_fast:
+            raise BlockingCallError(message)
+
+    def check(self):
+        """Raise if any violation was recorded."""
+        if self.violations:
+            handle, duration = max(self.violations, key=lambda v: v[1])
+            raise BlockingCallError(
+                f"{len(self.violations)} blocking callback(s); worst {duration * 1000:.0f} ms by {handle}"
+            )
+
+
+guard = None
+
+
+def install_guard(threshold_ms: int, fail_fast: bool = True):
+    """Install the guard on the running loop if a threshold is configured."""
+    global guard
+    if threshold_ms > 0:
+        guard = LoopBlockGuard(threshold_ms, fail_fast)
+        guard.install()
+    return guard
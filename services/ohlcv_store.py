@@ -0,0 +1,314 @@
+# services/ohlcv_store.py
+import asyncio
+import json
+import logging
+import sqlite3
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from config import OHLCV_DB_PATH, OHLCV_MAX_SERIES, OHLCV_REQUEST_LIMIT, OHLCV_EMPTY_CONFIRM_SECS
+from services.vybe_client import vybe, resolution_seconds
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ("open", "high", "low", "close", "volume", "volumeUsd")
+# Empty responses remembered per series while waiting for confirmation.
+EMPTY_SEEN_MAX = 16
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS ohlcv_series (
+    mint       TEXT NOT NULL,
+    resolution TEXT NOT NULL,
+    coverage   TEXT NOT NULL,
+    times      BLOB NOT NULL,
+    columns    TEXT NOT NULL,
+    data       BLOB NOT NULL,
+    PRIMARY KEY (mint, resolution)
+) WITHOUT ROWID;
+"""
+
+
+def _float(value) -> float:
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return float("nan")
+
+
+class Series:
+    """One (mint, resolution) candle series as parallel columns.
+
+    `times` is a sorted array('q'); each of COLUMNS is an array('d') of the
+    same length. `coverage` lists the merged [start, end) ranges already
+    fetched, so ranges without candles (no trades) aren't fetched again.
+    `empty_seen` (in memory only) remembers recent empty responses until a
+    later one confirms them.
+    """
+
+    __slots__ = ("step", "times", "columns", "coverage", "empty_seen")
+
+    def __init__(self, step: int):
+        self.step = step
+        self.times = array('q')
+        self.columns = {name: array('d') for name in COLUMNS}
+        self.coverage = []
+        self.empty_seen = []   # (start, end, first seen)
+
+    def __len__(self):
+        return len(self.times)
+
+    def missing(self, start: int, end: int) -> list:
+        """Sub-ranges of [start, end) not covered yet, aligned to candle boundaries."""
+        start -= start % self.step
+        end = -(-end // self.step) * self.step
+        gaps = []
+        for covered_start, covered_end in self.coverage:
+            if covered_end <= start:
+                continue
+            if covered_start >= end:
+                break
+            if covered_start > start:
+                gaps.append((start, covered_start))
+            start = max(start, covered_end)
+        if start < end:
+            gaps.append((start, end))
+        return gaps
+
+    def cover(self, start: int, end: int):
+        ranges = sorted(self.coverage + [(start, end)])
+        merged = [ranges[0]]
+        for range_start, range_end in ranges[1:]:
+            last_start, last_end = merged[-1]
+            if range_start <= last_end:
+                merged[-1] = (last_start, max(last_end, range_end))
+            else:
+                merged.append((range_start, range_end))
+        self.coverage = merged
+
+    def confirm_empty(self, start: int, end: int, now: float, min_age: float) -> list:
+        """Parts of [start, end) that already came back empty at least min_age ago.
+
+        Records this empty response, so a later one can confirm it.
+        """
+        confirmed = []
+        for seen_start, seen_end, seen_at in self.empty_seen:
+            overlap = (max(start, seen_start), min(end, seen_end))
+            if now - seen_at >= min_age and overlap[0] < overlap[1]:
+                confirmed.append(overlap)
+        if not any(s <= start and end <= e for s, e, _ in self.empty_seen):
+            self.empty_seen.append((start, end, now))
+            del self.empty_seen[:-EMPTY_SEEN_MAX]
+        return confirmed
+
+    def merge(self, start: int, end: int, rows: list):
+        """Replace the candles in [start, end) with rows from the API."""
+        rows = sorted((r for r in rows if start <= int(r["time"]) < end), key=lambda r: int(r["time"]))
+        lo = bisect_left(self.times, start)
+        hi = bisect_left(self.times, end)
+        self.times[lo:hi] = array('q', (int(r["time"]) for r in rows))
+        for name, column in self.columns.items():
+            column[lo:hi] = array('d', (_float(r.get(name)) for r in rows))
+
+    def slice(self, start: int, end: int) -> dict:
+        """Columns for the candles with start <= time <= end."""
+        lo = bisect_left(self.times, start)
+        hi = bisect_right(self.times, end)
+        result = {"time": self.times[lo:hi]}
+        result.update((name, column[lo:hi]) for name, column in self.columns.items())
+        return result
+
+    def to_row(self) -> tuple:
+        return (
+            json.dumps(self.coverage),
+            self.times.tobytes(),
+            ",".join(self.columns),
+            b"".join(column.tobytes() for column in self.columns.values()),
+        )
+
+    @classmethod
+    def from_row(cls, step: int, coverage: str, times: bytes, columns: str, data: bytes) -> "Series":
+        series = cls(step)
+        series.coverage = [tuple(r) for r in json.loads(coverage)]
+        series.times.frombytes(times)
+        stored = array('d')
+        stored.frombytes(data)
+        n = len(series.times)
+        for i, name in enumerate(columns.split(",")):
+            if name in series.columns:
+                series.columns[name] = stored[i * n:(i + 1) * n]
+        if any(len(column) != n for column in series.columns.values()):
+            # Written with a different column set; start over.
+            return cls(step)
+        return series
+
+
+class OHLCVStore:
+    """Local token-ohlcv candles, fetched from the API only where missing.
+
+    A range query works out which parts of [start, end] haven't been
+    fetched for the series, requests just those (in windows of at most
+    request_limit candles), merges them into the columns and answers from
+    memory. Only what the API demonstrably returned is marked as covered:
+    a truncated response covers the span of candles received, and an empty
+    one only once it is repeated empty_confirm seconds later. The still-open
+    candle is never covered, so it is refetched until it closes. Series are
+    persisted to SQLite (one row of column blobs per series) and kept in an
+    LRU of OHLCV_MAX_SERIES in memory.
+    """
+
+    def __init__(
+        self,
+        path: str = OHLCV_DB_PATH,
+        max_series: int = OHLCV_MAX_SERIES,
+        request_limit: int = OHLCV_REQUEST_LIMIT,
+        empty_confirm: float = OHLCV_EMPTY_CONFIRM_SECS,
+    ):
+        self.path = path
+        self.max_series = max_series
+        self.request_limit = request_limit
+        self.empty_confirm = empty_confirm
+        self._series = OrderedDict()   # (mint, resolution) -> Series
+        self._locks = {}
+        # SQLite work stays on one thread, as in favorites_handlers/db.py.
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ohlcv-db")
+        self._conn = None
+        self.queries = 0
+        self.local_hits = 0
+        self.fetches = 0
+        self.candles_fetched = 0
+        self.truncated = 0
+        self.empty = 0
+        self.loaded = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def _load_row(self, mint: str, resolution: str):
+        return self._connection().execute(
+            "SELECT coverage, times, columns, data FROM ohlcv_series WHERE mint = ? AND resolution = ?",
+            (mint, resolution),
+        ).fetchone()
+
+    def _save_row(self, mint: str, resolution: str, row: tuple):
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO ohlcv_series (mint, resolution, coverage, times, columns, data) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (mint, resolution, *row),
+            )
+
+    async def _run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    async def _get_series(self, mint: str, resolution: str) -> Series:
+        key = (mint, resolution)
+        series = self._series.get(key)
+        if series is not None:
+            self._series.move_to_end(key)
+            return series
+        step = resolution_seconds(resolution)
+        row = await self._run(self._load_row, mint, resolution)
+        if row is not None:
+            series = Series.from_row(step, *row)
+            self.loaded += 1
+        else:
+            series = Series(step)
+        self._series[key] = series
+        while len(self._series) > self.max_series:
+            evicted, _ = self._series.popitem(last=False)
+            lock = self._locks.get(evicted)
+            if lock is not None and not lock.locked():
+                del self._locks[evicted]
+        return series
+
+    async def query(self, mint: str, resolution: str, start: int, end: int) -> dict:
+        """Columns ("time", "open", ..., "volumeUsd") for candles between start and end."""
+        self.queries += 1
+        key = (mint, resolution)
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            series = await self._get_series(mint, resolution)
+            gaps = series.missing(start, end + 1)
+            if not gaps:
+                self.local_hits += 1
+            for gap_start, gap_end in gaps:
+                await self._fill(mint, resolution, series, gap_start, gap_end)
+            if gaps:
+                await self._run(self._save_row, mint, resolution, series.to_row())
+            return series.slice(start, end)
+
+    async def _fill(self, mint: str, resolution: str, series: Series, start: int, end: int):
+        """Fetch the candles in [start, end) and cover what the API vouched for."""
+        now = time.time()
+        # Candles from the current one on are still changing.
+        settled = int(now) // series.step * series.step
+        window = series.step * self.request_limit
+        pending = [(s, min(s + window, end)) for s in range(start, end, window)]
+        while pending:
+            chunk_start, chunk_end = pending.pop()
+            data = await vybe.get(
+                f"/price/{mint}/token-ohlcv",
+                params={"resolution": resolution, "timeStart": chunk_start, "timeEnd": chunk_end,
+                        "limit": self.request_limit},
+                ttl=0,
+            )
+            rows = data.get("data", [])
+            self.fetches += 1
+            self.candles_fetched += len(rows)
+            times = [t for t in (int(r["time"]) for r in rows) if chunk_start <= t < chunk_end]
+            if not times:
+                # Could be a range without trades, or a glitch; trust it once repeated.
+                self.empty += 1
+                covered = series.confirm_empty(chunk_start, chunk_end, now, self.empty_confirm)
+            elif len(rows) >= self.request_limit:
+                # Possibly truncated: only the span received is known complete; fetch the rest.
+                lo, hi = min(times), max(times) + series.step
+                series.merge(lo, hi, rows)
+                covered = [(lo, hi)]
+                rest = [r for r in ((chunk_start, lo), (hi, chunk_end)) if r[0] < r[1]]
+                if rest:
+                    self.truncated += 1
+                    pending.extend(rest)
+            else:
+                series.merge(chunk_start, chunk_end, rows)
+                covered = [(chunk_start, chunk_end)]
+            for cover_start, cover_end in covered:
+                if min(cover_end, settled) > cover_start:
+                    series.cover(cover_start, min(cover_end, settled))
+
+    async def close(self):
+        def _close():
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+        await self._run(_close)
+        self._executor.shutdown(wait=True)
+
+    def stats(self) -> dict:
+        return {
+            "series": len(self._series),
+            "queries": self.queries,
+            "local_hits": self.local_hits,
+            "fetches": self.fetches,
+            "candles_fetched": self.candles_fetched,
+            "truncated": self.truncated,
+            "empty_responses": self.empty,
+            "loaded_from_disk": self.loaded,
+        }
+
+
+ohlcv_store = OHLCVStore()
+
+
+async def close_ohlcv_store(application=None):
+    """post_shutdown hook: close the SQLite connection."""
+    await ohlcv_store.close()
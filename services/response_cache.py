@@ -0,0 +1,97 @@
+# services/response_cache.py
+import asyncio
+import time
+from collections import OrderedDict
+
+
+def _retrieve_exception(task: asyncio.Task):
+    # Every waiter may be gone; don't log "exception was never retrieved".
+    if not task.cancelled():
+        task.exception()
+
+
+class ResponseCache:
+    """In-process TTL cache with single-flight request coalescing.
+
+    Entries are keyed by an arbitrary hashable (endpoint + params). While a
+    key is being fetched, concurrent callers await the same in-flight task
+    instead of issuing their own request. Failures are never cached.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()   # key -> (expires_at, value)
+        self._inflight = {}             # key -> asyncio.Future
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Return a fresh cached value or None."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key, value, ttl: float):
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key=None):
+        """Drop one key, or everything when key is None."""
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    async def get_or_fetch(self, key, ttl: float, fetch):
+        """Return the cached value for key, or await fetch() exactly once.
+
+        fetch() runs in its own task and every caller, the first included,
+        awaits it through a shield: a caller that is cancelled (a timeout, a
+        dropped update) stops waiting without aborting the fetch for the rest.
+        """
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            task = asyncio.get_running_loop().create_task(self._fetch(key, ttl, fetch))
+            task.add_done_callback(_retrieve_exception)
+            self._inflight[key] = task
+        return await asyncio.shield(task)
+
+    async def _fetch(self, key, ttl: float, fetch):
+        try:
+            value = await fetch()
+            if ttl > 0:
+                self.set(key, value, ttl)
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "entries": len(self._entries),
+            "inflight": len(self._inflight),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "hit_ratio": round((self.hits + self.coalesced) / lookups, 3) if lookups else 0.0,
+        }
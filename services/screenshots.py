@@ -0,0 +1,196 @@
+# services/screenshots.py
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from config import (
+    SCREENSHOT_BUDGET_SECS,
+    SCREENSHOT_TTL_SECS,
+    SCREENSHOT_MAX_STALE_SECS,
+    SCREENSHOT_CACHE_ENTRIES,
+)
+from services.browser_pool import browser_pool, BrowserPoolBusy
+from services.cached_photo import CachedPhoto
+
+logger = logging.getLogger(__name__)
+
+CHART_SELECTOR = "div.chart-gui-wrapper"
+COOKIE_SELECTORS = [
+    'button[title="ACCEPT ALL"]',
+    'button:has-text("Accept All")',
+    'button:has-text("Accept Cookies")',
+    'text="Accept"',
+    'button#accept-cookies',
+    'button.cookie-accept'
+]
+COOKIE_CONTAINERS = [
+    '.cookie-banner', '#cookie-consent', '.cookieconsent',
+    '.cookies-modal', '#cookieModal', '.cc-banner'
+]
+
+# True once a chart canvas has real (non-transparent) pixels on it.
+CANVAS_PAINTED_JS = """(selector) => {
+    const canvases = document.querySelectorAll(selector + ' canvas');
+    for (const canvas of canvases) {
+        if (!canvas.width || !canvas.height) continue;
+        try {
+            const ctx = canvas.getContext('2d');
+            if (!ctx) continue;
+            const data = ctx.getImageData(0, 0, canvas.width, canvas.height).data;
+            for (let i = 3; i < data.length; i += 4 * 61) {
+                if (data[i] !== 0) return true;
+            }
+        } catch (e) {
+            return true;  // tainted or WebGL canvas: it exists and has a size
+        }
+    }
+    return false;
+}"""
+
+REMOVE_COOKIE_CONTAINERS_JS = """(selectors) => {
+    selectors.forEach(selector => {
+        document.querySelectorAll(selector).forEach(el => el.remove());
+    });
+}"""
+
+
+def token_page_url(mint: str) -> str:
+    return f"https://vybe.fyi/tokens/{mint}"
+
+
+class _Budget:
+    """Shared deadline; each step gets whatever time is left, in ms."""
+
+    def __init__(self, seconds: float):
+        self.deadline = asyncio.get_running_loop().time() + seconds
+
+    def ms(self, cap: float = None) -> float:
+        # Playwright treats 0 as "no timeout", so never hand it out.
+        left = max(1.0, (self.deadline - asyncio.get_running_loop().time()) * 1000)
+        return min(left, cap) if cap else left
+
+
+async def _dismiss_cookies(page) -> bool:
+    """Click a visible cookie banner button, else strip known banners."""
+    for sel in COOKIE_SELECTORS:
+        try:
+            btn = page.locator(sel).first
+            if await btn.is_visible():
+                await btn.click(timeout=2000)
+                await browser_pool.save_storage_state(page)
+                return True
+        except Exception as e:
+            logger.debug(f"Cookie dismissal attempt failed for {sel}: {e}")
+    await page.evaluate(REMOVE_COOKIE_CONTAINERS_JS, COOKIE_CONTAINERS)
+    return False
+
+
+async def _render(page, url: str, budget: _Budget) -> bytes:
+    await page.goto(url, wait_until="domcontentloaded", timeout=budget.ms())
+    await page.wait_for_function(
+        CANVAS_PAINTED_JS, arg=CHART_SELECTOR, polling="raf", timeout=budget.ms()
+    )
+    await _dismiss_cookies(page)
+    chart = page.locator(CHART_SELECTOR).first
+    await chart.scroll_into_view_if_needed(timeout=budget.ms(2000))
+    return await chart.screenshot(type="png", animations="disabled", timeout=budget.ms())
+
+
+async def capture_token_chart(mint: str, budget_secs: float = SCREENSHOT_BUDGET_SECS):
+    """Render the vybe.fyi chart for a mint and return PNG bytes, or None.
+
+    Readiness is event driven (the chart canvas actually painting) rather than
+    fixed sleeps, the screenshot is clipped to the chart element and kept in
+    memory, and the whole pipeline, including waiting for a pooled page, must
+    finish within budget_secs.
+    """
+    url = token_page_url(mint)
+    try:
+        async with asyncio.timeout(budget_secs):
+            budget = _Budget(budget_secs)
+            async with browser_pool.page() as page:
+                return await _render(page, url, budget)
+    except BrowserPoolBusy as e:
+        logger.warning(f"capture_token_chart: browser pool busy: {e}")
+    except TimeoutError:
+        logger.warning(f"capture_token_chart: {mint} exceeded {budget_secs:.0f}s budget")
+    except Exception as e:
+        logger.error(f"capture_token_chart: {mint} failed: {e}")
+    return None
+
+
+class ScreenshotCache:
+    """Per-mint screenshot cache with stale-while-revalidate.
+
+    Fresh entries (younger than ttl) are served directly. Entries up to
+    max_stale old are served immediately while one background re-render
+    replaces them. Concurrent misses for the same mint share one render.
+    """
+
+    def __init__(
+        self,
+        ttl: float = SCREENSHOT_TTL_SECS,
+        max_stale: float = SCREENSHOT_MAX_STALE_SECS,
+        max_entries: int = SCREENSHOT_CACHE_ENTRIES,
+    ):
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.max_entries = max_entries
+        self._entries = OrderedDict()   # mint -> CachedPhoto
+        self._inflight = {}             # mint -> asyncio.Task
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+
+    async def get(self, mint: str):
+        """Return a CachedPhoto for mint, or None if it could not be rendered."""
+        shot = self._entries.get(mint)
+        if shot is not None:
+            age = time.monotonic() - shot.created_at
+            if age < self.ttl:
+                self.hits += 1
+                self._entries.move_to_end(mint)
+                return shot
+            if age < self.max_stale:
+                self.stale_hits += 1
+                self._entries.move_to_end(mint)
+                if mint not in self._inflight:
+                    self.refreshes += 1
+                    self._start_render(mint)
+                return shot
+        self.misses += 1
+        task = self._inflight.get(mint) or self._start_render(mint)
+        return await asyncio.shield(task)
+
+    def _start_render(self, mint: str) -> asyncio.Task:
+        task = asyncio.get_running_loop().create_task(self._render(mint))
+        self._inflight[mint] = task
+        return task
+
+    async def _render(self, mint: str):
+        try:
+            png = await capture_token_chart(mint)
+            if not png:
+                return None
+            shot = CachedPhoto(png)
+            self._entries[mint] = shot
+            self._entries.move_to_end(mint)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return shot
+        finally:
+            self._inflight.pop(mint, None)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "rendering": len(self._inflight),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+        }
+
+
+screenshot_cache = ScreenshotCache()
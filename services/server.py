@@ -0,0 +1,148 @@
+# services/server.py
+import asyncio
+import hmac
+import logging
+import re
+import signal
+from aiohttp import web
+from telegram import Update
+from telegram.ext import Application
+from config import (
+    WEBHOOK_URL, WEBHOOK_PATH, WEBHOOK_SECRET, WEBHOOK_MAX_CONNECTIONS,
+    HTTP_HOST, PORT, DRAIN_TIMEOUT_SECS,
+)
+
+logger = logging.getLogger(__name__)
+
+# Only the update types the bot has handlers for; Telegram doesn't send the rest.
+ALLOWED_UPDATES = [Update.MESSAGE, Update.CALLBACK_QUERY]
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+# Characters and length Telegram accepts for setWebhook's secret_token.
+SECRET_FORMAT = re.compile(r"^[A-Za-z0-9_-]{1,256}$")
+
+
+class BotServer:
+    """Runs the Application behind one aiohttp server on PORT.
+
+    GET /healthz reports readiness (200 only while serving, 503 while starting
+    or draining). In webhook mode (WEBHOOK_URL set) POST /<WEBHOOK_PATH>
+    accepts updates carrying the secret token; otherwise the bot long-polls
+    and the port only serves /healthz. SIGTERM/SIGINT stop intake, let queued
+    and in-flight updates finish (up to DRAIN_TIMEOUT_SECS) and shut down.
+    """
+
+    def __init__(self, application: Application):
+        self.application = application
+        self.mode = "webhook" if WEBHOOK_URL else "polling"
+        self.status = "starting"
+        self.received = 0
+        self.rejected = 0
+        self._stop = asyncio.Event()
+
+    def _web_app(self) -> web.Application:
+        web_app = web.Application()
+        web_app.router.add_get("/healthz", self.healthz)
+        if self.mode == "webhook":
+            web_app.router.add_post(f"/{WEBHOOK_PATH}", self.webhook)
+        return web_app
+
+    async def healthz(self, request: web.Request) -> web.Response:
+        return web.json_response(self.stats(), status=200 if self.status == "serving" else 503)
+
+    async def webhook(self, request: web.Request) -> web.Response:
+        token = request.headers.get(SECRET_HEADER, "")
+        if not hmac.compare_digest(token, WEBHOOK_SECRET):
+            self.rejected += 1
+            return web.Response(status=403)
+        if self.status != "serving":
+            # Non-2xx makes Telegram redeliver the update later (to whoever is serving then).
+            return web.Response(status=503)
+        try:
+            update = Update.de_json(await request.json(), self.application.bot)
+        except ValueError:
+            self.rejected += 1
+            return web.Response(status=400)
+        self.received += 1
+        await self.application.update_queue.put(update)
+        return web.Response()
+
+    def stop(self):
+        self._stop.set()
+
+    async def serve(self):
+        application = self.application
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, self.stop)
+
+        await application.initialize()
+        if application.post_init:
+            await application.post_init(application)
+
+        runner = web.AppRunner(self._web_app(), access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, HTTP_HOST, PORT).start()
+        logger.info(f"HTTP server listening on {HTTP_HOST}:{PORT} ({self.mode} mode)")
+        try:
+            if self.mode == "webhook":
+                await application.bot.set_webhook(
+                    url=f"{WEBHOOK_URL.rstrip('/')}/{WEBHOOK_PATH}",
+                    secret_token=WEBHOOK_SECRET,
+                    allowed_updates=ALLOWED_UPDATES,
+                    max_connections=WEBHOOK_MAX_CONNECTIONS,
+                )
+            else:
+                await application.updater.start_polling(allowed_updates=ALLOWED_UPDATES)
+            await application.start()
+            self.status = "serving"
+            await self._stop.wait()
+        finally:
+            await self._drain(runner)
+
+    async def _drain(self, runner: web.AppRunner):
+        application = self.application
+        self.status = "draining"
+        logger.info("Draining: no new updates accepted")
+        if application.updater.running:
+            await application.updater.stop()
+        if application.running:
+            try:
+                # Processes everything already queued plus in-flight handler tasks.
+                await asyncio.wait_for(application.stop(), DRAIN_TIMEOUT_SECS)
+            except asyncio.TimeoutError:
+                logger.warning(f"Drain timed out after {DRAIN_TIMEOUT_SECS}s, shutting down anyway")
+        await runner.cleanup()
+        if application.post_stop:
+            await application.post_stop(application)
+        await application.shutdown()
+        if application.post_shutdown:
+            await application.post_shutdown(application)
+        logger.info("Shutdown complete")
+
+    def stats(self) -> dict:
+        return {
+            "status": self.status,
+            "mode": self.mode,
+            "update_queue": self.application.update_queue.qsize(),
+            "received": self.received,
+            "rejected": self.rejected,
+        }
+
+
+def check_config():
+    """Refuse to start webhook mode without a usable shared secret.
+
+    Every replica behind the webhook URL must register and check the same
+    secret; a per-process random one would make the others answer 403.
+    """
+    if WEBHOOK_URL and not SECRET_FORMAT.match(WEBHOOK_SECRET):
+        raise RuntimeError(
+            "WEBHOOK_URL is set but WEBHOOK_SECRET is missing or invalid: set it to 1-256 "
+            "characters from A-Z, a-z, 0-9, _ and -, the same value on every replica."
+        )
+
+
+def run(application: Application):
+    """Blocking entry point, used by bot.py in place of run_polling()."""
+    check_config()
+    asyncio.run(BotServer(application).serve())
@@ -0,0 +1,215 @@
+# services/token_catalog.py
+import asyncio
+import logging
+import re
+import time
+from itertools import islice
+from config import (
+    TOKEN_CATALOG_REFRESH_SECS, TOKEN_CATALOG_PAGE_SIZE, TOKEN_CATALOG_MAX_PAGES,
+    TOKEN_CATALOG_RETRY_SECS, TOKEN_CATALOG_WAIT_SECS,
+)
+from services.vybe_client import vybe
+from services.token_search import TokenSearchIndex
+
+logger = logging.getLogger(__name__)
+
+# Sort fields /prices accepts; numbers sort largest first, text alphabetically.
+NUMERIC_FIELDS = ("marketCap", "price", "currentSupply")
+TEXT_FIELDS = ("mintAddress", "name", "symbol")
+SORT_FIELDS = NUMERIC_FIELDS + TEXT_FIELDS
+MINT_ADDRESS = re.compile(r"^[1-9A-HJ-NP-Za-km-z]{32,44}$")
+
+
+def _number(token: dict, field: str) -> float:
+    try:
+        return float(token.get(field) or 0)
+    except (ValueError, TypeError):
+        return 0.0
+
+
+class CatalogUnavailable(RuntimeError):
+    """The first catalog load hasn't finished (or keeps failing)."""
+
+
+class CatalogSnapshot:
+    """One complete pass over /tokens with its lookup tables and sorted views."""
+
+    def __init__(self, tokens: list):
+        self.tokens = tokens                 # API order
+        self.by_mint = {}
+        self.by_symbol = {}                  # lower-case symbol -> tokens, largest market cap first
+        for token in tokens:
+            mint = token.get("mintAddress")
+            if mint:
+                self.by_mint[mint] = token
+            symbol = (token.get("symbol") or "").lower()
+            if symbol:
+                self.by_symbol.setdefault(symbol, []).append(token)
+        for same_symbol in self.by_symbol.values():
+            same_symbol.sort(key=lambda t: _number(t, "marketCap"), reverse=True)
+        self.views = {}
+        for field in NUMERIC_FIELDS:
+            self.views[field] = sorted(tokens, key=lambda t: _number(t, field), reverse=True)
+        for field in TEXT_FIELDS:
+            self.views[field] = sorted(tokens, key=lambda t: (t.get(field) or "").lower())
+
+
+class TokenCatalog:
+    """The full /tokens list, paged through in the background.
+
+    Each refresh builds a new CatalogSnapshot and swaps it in, so lookups
+    never see a half-built catalog and never wait on the API once the
+    first pass has finished. The symbol/name search index is updated with
+    just the tokens that changed since the previous pass.
+
+    Requests never run a refresh themselves: until the first pass lands
+    they wait (up to wait_secs) for the background task, and a failed
+    pass is retried on a backoff schedule rather than per request.
+    """
+
+    def __init__(self, interval: float = TOKEN_CATALOG_REFRESH_SECS,
+                 retry: float = TOKEN_CATALOG_RETRY_SECS, wait_secs: float = TOKEN_CATALOG_WAIT_SECS):
+        self.interval = interval
+        self.retry = retry
+        self.wait_secs = wait_secs
+        self.snapshot = None
+        self.search_index = TokenSearchIndex()
+        self._task = None
+        self._refresh_lock = asyncio.Lock()
+        self._loaded = asyncio.Event()
+        self.failures = 0                    # consecutive failed refreshes
+        self.last_refresh = None
+        self.refreshes = 0
+        self.errors = 0
+        self.pages = 0
+
+    async def _fetch_all(self) -> list:
+        tokens, seen = [], set()
+        for page in range(TOKEN_CATALOG_MAX_PAGES):
+            data = await vybe.get("/tokens", params={"page": page, "limit": TOKEN_CATALOG_PAGE_SIZE}, ttl=0)
+            self.pages += 1
+            batch = data.get("data", [])
+            for token in batch:
+                mint = token.get("mintAddress")
+                if mint in seen:
+                    continue
+                seen.add(mint)
+                tokens.append(token)
+            if len(batch) < TOKEN_CATALOG_PAGE_SIZE:
+                break
+        else:
+            logger.warning(f"Token catalog truncated at {TOKEN_CATALOG_MAX_PAGES} pages")
+        return tokens
+
+    async def refresh(self):
+        async with self._refresh_lock:
+            started = time.monotonic()
+            tokens = await self._fetch_all()
+            if not tokens:
+                raise ValueError("/tokens returned no data")
+            snapshot = await asyncio.to_thread(CatalogSnapshot, tokens)
+            changes = await asyncio.to_thread(self.search_index.diff, snapshot.by_mint)
+            if self.search_index.is_large(changes):
+                self.search_index = await asyncio.to_thread(TokenSearchIndex.build, snapshot.by_mint)
+            else:
+                self.search_index.apply(changes)
+            self.snapshot = snapshot
+            self._loaded.set()
+            self.last_refresh = time.time()
+            self.refreshes += 1
+            logger.info(f"Token catalog refreshed: {len(tokens)} tokens in {time.monotonic() - started:.1f}s")
+
+    async def ensure_loaded(self):
+        """Wait for the background task's first pass, up to wait_secs.
+
+        Raises CatalogUnavailable if it doesn't land in time, or straight
+        away if the last attempt failed and the task is backing off.
+        """
+        if self.snapshot is not None:
+            return
+        self.start()
+        if self.failures:
+            raise CatalogUnavailable("Token list is unavailable right now, try again shortly.")
+        try:
+            await asyncio.wait_for(self._loaded.wait(), self.wait_secs)
+        except asyncio.TimeoutError:
+            raise CatalogUnavailable("Token list is still loading, try again shortly.") from None
+
+    def peek(self, mint: str):
+        """The token for mint if the catalog is loaded, without waiting for it."""
+        return self.snapshot.by_mint.get(mint) if self.snapshot else None
+
+    async def search(self, query: str, limit: int = 5) -> list:
+        """Tokens whose symbol or name starts with (or closely resembles) query."""
+        await self.ensure_loaded()
+        snapshot = self.snapshot
+        return self.search_index.search(query, snapshot.by_mint, limit, snapshot.views["marketCap"])
+
+    async def resolve(self, query: str):
+        """Mint address for a mint, symbol or name, or None if nothing matches."""
+        query = query.strip()
+        if MINT_ADDRESS.match(query):
+            return query
+        matches = await self.search(query, limit=1)
+        return matches[0].get("mintAddress") if matches else None
+
+    async def top(self, count: int, sort_by: str = None, filter_zero_price: bool = True) -> list:
+        """The first `count` tokens in API order, or by one of SORT_FIELDS."""
+        await self.ensure_loaded()
+        snapshot = self.snapshot
+        tokens = snapshot.views[sort_by] if sort_by else snapshot.tokens
+        if filter_zero_price:
+            tokens = (t for t in tokens if _number(t, "price") != 0)
+        return list(islice(tokens, count))
+
+    async def _run(self):
+        while True:
+            try:
+                await self.refresh()
+                self.failures = 0
+                delay = self.interval
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors += 1
+                self.failures += 1
+                delay = min(self.retry * 2 ** (self.failures - 1), self.interval)
+                logger.warning(f"Token catalog refresh failed ({self.failures} in a row), retrying in {delay:.0f}s: {e!r}")
+            await asyncio.sleep(delay)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "tokens": len(self.snapshot.tokens) if self.snapshot else 0,
+            "search_terms": self.search_index.stats()["terms"],
+            "refreshes": self.refreshes,
+            "errors": self.errors,
+            "failing": self.failures,
+            "pages_fetched": self.pages,
+            "age_s": round(time.time() - self.last_refresh, 1) if self.last_refresh else None,
+        }
+
+
+token_catalog = TokenCatalog()
+
+
+async def start_token_catalog(application=None):
+    """post_init hook: start the background load; requests don't wait on it here."""
+    token_catalog.start()
+
+
+async def close_token_catalog(application=None):
+    """post_shutdown hook: stop the refresh."""
+    await token_catalog.close()
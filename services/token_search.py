@@ -0,0 +1,188 @@
+# services/token_search.py
+import difflib
+import heapq
+import re
+from bisect import bisect_left, insort
+from collections import Counter, defaultdict
+
+# Term kinds, best first: a symbol match outranks a name match.
+SYMBOL, NAME, NAME_WORD = 0, 1, 2
+WORD = re.compile(r"[a-z0-9]+")
+FUZZY_CANDIDATES = 30
+FUZZY_CUTOFF = 0.6
+# Past this many prefix matches, walking tokens by market cap beats ranking them all.
+LARGE_PREFIX = 500
+
+
+def normalize(text: str) -> str:
+    return " ".join(WORD.findall((text or "").lower()))
+
+
+def token_terms(token: dict) -> set:
+    """(term, kind) pairs a token can be found by."""
+    terms = set()
+    symbol = normalize(token.get("symbol"))
+    if symbol:
+        terms.add((symbol.replace(" ", ""), SYMBOL))
+    name = normalize(token.get("name"))
+    if name:
+        terms.add((name, NAME))
+        words = name.split()
+        if len(words) > 1:
+            terms.update((word, NAME_WORD) for word in words if len(word) > 1)
+    return terms
+
+
+def market_cap(token: dict) -> float:
+    try:
+        return float(token.get("marketCap") or 0)
+    except (ValueError, TypeError):
+        return 0.0
+
+
+def trigrams(term: str) -> set:
+    padded = f" {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TokenSearchIndex:
+    """Prefix search over token symbols and names, with a fuzzy fallback.
+
+    Terms live in one sorted list of (term, kind, mint), so every term
+    starting with a prefix is a contiguous slice found with two bisects.
+    When nothing starts with the query, a trigram index proposes a few
+    similar terms and difflib picks the close ones. diff() compares a new
+    catalog against the indexed one so a refresh only touches tokens
+    whose symbol or name changed.
+    """
+
+    def __init__(self):
+        self._entries = []                    # sorted (term, kind, mint)
+        self._terms_by_mint = {}              # mint -> {(term, kind)}
+        self._term_refs = Counter()           # term -> number of entries
+        self._grams = defaultdict(set)        # trigram -> terms
+
+    def __len__(self):
+        return len(self._terms_by_mint)
+
+    @classmethod
+    def build(cls, by_mint: dict) -> "TokenSearchIndex":
+        index = cls()
+        index.apply(index.diff(by_mint))
+        return index
+
+    def diff(self, by_mint: dict) -> tuple:
+        """Changes needed to index a catalog's mint -> token map; doesn't modify the index."""
+        removed, added, changed = [], [], {}
+        for mint in self._terms_by_mint.keys() - by_mint.keys():
+            removed.extend((term, kind, mint) for term, kind in self._terms_by_mint[mint])
+            changed[mint] = None
+        for mint, token in by_mint.items():
+            terms = token_terms(token)
+            old = self._terms_by_mint.get(mint, set())
+            if terms == old:
+                continue
+            removed.extend((term, kind, mint) for term, kind in old - terms)
+            added.extend((term, kind, mint) for term, kind in terms - old)
+            changed[mint] = terms
+        return removed, added, changed
+
+    def is_large(self, changes: tuple) -> bool:
+        """Whether applying changes costs more than building a new index."""
+        removed, added, _ = changes
+        return len(removed) + len(added) > len(self._entries) // 4
+
+    def apply(self, changes: tuple):
+        removed, added, changed = changes
+        if self.is_large(changes):
+            dropped = set(removed)
+            self._entries = sorted([e for e in self._entries if e not in dropped] + added)
+        else:
+            for entry in removed:
+                del self._entries[bisect_left(self._entries, entry)]
+            for entry in added:
+                insort(self._entries, entry)
+        for mint, terms in changed.items():
+            if terms is None:
+                del self._terms_by_mint[mint]
+            else:
+                self._terms_by_mint[mint] = terms
+        for term, _, _ in removed:
+            self._term_refs[term] -= 1
+            if not self._term_refs[term]:
+                del self._term_refs[term]
+                for gram in trigrams(term):
+                    self._grams[gram].discard(term)
+        for term, _, _ in added:
+            if not self._term_refs[term]:
+                for gram in trigrams(term):
+                    self._grams[gram].add(term)
+            self._term_refs[term] += 1
+
+    def prefix(self, query: str) -> list:
+        """Entries whose term starts with query."""
+        lo = bisect_left(self._entries, (query,))
+        hi = bisect_left(self._entries, (query + "\uffff",))
+        return self._entries[lo:hi]
+
+    def fuzzy(self, query: str) -> list:
+        """Terms close to query (typos, missing letters), closest first."""
+        shared = Counter()
+        for gram in trigrams(query):
+            shared.update(self._grams.get(gram, ()))
+        candidates = [term for term, _ in shared.most_common(FUZZY_CANDIDATES)]
+        return difflib.get_close_matches(query, candidates, n=5, cutoff=FUZZY_CUTOFF)
+
+    def search(self, query: str, by_mint: dict, limit: int = 5, by_market_cap: list = None) -> list:
+        """Best matching tokens: exact before prefix, symbols before names, then by market cap.
+
+        by_market_cap (the catalog's tokens, largest first) lets very short
+        queries skip ranking thousands of prefix matches.
+        """
+        query = normalize(query)
+        if not query:
+            return []
+        entries = self.prefix(query)
+        if len(entries) > LARGE_PREFIX and by_market_cap is not None:
+            return self._search_large(query, entries, by_mint, limit, by_market_cap)
+        if entries:
+            closeness = lambda term: term != query
+        else:
+            close = self.fuzzy(query)
+            entries = [e for term in close for e in self.prefix(term) if e[0] == term]
+            closeness = close.index
+
+        def rank(entry):
+            term, kind, mint = entry
+            return (closeness(term), kind, -market_cap(by_mint.get(mint, {})))
+
+        results, seen = [], set()
+        # A token can match through several terms; over-fetch, then dedupe.
+        for _, _, mint in heapq.nsmallest(limit * 3, entries, key=rank):
+            if mint not in seen and mint in by_mint:
+                seen.add(mint)
+                results.append(by_mint[mint])
+                if len(results) == limit:
+                    break
+        return results
+
+    def _search_large(self, query, entries, by_mint, limit, by_market_cap) -> list:
+        exact = {mint for term, _, mint in entries[:limit * 3] if term == query}
+        results = [by_mint[mint] for mint in exact if mint in by_mint]
+        results.sort(key=market_cap, reverse=True)
+        for token in by_market_cap:
+            if len(results) >= limit:
+                break
+            mint = token.get("mintAddress")
+            if mint in exact:
+                continue
+            if any(term.startswith(query) for term, _ in self._terms_by_mint.get(mint, ())):
+                results.append(token)
+        return results[:limit]
+
+    def stats(self) -> dict:
+        return {
+            "tokens": len(self._terms_by_mint),
+            "terms": len(self._term_refs),
+            "entries": len(self._entries),
+        }
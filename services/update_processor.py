@@ -0,0 +1,144 @@
+# services/update_processor.py
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Awaitable
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+from config import UPDATE_CONCURRENCY, UPDATE_MAX_PENDING
+
+logger = logging.getLogger(__name__)
+
+BUSY_TEXT = "⏳ The bot is busy right now, please try again in a moment."
+# PTB spawns a task per update and parks the extras on the base class
+# semaphore, where they can't be seen or refused; admission is counted here.
+_UNBOUNDED = 2 ** 31 - 1
+
+
+class _KeyQueue:
+    __slots__ = ("lock", "depth")
+
+    def __init__(self):
+        self.lock = asyncio.Lock()   # FIFO: waiters acquire in arrival order
+        self.depth = 0
+
+
+class KeyedUpdateProcessor(BaseUpdateProcessor):
+    """Processes updates concurrently while keeping each chat's updates in order.
+
+    Every update first takes its chat's (or, without a chat, its user's) FIFO
+    lock and only then one of `concurrency` global slots, so a user stuck
+    behind their own slow /tokenDetails never occupies a slot another user
+    could run in. At most max_pending updates are admitted (running plus
+    waiting); past that an update is dropped and its sender told the bot is
+    busy.
+    """
+
+    def __init__(self, concurrency: int = UPDATE_CONCURRENCY, max_pending: int = UPDATE_MAX_PENDING):
+        super().__init__(_UNBOUNDED)
+        self.concurrency = concurrency
+        self.max_pending = max_pending
+        self._slots = None
+        self._queues = {}       # key -> _KeyQueue, dropped once empty
+        self._waits = deque(maxlen=1000)   # recent seconds from arrival to start
+        self.admitted = 0
+        self.running = 0
+        self.waiting_for_slot = 0
+        self.rejected = 0
+        self.processed = 0
+        self.max_wait = 0.0
+
+    @staticmethod
+    def ordering_key(update: object):
+        if isinstance(update, Update):
+            if update.effective_chat:
+                return ("chat", update.effective_chat.id)
+            if update.effective_user:
+                return ("user", update.effective_user.id)
+        return None
+
+    async def do_process_update(self, update: object, coroutine: Awaitable) -> None:
+        if self.admitted >= self.max_pending:
+            self.rejected += 1
+            coroutine.close()
+            await self._reply_busy(update)
+            return
+        self.admitted += 1
+        try:
+            await self._process(update, coroutine)
+        finally:
+            self.admitted -= 1
+
+    async def _process(self, update: object, coroutine: Awaitable):
+        arrived = time.monotonic()
+        key = self.ordering_key(update)
+        if key is None:
+            await self._run(arrived, coroutine)
+            return
+        queue = self._queues.get(key)
+        if queue is None:
+            queue = self._queues[key] = _KeyQueue()
+        queue.depth += 1
+        try:
+            async with queue.lock:
+                await self._run(arrived, coroutine)
+        finally:
+            queue.depth -= 1
+            if not queue.depth:
+                del self._queues[key]
+
+    async def _run(self, arrived: float, coroutine: Awaitable):
+        self.waiting_for_slot += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting_for_slot -= 1
+        waited = time.monotonic() - arrived
+        self._waits.append(waited)
+        self.max_wait = max(self.max_wait, waited)
+        self.running += 1
+        try:
+            await coroutine
+        finally:
+            self.running -= 1
+            self.processed += 1
+            self._slots.release()
+
+    @staticmethod
+    async def _reply_busy(update: object):
+        if not isinstance(update, Update):
+            return
+        try:
+            if update.callback_query:
+                await update.callback_query.answer(BUSY_TEXT)
+            elif update.effective_message:
+                await update.effective_message.reply_text(BUSY_TEXT)
+        except Exception as e:
+            logger.debug(f"Busy reply failed: {e!r}")
+
+    async def initialize(self) -> None:
+        self._slots = asyncio.Semaphore(self.concurrency)
+
+    async def shutdown(self) -> None:
+        pass
+
+    def stats(self) -> dict:
+        waits = sorted(self._waits)
+        return {
+            "running": self.running,
+            "concurrency": self.concurrency,
+            "admitted": self.admitted,
+            "max_pending": self.max_pending,
+            "waiting_for_slot": self.waiting_for_slot,
+            "rejected": self.rejected,
+            "keyed_queues": len(self._queues),
+            "max_queue_depth": max((q.depth for q in self._queues.values()), default=0),
+            "processed": self.processed,
+            "wait_p50_ms": round(waits[len(waits) // 2] * 1000, 1) if waits else 0.0,
+            "wait_p95_ms": round(waits[int(len(waits) * 0.95)] * 1000, 1) if waits else 0.0,
+            "wait_max_ms": round(self.max_wait * 1000, 1),
+        }
+
+
+update_processor = KeyedUpdateProcessor()
@@ -0,0 +1,170 @@
+# services/vybe_client.py
+import logging
+import re
+import time
+import aiohttp
+from config import VYBE_API_KEY, VYBE_BASE_URL
+from services.response_cache import ResponseCache
+
+logger = logging.getLogger(__name__)
+
+# Total request timeout (seconds) per endpoint prefix; first match wins.
+ENDPOINT_TIMEOUTS = [
+    ("/token/transfers", 20),
+    ("/tokens", 20),
+    ("/nft/", 20),
+    ("/price/", 15),
+    ("/account/", 10),
+    ("/token/", 10),
+]
+DEFAULT_TIMEOUT = 10
+CONNECT_TIMEOUT = 5
+
+# Response cache TTL (seconds) per endpoint pattern; first match wins, 0 disables.
+ENDPOINT_TTLS = [
+    (re.compile(r"^/account/known-accounts$"), 6 * 3600),
+    (re.compile(r"^/account/token-balance/"), 15),
+    (re.compile(r"^/token/transfers$"), 10),
+    (re.compile(r"^/token/[^/]+/top-holders$"), 60),
+    (re.compile(r"^/token/[^/]+/holders-ts$"), 15 * 60),
+    (re.compile(r"^/token/[^/]+$"), 30),
+    (re.compile(r"^/tokens$"), 60),
+    (re.compile(r"^/nft/collection-owners/"), 10 * 60),
+    (re.compile(r"^/price/[^/]+/pyth-price$"), 5),
+]
+DEFAULT_TTL = 0
+
+# OHLCV requests are keyed on time buckets so "last N days" lookups made a few
+# seconds apart share one cache entry until the bucket rolls over.
+OHLCV_PATH = re.compile(r"^/price/[^/]+/(token-ohlcv|pyth-price-ohlc|pyth-price-ts)$")
+OHLCV_MAX_BUCKET = 15 * 60
+RESOLUTION_SECONDS = {"m": 60, "h": 3600, "d": 86400, "w": 7 * 86400}
+
+
+def resolution_seconds(resolution: str) -> int:
+    """Convert an API resolution such as '15m' or '1d' to seconds."""
+    match = re.fullmatch(r"(\d+)([mhdw])", str(resolution or "").strip().lower())
+    if not match:
+        return 86400
+    return int(match.group(1)) * RESOLUTION_SECONDS[match.group(2)]
+
+
+class VybeClient:
+    """Shared Vybe API client backed by one keep-alive connection pool.
+
+    The session is opened in the Application's post_init hook and closed in
+    post_shutdown, so every handler reuses warm TCP/TLS connections and cached
+    DNS lookups instead of paying for a new ClientSession per call.
+    """
+
+    def __init__(
+        self,
+        base_url: str = VYBE_BASE_URL,
+        api_key: str = VYBE_API_KEY,
+        limit: int = 100,
+        limit_per_host: int = 30,
+        dns_ttl: int = 300,
+        keepalive_timeout: float = 60,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.dns_ttl = dns_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self._session = None
+        self.cache = ResponseCache()
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """Return the pooled session, opening it on first use."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                ttl_dns_cache=self.dns_ttl,
+                keepalive_timeout=self.keepalive_timeout,
+                enable_cleanup_closed=True,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers={"accept": "application/json", "X-API-KEY": self.api_key or ""},
+                raise_for_status=False,
+            )
+        return self._session
+
+    async def start(self):
+        """Open the connection pool."""
+        _ = self.session
+        logger.info("VybeClient started (limit=%s, per_host=%s)", self.limit, self.limit_per_host)
+
+    async def close(self):
+        """Close the connection pool and release sockets."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        logger.info("VybeClient closed")
+
+    @staticmethod
+    def timeout_for(path: str) -> aiohttp.ClientTimeout:
+        """Pick the request timeout for an API path."""
+        total = DEFAULT_TIMEOUT
+        for prefix, seconds in ENDPOINT_TIMEOUTS:
+            if path.startswith(prefix):
+                total = seconds
+                break
+        return aiohttp.ClientTimeout(total=total, connect=CONNECT_TIMEOUT)
+
+    @staticmethod
+    def cache_policy(path: str, params: dict = None):
+        """Return (cache_key, ttl) for a request."""
+        params = dict(params or {})
+        if OHLCV_PATH.match(path) and "timeEnd" in params:
+            bucket = min(resolution_seconds(params.get("resolution")), OHLCV_MAX_BUCKET)
+            now = time.time()
+            for field in ("timeStart", "timeEnd"):
+                if field in params:
+                    params[field] = int(params[field]) // bucket
+            # Live windows expire with the current bucket, fully historical ones last longer.
+            ttl = bucket - (now % bucket) if int(params["timeEnd"]) * bucket + bucket > now else 6 * 3600
+        else:
+            ttl = next((seconds for pattern, seconds in ENDPOINT_TTLS if pattern.match(path)), DEFAULT_TTL)
+        key = (path, tuple(sorted((k, str(v)) for k, v in params.items())))
+        return key, ttl
+
+    async def get(self, path: str, params: dict = None, timeout: float = None, ttl: float = None):
+        """GET a Vybe API path and return the decoded JSON body.
+
+        Responses are cached per endpoint+params (see ENDPOINT_TTLS) and
+        identical concurrent requests share one in-flight call; pass ttl=0
+        to bypass the cache. Raises aiohttp.ClientResponseError on non-2xx
+        responses and asyncio.TimeoutError when the endpoint timeout is exceeded.
+        """
+        key, default_ttl = self.cache_policy(path, params)
+        ttl = default_ttl if ttl is None else ttl
+        if ttl <= 0:
+            return await self._fetch(path, params, timeout)
+        return await self.cache.get_or_fetch(key, ttl, lambda: self._fetch(path, params, timeout))
+
+    async def _fetch(self, path: str, params: dict = None, timeout: float = None):
+        client_timeout = aiohttp.ClientTimeout(total=timeout, connect=CONNECT_TIMEOUT) if timeout else self.timeout_for(path)
+        async with self.session.get(f"{self.base_url}{path}", params=params, timeout=client_timeout) as resp:
+            resp.raise_for_status()
+            return await resp.json()
+
+    def stats(self) -> dict:
+        """Cache counters for tuning TTLs."""
+        return self.cache.stats()
+
+
+vybe = VybeClient()
+
+
+async def start_client(application):
+    """Application post_init hook."""
+    await vybe.start()
+
+
+async def close_client(application):
+    """Application post_shutdown hook."""
+    await vybe.close()
@@ -0,0 +1,288 @@
+# services/whale_feed.py
+import asyncio
+import heapq
+import logging
+import math
+import time
+from bisect import bisect_left, insort
+from collections import defaultdict, deque
+from contextlib import aclosing
+from itertools import islice
+from config import (
+    WHALE_POLL_SECS, WHALE_BUFFER_SIZE, WHALE_POLL_LIMIT,
+    WHALE_FETCH_PAGE_SIZE, WHALE_FETCH_MAX_PAGES,
+)
+from services.vybe_client import vybe
+
+logger = logging.getLogger(__name__)
+
+# Re-request a little history each poll; duplicates are dropped by signature.
+POLL_OVERLAP_SECS = 60
+
+
+def transfer_record(transfer: dict):
+    """Normalize one /token/transfers item, or None if it has no usable value."""
+    try:
+        value_usd = float(transfer.get("valueUsd", "0"))
+    except (ValueError, TypeError):
+        return None
+    if not math.isfinite(value_usd):
+        # NaN would break the sorted value index.
+        return None
+    return {
+        "signature": transfer.get("signature"),
+        "mintAddress": transfer.get("mintAddress"),
+        "senderAddress": transfer.get("senderAddress"),
+        "receiverAddress": transfer.get("receiverAddress"),
+        "amount": transfer.get("amount"),
+        "calculatedAmount": transfer.get("calculatedAmount"),
+        "valueUsd": value_usd,
+        "blockTime": transfer.get("blockTime"),
+    }
+
+
+async def iter_transfers(min_usd: float = 0.0, mint: str = None,
+                         page_size: int = WHALE_FETCH_PAGE_SIZE, max_pages: int = WHALE_FETCH_MAX_PAGES):
+    """Yield transfers worth ≥ min_usd, newest first, one API page at a time.
+
+    The USD floor, mint, page size and sort order are sent as query
+    parameters, so the API does the filtering; the next page is only
+    requested once the caller has consumed the current one.
+    """
+    params = {"limit": page_size, "sortByDesc": "blockTime"}
+    if min_usd > 0:
+        params["minUsdAmount"] = min_usd
+    if mint:
+        params["mintAddress"] = mint
+    for page in range(max_pages):
+        data = await vybe.get("/token/transfers", params={**params, "page": page})
+        transfers = data.get("transfers", [])
+        for record in map(transfer_record, transfers):
+            if record and record["valueUsd"] >= min_usd:
+                yield record
+        if len(transfers) < page_size:
+            return
+
+
+async def fetch_transfers(min_usd: float = 0.0, count: int = None, mint: str = None) -> list:
+    """The newest `count` transfers worth ≥ min_usd, stopping as soon as they're found."""
+    page_size = min(count, WHALE_FETCH_PAGE_SIZE) if count else WHALE_FETCH_PAGE_SIZE
+    results, seen = [], set()
+    async with aclosing(iter_transfers(min_usd, mint, page_size)) as transfers:
+        async for record in transfers:
+            # New transfers landing between page requests shift items across pages.
+            if record["signature"] in seen:
+                continue
+            seen.add(record["signature"])
+            results.append(record)
+            if count is not None and len(results) >= count:
+                break
+    return results
+
+
+class TransferBuffer:
+    """The last `capacity` transfers, deduplicated by signature.
+
+    Besides the insertion-ordered ring, transfers are indexed by valueUsd
+    (a sorted list, so "≥ threshold" is one bisect) and by mint.
+    """
+
+    def __init__(self, capacity: int = WHALE_BUFFER_SIZE):
+        self.capacity = capacity
+        self._seq = 0
+        self._ring = deque()                 # seq, oldest first
+        self._records = {}                   # seq -> record
+        self._by_value = []                  # sorted (valueUsd, seq)
+        self._by_mint = defaultdict(deque)   # mint -> seqs, oldest first
+        self._signatures = set()
+
+    def __len__(self):
+        return len(self._ring)
+
+    def add(self, record: dict) -> bool:
+        """Insert a record; returns False for a signature already buffered."""
+        signature = record.get("signature")
+        if signature in self._signatures:
+            return False
+        self._seq += 1
+        seq = self._seq
+        self._ring.append(seq)
+        self._records[seq] = record
+        insort(self._by_value, (record["valueUsd"], seq))
+        self._by_mint[record.get("mintAddress")].append(seq)
+        if signature:
+            self._signatures.add(signature)
+        while len(self._ring) > self.capacity:
+            self._evict_oldest()
+        return True
+
+    def _evict_oldest(self):
+        seq = self._ring.popleft()
+        record = self._records.pop(seq)
+        i = bisect_left(self._by_value, (record["valueUsd"], seq))
+        del self._by_value[i]
+        mint = record.get("mintAddress")
+        mint_seqs = self._by_mint[mint]
+        mint_seqs.popleft()
+        if not mint_seqs:
+            del self._by_mint[mint]
+        self._signatures.discard(record.get("signature"))
+
+    def query(self, min_usd: float = 0.0, count: int = None, mint: str = None) -> list:
+        """Most recent transfers worth ≥ min_usd (optionally of one mint), newest first."""
+        if mint is not None:
+            seqs = (seq for seq in reversed(self._by_mint.get(mint, ()))
+                    if self._records[seq]["valueUsd"] >= min_usd)
+            if count is not None:
+                seqs = islice(seqs, count)
+            return [self._records[seq] for seq in seqs]
+        start = bisect_left(self._by_value, (min_usd, 0))
+        matches = len(self._by_value) - start
+        if count is not None and count * len(self._ring) <= matches * matches:
+            # Dense matches: walking the ring newest-first finds `count` of
+            # them after ~count * len / matches steps.
+            seqs = (seq for seq in reversed(self._ring) if self._records[seq]["valueUsd"] >= min_usd)
+            return [self._records[seq] for seq in islice(seqs, count)]
+        seqs = [seq for _, seq in self._by_value[start:]]
+        newest = heapq.nlargest(count, seqs) if count is not None else sorted(seqs, reverse=True)
+        return [self._records[seq] for seq in newest]
+
+
+class WhaleFeed:
+    """Polls /token/transfers in the background into a TransferBuffer."""
+
+    def __init__(self, interval: float = WHALE_POLL_SECS):
+        self.interval = interval
+        self.buffer = TransferBuffer()
+        self._cursor = None        # newest blockTime seen
+        self._task = None
+        self._poll_lock = asyncio.Lock()
+        self._listeners = []
+        self._notify_tasks = set()
+        self.last_poll = None
+        self.polls = 0
+        self.errors = 0
+        self.added = 0
+        self.duplicates = 0
+        self.fetches = 0
+
+    async def poll_once(self):
+        async with self._poll_lock:
+            params = {"limit": WHALE_POLL_LIMIT}
+            if self._cursor is not None:
+                params["timeStart"] = self._cursor - POLL_OVERLAP_SECS
+            data = await vybe.get("/token/transfers", params=params, ttl=0)
+            records = [r for r in map(transfer_record, data.get("transfers", [])) if r]
+            # Oldest first, so buffer order follows block time.
+            records.sort(key=lambda r: r["blockTime"] or 0)
+            backfill = self.last_poll is None
+            new = []
+            for record in records:
+                if self.buffer.add(record):
+                    new.append(record)
+                else:
+                    self.duplicates += 1
+                if record["blockTime"]:
+                    self._cursor = max(self._cursor or 0, record["blockTime"])
+            self.added += len(new)
+            self.polls += 1
+            self.last_poll = time.time()
+        # The first poll is history, not news; don't push it.
+        if new and not backfill:
+            self._notify(new)
+
+    def add_listener(self, callback):
+        """Register `async callback(records)` for transfers new since the last poll."""
+        self._listeners.append(callback)
+
+    def _notify(self, records: list):
+        # Fan-out runs in its own task so polls (and inline polls from
+        # user requests) never wait for message delivery.
+        for callback in self._listeners:
+            task = asyncio.get_running_loop().create_task(callback(records))
+            self._notify_tasks.add(task)
+            task.add_done_callback(self._notify_done)
+
+    def _notify_done(self, task: asyncio.Task):
+        self._notify_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Whale listener failed: {task.exception()!r}")
+
+    async def ensure_fresh(self):
+        """Poll now if the background loop hasn't delivered anything recent."""
+        if self.last_poll is None or time.time() - self.last_poll > 3 * self.interval:
+            await self.poll_once()
+
+    async def query(self, min_usd: float = 0.0, count: int = None, mint: str = None) -> list:
+        try:
+            await self.ensure_fresh()
+        except Exception as e:
+            # Serve what we have; only fail when there is nothing buffered at all.
+            if not len(self.buffer):
+                raise
+            logger.warning(f"Whale feed is stale, serving buffered transfers: {e!r}")
+        results = self.buffer.query(min_usd, count, mint)
+        if count is None or len(results) >= count:
+            return results
+        # The buffer only covers recent history; high thresholds can need older
+        # transfers, so ask the API for exactly those.
+        try:
+            fetched = await fetch_transfers(min_usd, count, mint)
+        except Exception as e:
+            logger.warning(f"Whale transfer fetch failed, serving buffered transfers: {e!r}")
+            return results
+        self.fetches += 1
+        merged = {r["signature"]: r for r in fetched}
+        merged.update((r["signature"], r) for r in results)
+        return heapq.nlargest(count, merged.values(), key=lambda r: r["blockTime"] or 0)
+
+    async def _run(self):
+        while True:
+            try:
+                await self.poll_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors += 1
+                logger.warning(f"Whale poll failed: {e!r}")
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for task in list(self._notify_tasks):
+            task.cancel()
+
+    def stats(self) -> dict:
+        return {
+            "buffered": len(self.buffer),
+            "capacity": self.buffer.capacity,
+            "polls": self.polls,
+            "errors": self.errors,
+            "added": self.added,
+            "duplicates": self.duplicates,
+            "fetches": self.fetches,
+            "last_poll_age_s": round(time.time() - self.last_poll, 1) if self.last_poll else None,
+        }
+
+
+whale_feed = WhaleFeed()
+
+
+async def start_whale_feed(application=None):
+    """post_init hook: start the background poller."""
+    whale_feed.start()
+
+
+async def close_whale_feed(application=None):
+    """post_shutdown hook: stop the poller."""
+    await whale_feed.close()
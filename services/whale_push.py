@@ -0,0 +1,148 @@
+# services/whale_push.py
+import asyncio
+import logging
+import math
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict
+from datetime import datetime, UTC
+from telegram.error import Forbidden
+from config import WHALE_PUSH_CONCURRENCY, WHALE_PUSH_MAX_PER_MESSAGE
+from favorites_handlers import db
+from services.whale_feed import whale_feed
+
+logger = logging.getLogger(__name__)
+
+
+class SubscriptionIndex:
+    """chat_id -> min_usd, plus the same pairs sorted by threshold.
+
+    The chats to alert for a transfer worth v are exactly the prefix of the
+    sorted list with min_usd <= v, found with one bisect.
+    """
+
+    def __init__(self):
+        self._sorted = []      # (min_usd, chat_id)
+        self._by_chat = {}
+
+    def __len__(self):
+        return len(self._by_chat)
+
+    def get(self, chat_id: int):
+        return self._by_chat.get(chat_id)
+
+    def set(self, chat_id: int, min_usd: float):
+        self.remove(chat_id)
+        self._by_chat[chat_id] = min_usd
+        insort(self._sorted, (min_usd, chat_id))
+
+    def remove(self, chat_id: int) -> bool:
+        min_usd = self._by_chat.pop(chat_id, None)
+        if min_usd is None:
+            return False
+        del self._sorted[bisect_left(self._sorted, (min_usd, chat_id))]
+        return True
+
+    def matching(self, value_usd: float) -> list:
+        end = bisect_right(self._sorted, (value_usd, math.inf))
+        return [chat_id for _, chat_id in self._sorted[:end]]
+
+
+def format_alert(record: dict) -> str:
+    block_time = record.get("blockTime")
+    when = datetime.fromtimestamp(block_time, tz=UTC).strftime('%Y-%m-%d %H:%M:%S') if block_time else "N/A"
+    return (
+        f"🐋 *${record['valueUsd']:,.2f}* transfer\n"
+        f"  • Token: `{record.get('mintAddress') or 'N/A'}`\n"
+        f"  • From: `{record.get('senderAddress') or 'N/A'}`\n"
+        f"  • To: `{record.get('receiverAddress') or 'N/A'}`\n"
+        f"  • Amount: {record.get('calculatedAmount') or 'N/A'}\n"
+        f"  • ⏰ {when} UTC\n"
+        f"  • 🔑 `{record.get('signature') or 'N/A'}`"
+    )
+
+
+class WhalePusher:
+    """Pushes new whale transfers to subscribed chats."""
+
+    def __init__(self):
+        self.index = SubscriptionIndex()
+        self.bot = None
+        self._send_slots = asyncio.Semaphore(WHALE_PUSH_CONCURRENCY)
+        self.batches = 0
+        self.messages = 0
+        self.alerts_formatted = 0
+        self.failures = 0
+
+    async def load(self, bot):
+        self.bot = bot
+        for chat_id, min_usd in (await db.load_whale_subscriptions()).items():
+            self.index.set(chat_id, min_usd)
+        logger.info(f"Loaded {len(self.index)} whale subscriptions")
+
+    async def subscribe(self, chat_id: int, min_usd: float):
+        await db.set_whale_subscription(chat_id, min_usd)
+        self.index.set(chat_id, min_usd)
+
+    async def unsubscribe(self, chat_id: int) -> bool:
+        await db.remove_whale_subscription(chat_id)
+        return self.index.remove(chat_id)
+
+    async def on_transfers(self, records: list):
+        """whale_feed listener: one message per chat with its matching alerts."""
+        if not len(self.index) or self.bot is None:
+            return
+        per_chat = defaultdict(list)
+        for i, record in enumerate(sorted(records, key=lambda r: r["valueUsd"], reverse=True)):
+            for chat_id in self.index.matching(record["valueUsd"]):
+                per_chat[chat_id].append((i, record))
+        if not per_chat:
+            return
+        formatted = {}   # each alert is formatted once, whatever the number of recipients
+
+        def text_for(chat_id, matches):
+            shown = matches[:WHALE_PUSH_MAX_PER_MESSAGE]
+            for i, record in shown:
+                if i not in formatted:
+                    formatted[i] = format_alert(record)
+                    self.alerts_formatted += 1
+            text = f"🔔 *Whale Alert* (≥ ${self.index.get(chat_id) or 0:,.0f})\n\n"
+            text += "\n\n".join(formatted[i] for i, _ in shown)
+            if len(matches) > len(shown):
+                text += f"\n\n…and {len(matches) - len(shown)} more. Use /whalealert to see them."
+            return text
+
+        self.batches += 1
+        await asyncio.gather(*(self._send(chat_id, text_for(chat_id, matches))
+                               for chat_id, matches in per_chat.items()))
+
+    async def _send(self, chat_id: int, text: str):
+        async with self._send_slots:
+            try:
+                await self.bot.send_message(chat_id, text, parse_mode="Markdown",
+                                            disable_web_page_preview=True)
+                self.messages += 1
+            except Forbidden:
+                # Bot was blocked or removed from the chat.
+                logger.info(f"Dropping whale subscription for unreachable chat {chat_id}")
+                await self.unsubscribe(chat_id)
+            except Exception as e:
+                self.failures += 1
+                logger.warning(f"Whale alert to {chat_id} failed: {e!r}")
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": len(self.index),
+            "batches": self.batches,
+            "messages": self.messages,
+            "alerts_formatted": self.alerts_formatted,
+            "failures": self.failures,
+        }
+
+
+whale_pusher = WhalePusher()
+
+
+async def start_whale_push(application):
+    """post_init hook: load subscriptions and listen for new transfers."""
+    await whale_pusher.load(application.bot)
+    whale_feed.add_listener(whale_pusher.on_transfers)
@@ -8,10 +8,9 @@ from datetime import datetime
 import logging
 import time
 import aiohttp
-import matplotlib
-matplotlib.use('Agg')  # Headless backend for server environments
-import matplotlib.pyplot as plt
 from io import BytesIO
+from services.chart_renderer import chart_renderer
+from charts import renderers
 
 load_dotenv()
 TELEGRAM_TOKEN = os.getenv("TELEGRAM_TOKEN")
@@ -258,65 +257,12 @@ async def tutorial_callback(update: Update, context: ContextTypes.DEFAULT_TYPE)
 #     token_info = await slashutils.get_token_details(token_mint)
 #     await update.message.reply_text(token_info, parse_mode="Markdown")
 import asyncio
-from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
-
-COOKIE_SELECTORS = [
-    'button[title="ACCEPT ALL"]',
-    'button:has-text("Accept All")',
-    'button:has-text("Accept Cookies")',
-    'text="Accept"',
-    'button#accept-cookies',  # Additional common selectors
-    'button.cookie-accept'
-]
-
-async def _dismiss_cookies(page):
-    await page.wait_for_timeout(3000)  # Increased initial wait
-    found = False
-    for sel in COOKIE_SELECTORS:
-        try:
-            btn = page.locator(sel)
-            if await btn.is_visible(timeout=5000):  # Longer timeout per selector
-                await btn.click()
-                await page.wait_for_timeout(2000)  # Wait for pop-up to close
-                found = True
-                break
-        except Exception as e:  # Broad exception to catch any errors
-            print(f"Cookie dismissal attempt failed for {sel}: {e}")
-            continue
-    # If not found, try to remove common cookie containers via JS
-    if not found:
-        await page.evaluate('''() => {
-            const selectors = [
-                '.cookie-banner', '#cookie-consent', '.cookieconsent',
-                '.cookies-modal', '#cookieModal', '.cc-banner'
-            ];
-            selectors.forEach(selector => {
-                document.querySelectorAll(selector).forEach(el => el.remove());
-            });
-        }''')
-        await page.wait_for_timeout(1000)  # Allow time for DOM update
-    return found
-
-async def _take_screenshot(page, path):
-    try:
-        # Attempt to wait for chart elements but proceed if they timeout
-        await page.wait_for_selector('div.chart-gui-wrapper', timeout=20000)
-        await page.wait_for_selector('div.chart-gui-wrapper canvas', state="visible", timeout=20000)
-        # Scroll into view if possible
-        await page.evaluate('''() => {
-            const canvas = document.querySelector('div.chart-gui-wrapper canvas');
-            if (canvas) canvas.scrollIntoView({ behavior: 'instant', block: 'center' });
-        }''')
-    except Exception as e:
-        print(f"Error waiting for chart elements: {e}")
-    try:
-        # Wait for loading spinner to disappear
-        await page.wait_for_selector('div.chart-gui-wrapper .loading-spinner', state="detached", timeout=15000)
-    except Exception as e:
-        print(f"Loading spinner still present: {e}")
-    # Final wait and screenshot
-    await page.wait_for_timeout(3000)
-    await page.screenshot(path=path, full_page=True)
+from services.screenshots import screenshot_cache, token_page_url
+from services.cached_photo import reply_cached_photo
+from services.token_catalog import token_catalog
+from config import CHART_COMPARE_MAX, PYTH_MAX_LISTS
+import handlers.pyth as pyth
+from favorites_handlers import db
 
 async def token_details(update: Update, context: ContextTypes.DEFAULT_TYPE):
     loader_msg = await update.message.reply_text("⏳ Incoming 'token deets'...")
@@ -328,8 +274,7 @@ async def token_details(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
 
     token_mint = context.args[0]
-    url = f"https://vybe.fyi/tokens/{token_mint}"
-    screenshot_path = f"screenshot_{token_mint}.png"
+    url = token_page_url(token_mint)
 
     # Send token info
     token_info = await slashutils.get_token_details(token_mint)
@@ -348,42 +293,23 @@ async def token_details(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     loading_msg = await update.message.reply_text("⏳ Loading chart image...")
 
-    #  Generate screenshot
-    chart_found = False
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True, args=['--no-sandbox'])
-        page = await browser.new_page()
-        try:
-            await page.goto(url, wait_until="networkidle", timeout=60000)  # Increased timeout
-        except Exception as e:
-            print(f"Navigation error: {e}")
-        try:
-            await _dismiss_cookies(page)
-        except Exception as e:
-            print(f"Cookie dismissal error: {e}")
-        try:
-            await _take_screenshot(page, screenshot_path)
-            chart_found = True
-        except Exception as e:
-            print(f"[token_details] Screenshot error: {e}")
-        finally:
-            await browser.close()
-            
+    #  Cached (or freshly rendered) chart screenshot
+    shot = await screenshot_cache.get(token_mint)
+
     await loading_msg.delete()
 
     # Send chart or fallback with inline button
-    if chart_found and os.path.exists(screenshot_path):
-        # chart_caption = f"Chart for `{token_mint}`"
+    if shot:
         chart_keyboard = InlineKeyboardMarkup(
             [[InlineKeyboardButton("Track & View live chart on ALPHAVYBE", url=url)]]
         )
-        with open(screenshot_path, "rb") as img:
-            await update.message.reply_photo(
-                photo=img,
-                caption=info_text,
-                reply_markup=chart_keyboard,
-                parse_mode="Markdown"
-            )
+        await reply_cached_photo(
+            update.message,
+            shot,
+            caption=info_text,
+            reply_markup=chart_keyboard,
+            parse_mode="Markdown"
+        )
         await token_deets.delete()
     else:
         fallback_keyboard = InlineKeyboardMarkup(
@@ -394,10 +320,6 @@ async def token_details(update: Update, context: ContextTypes.DEFAULT_TYPE):
             reply_markup=fallback_keyboard
         )
 
-    # Cleanup temp file
-    if os.path.exists(screenshot_path):
-        os.remove(screenshot_path)
-
 async def get_balance(update: Update, context: ContextTypes.DEFAULT_TYPE):
     wallet_address = context.args[0] if context.args else None
     if not wallet_address:
@@ -428,8 +350,7 @@ async def whale_alert(update: Update, context: ContextTypes.DEFAULT_TYPE):
             alert_count = int(context.args[1]) if len(context.args) > 1 else 7
 
         # Fetch whale transfers asynchronously.
-        alerts = await slashutils.detect_whale_transfers(cap=threshold)
-        alerts = alerts[:alert_count]
+        alerts = await slashutils.detect_whale_transfers(cap=threshold, count=alert_count)
 
         if alerts:
             message = (
@@ -485,6 +406,7 @@ async def check_prices(update: Update, context: ContextTypes.DEFAULT_TYPE):
       /prices                -> Displays 10 tokens (default)
       /prices 15             -> Displays 15 tokens
       /prices <token_mint>   -> Displays details for the specified token
+      /prices <symbol|name>  -> Same, looked up by symbol or name (e.g. /prices bonk)
     """
     # If no arguments, show default 10 tokens.
     if not context.args:
@@ -498,18 +420,21 @@ async def check_prices(update: Update, context: ContextTypes.DEFAULT_TYPE):
         price_info = await slashutils.get_token_price(count=count)
         await send_chunks(update, price_info)
     except ValueError:
-        # Otherwise, assume the argument is a token mint address.
-        token_mint = context.args[0]
+        # Otherwise, the arguments are a token mint address, symbol or name.
+        token_mint = " ".join(context.args)
         price_info = await slashutils.get_token_price(token_mint=token_mint)
         await send_chunks(update, price_info)
 
 async def top_token_holders(update: Update, context: ContextTypes.DEFAULT_TYPE):
     try:
         if len(context.args) < 1:
-            await update.message.reply_text("❌ Usage: /topholders <mintAddress> [count]")
+            await update.message.reply_text("❌ Usage: /topholders <mintAddress|symbol> [count]")
             return
 
-        mint_address = context.args[0]
+        mint_address = await token_catalog.resolve(context.args[0])
+        if not mint_address:
+            await update.message.reply_text(f"❌ No token found matching: {context.args[0]}")
+            return
         count = int(context.args[1]) if len(context.args) > 1 else 10
 
         holders = await slashutils.get_top_token_holders(mint_address, count)
@@ -518,72 +443,20 @@ async def top_token_holders(update: Update, context: ContextTypes.DEFAULT_TYPE):
             await update.message.reply_text("😕 No data found for this token.", parse_mode="Markdown")
             return
 
-        # **Step 1: Prepare data for the chart**
-        balances = []
-        percentages = []
-        labels = []
-        for holder in holders:
-            try:
-                balance = float(holder['balance'])  # Convert balance to float
-            except (ValueError, TypeError):
-                balance = 0.0  # Default to 0 if conversion fails
-            balances.append(balance)
-            try:
-                percentage = float(holder['percentageOfSupplyHeld'])  # Convert percentage
-            except (ValueError, TypeError):
-                percentage = 0.0
-            percentages.append(percentage)
-            # Use ownerName if available, else truncate ownerAddress
-            name = holder.get('ownerName')
-            if name:
-                label = name[:20]  # Limit name length to avoid clutter
-            else:
-                addr = holder.get('ownerAddress', 'Unknown')
-                label = f"{addr[:4]}...{addr[-4:]}"  # Truncate to first 4 + last 4 chars
-            labels.append(label)
-
-        # **Step 2: Generate the bar chart with dual axes**
-        fig, ax1 = plt.subplots(figsize=(10, 7))  # Increased height for vertical labels
-        ax1.bar(labels, balances, color='skyblue', alpha=0.6, label='Amount Held')
-        ax1.set_xlabel('Holder')
-        ax1.set_ylabel('Amount Held', color='skyblue')
-        ax1.tick_params(axis='y', labelcolor='skyblue')
-        ax1.set_xticks(range(len(labels)))
-        ax1.set_xticklabels(labels, rotation=90, ha='center', fontsize=8)  # Vertical labels
-
-        # Secondary axis for percentage
-        ax2 = ax1.twinx()
-        ax2.plot(labels, percentages, color='orange', marker='o', label='% Supply Held')
-        ax2.set_ylabel('% Supply Held', color='orange')
-        ax2.tick_params(axis='y', labelcolor='orange')
-
-        # Title with token name or mint address
+        # **Step 1: Render the chart in a worker process**
         token_symbol = holders[0].get("tokenSymbol", None)
         title = f"Top {count} Holders of {token_symbol if token_symbol and token_symbol != 'N/A' else mint_address}"
-        plt.title(title)
+        payload = renderers.holders_payload(holders, title, height=7, label_fontsize=8)
+        buf = BytesIO(await chart_renderer.render("holders", payload))
 
-        # Combine legends
-        lines1, labels1 = ax1.get_legend_handles_labels()
-        lines2, labels2 = ax2.get_legend_handles_labels()
-        ax1.legend(lines1 + lines2, labels1 + labels2, loc='upper right')
-
-        # Adjust layout to prevent cutoff
-        plt.tight_layout()
-
-        # Save chart to a BytesIO object
-        buf = BytesIO()
-        plt.savefig(buf, format='png', bbox_inches='tight')
-        buf.seek(0)
-        plt.close()  # Free up memory
-
-        # **Step 3: Send the chart with a brief caption**
+        # **Step 2: Send the chart with a brief caption**
         await update.message.reply_photo(
             photo=buf,
             caption=f"📊 Top {count} holders of {token_symbol if token_symbol and token_symbol != 'N/A' else mint_address}"
         )
         buf.close()  # Clean up
 
-        # **Step 4: Send the detailed text as separate messages**
+        # **Step 3: Send the detailed text as separate messages**
         message = (
             f"👑 *Top {count} Holders of Token:* `{mint_address}` — *{token_symbol if token_symbol else 'N/A'}*\n"
             f"🔔 [see more insights on Alphavybe](https://alpha.vybenetwork.com/)\n\n"
@@ -607,32 +480,127 @@ async def top_token_holders(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text("❌ An error occurred while fetching top holders.")
 
 async def chart(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    if len(context.args) != 1:
-        await update.message.reply_text("Usage: /chart <mint_address>")
+    """Handle /chart.
+
+    Usage:
+      /chart <token>                 -> 30-day candlestick chart
+      /chart <token> <token> ...     -> 30-day relative performance of several tokens
+    A token is a mint address, symbol or name; separate multi-word names with commas.
+    """
+    if not context.args:
+        await update.message.reply_text(
+            "Usage: /chart <mint_address|symbol|name> [more tokens to compare]"
+        )
         return
 
-    mint_address = context.args[0]
     resolution = '1d'  # Daily data points
     time_end = int(time.time())
     time_start = time_end - (30 * 24 * 60 * 60)  # Last 30 days
 
+    text = " ".join(context.args)
+    queries = [q.strip() for q in text.split(",") if q.strip()] if "," in text else list(context.args)
+    if len(queries) > 1:
+        await compare_chart(update, queries, resolution, time_start, time_end)
+        return
+
     try:
-        ohlcv_data = await slashutils.fetch_ohlcv_data(mint_address, resolution, time_start, time_end)
-        if not ohlcv_data:
+        query = queries[0]
+        mint_address = await token_catalog.resolve(query)
+        if not mint_address:
+            await update.message.reply_text(f"No token found matching: {query}")
+            return
+        chart_image = await slashutils.get_price_chart(mint_address, resolution, time_start, time_end)
+        if not chart_image:
             await update.message.reply_text("No data available for the provided mint address.")
             return
 
-        chart_image = await slashutils.generate_price_chart(ohlcv_data)
         token_name = await slashutils.get_token_name_for_chart(mint_address)
         await update.message.reply_text(f"{token_name}📈 Price Chart:", parse_mode="Markdown")
-        await update.message.reply_photo(photo=chart_image)
+        await reply_cached_photo(update.message, chart_image)
         # [see more insights](https://alpha.vybenetwork.com/)
         await update.message.reply_text(f"🔔 See more insights: https://alpha.vybenetwork.com/tokens/{mint_address})\n", parse_mode="Markdown")
     except aiohttp.ClientResponseError as e:
         await update.message.reply_text(f"Failed to fetch data: {e}")
     except Exception as e:
         await update.message.reply_text(f"An error occurred: {e}")
+
+async def compare_chart(update: Update, queries: list, resolution: str, time_start: int, time_end: int):
+    """One normalized-performance chart for several tokens."""
+    if len(queries) > CHART_COMPARE_MAX:
+        await update.message.reply_text(f"❌ Compare at most {CHART_COMPARE_MAX} tokens at once.")
+        return
+    try:
+        mint_addresses = await asyncio.gather(*(token_catalog.resolve(q) for q in queries))
+        unknown = [q for q, mint in zip(queries, mint_addresses) if not mint]
+        if unknown:
+            await update.message.reply_text(f"No token found matching: {', '.join(unknown)}")
+            return
+        mint_addresses = list(dict.fromkeys(mint_addresses))
+        chart_image = await slashutils.get_comparison_chart(mint_addresses, resolution, time_start, time_end)
+        if not chart_image:
+            await update.message.reply_text("No data available for these tokens.")
+            return
+        labels = ", ".join(slashutils.token_label(m) for m in mint_addresses)
+        await update.message.reply_text(f"📊 30-day performance: {labels}")
+        await reply_cached_photo(update.message, chart_image)
+    except Exception as e:
+        await update.message.reply_text(f"An error occurred: {e}")
     
+async def pyth_prices(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handle /pyth command.
+
+    Usage:
+      /pyth <feed_id> [feed_id ...]      -> Current prices, one table for several feeds
+      /pyth <list>                       -> Same, for a saved list
+      /pyth save <list> <feed_id> [...]  -> Save (or replace) a list
+      /pyth delete <list>                -> Delete a saved list
+      /pyth                              -> Usage and your saved lists
+    """
+    uid = update.effective_user.id
+    args = context.args or []
+    try:
+        if not args:
+            lists = await db.get_pyth_lists(uid)
+            saved = "\n".join(f"• {name} ({len(feeds)} feeds)" for name, feeds in lists.items())
+            await update.message.reply_text(
+                "Usage: /pyth <feed_id> [feed_id ...] or /pyth <list>\n"
+                "Save a list: /pyth save <list> <feed_id> [feed_id ...]\n"
+                "Delete a list: /pyth delete <list>\n\n"
+                + (f"Your lists:\n{saved}" if saved else "You have no saved lists.")
+            )
+            return
+        command = args[0].lower()
+        if command in ("save", "delete") and len(args) > 1:
+            name = args[1].lower()
+            if not pyth.LIST_NAME.match(name):
+                raise ValueError("List names are up to 24 letters, digits, - or _, starting with a letter.")
+            if command == "delete":
+                removed = await db.remove_pyth_list(uid, name)
+                await update.message.reply_text(f"🗑 Deleted list '{name}'." if removed else f"No list named '{name}'.")
+                return
+            feed_ids = pyth.parse_feed_ids(" ".join(args[2:]))
+            lists = await db.get_pyth_lists(uid)
+            if name not in lists and len(lists) >= PYTH_MAX_LISTS:
+                raise ValueError(f"You can save at most {PYTH_MAX_LISTS} lists. Delete one with /pyth delete <list>")
+            await db.save_pyth_list(uid, name, feed_ids)
+            await update.message.reply_text(f"✅ Saved list '{name}' ({len(feed_ids)} feeds). Check it with /pyth {name}")
+            return
+
+        feed_ids = await pyth.resolve_feed_ids(uid, " ".join(args))
+        results = await pyth.fetch_pyth_prices(feed_ids)
+        if not any(results.values()):
+            await update.message.reply_text("😕 No data returned for these feeds.")
+            return
+        if len(feed_ids) == 1:
+            response = pyth.format_simple_result(results[feed_ids[0]], "price")
+        else:
+            response = pyth.format_price_table(results)
+        await send_chunks(update, response)
+    except ValueError as e:
+        await update.message.reply_text(f"❌ {e}")
+    except Exception as e:
+        await update.message.reply_text(f"An error occurred: {e}")
+
 # NFT Collection Statistics
 # NFT ANALYSIS
 async def nft_analysis(update: Update, context: ContextTypes.DEFAULT_TYPE):
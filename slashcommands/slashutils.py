@@ -1,16 +1,23 @@
-import matplotlib
-matplotlib.use('Agg')
 from datetime import datetime, UTC
-import requests
+import asyncio
 import os
 from dotenv import load_dotenv
 import json
+import logging
 import aiohttp
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
 from io import BytesIO
+from services.vybe_client import vybe, resolution_seconds
+from services.chart_renderer import chart_renderer
+from services.chart_cache import chart_cache, chart_key
+from services.whale_feed import whale_feed
+from services.ohlcv_store import ohlcv_store
+from config import CHART_FETCH_CONCURRENCY
+from services.token_catalog import token_catalog, CatalogUnavailable, SORT_FIELDS, MINT_ADDRESS
+from charts import renderers
 # from telegram import InlineKeyboardButton, InlineKeyboardMarkup
 
+logger = logging.getLogger(__name__)
+
 # Load environment variables
 load_dotenv()
 VYBE_API_KEY = os.getenv("VYBE_API_KEY")
@@ -19,16 +26,8 @@ VYBE_API_URL = "https://api.vybenetwork.xyz/price"
 
 async def get_wallet_balance(wallet_address):
     """Get and format wallet balance in user-friendly way"""
-    url = f"{VYBE_BASE_URL}/account/token-balance/{wallet_address}"
-    headers = {
-        "accept": "application/json",
-        "X-API-KEY": VYBE_API_KEY
-    }
-
     try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-        data = response.json()
+        data = await vybe.get(f"/account/token-balance/{wallet_address}")
 
         # Format timestamp
         ts = data.get('date')
@@ -48,8 +47,8 @@ async def get_wallet_balance(wallet_address):
             f"🔒  Staked SOL : {float(data.get('activeStakedSolBalance', 0)):.4f} SOL"
         )
 
-    except requests.exceptions.HTTPError as e:
-        return f"❌ API Error: {e.response.status_code} - Check wallet address"
+    except aiohttp.ClientResponseError as e:
+        return f"❌ API Error: {e.status} - Check wallet address"
     except json.JSONDecodeError:
         return "⚠️ Failed to parse balance data"
     except Exception as e:
@@ -60,52 +59,39 @@ def chunk_message(text, chunk_size=4096):
     """Breaks text into chunks no larger than chunk_size characters."""
     return [text[i : i + chunk_size] for i in range(0, len(text), chunk_size)]
 
-# Asynchronous version of detect_whale_transfers using aiohttp
-async def detect_whale_transfers(cap=10.0):
+def chunk_lines(lines, chunk_size=4096):
+    """Joins lines into messages no larger than chunk_size without splitting a line."""
+    chunks, current, size = [], [], 0
+    for line in lines:
+        for piece in chunk_message(line, chunk_size) or [""]:
+            if current and size + 1 + len(piece) > chunk_size:
+                chunks.append("\n".join(current))
+                current, size = [], 0
+            size += len(piece) + (1 if current else 0)
+            current.append(piece)
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+async def detect_whale_transfers(cap=10.0, count=None):
     """
-    Asynchronously fetch token transfers from the Vybe API and filter out transfers
-    where the USD value is greater than or equal to the provided cap.
+    Returns recent token transfers whose USD value is greater than or equal to cap,
+    newest first, from the in-memory whale feed (see services/whale_feed.py).
+    When the buffer holds fewer than `count`, the rest is fetched from the API
+    with the threshold applied server-side.
 
     Parameters:
-        api_key (str): Your API key for authentication.
         cap (float): The USD value threshold for determining a whale transfer.
+        count (int): Maximum number of transfers to return (None for all).
     
     Returns:
         list of dict: Each dict contains details about a whale transfer.
     """
-    url = "https://api.vybenetwork.xyz/token/transfers"
-    headers = {
-        "accept": "application/json",
-        "X-API-KEY": VYBE_API_KEY
-    }
-    
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url, headers=headers) as response:
-            if response.status != 200:
-                print(f"Error fetching transfers, status code: {response.status}")
-                return []
-            data = await response.json()
-            
-    transfers = data.get("transfers", [])
-    whale_transfers = []
-    
-    for transfer in transfers:
-        try:
-            value_usd = float(transfer.get("valueUsd", "0"))
-        except (ValueError, TypeError):
-            continue
-
-        if value_usd >= cap:
-            whale_transfers.append({
-                "signature": transfer.get("signature"),
-                "senderAddress": transfer.get("senderAddress"),
-                "receiverAddress": transfer.get("receiverAddress"),
-                "amount": transfer.get("amount"),
-                "calculatedAmount": transfer.get("calculatedAmount"),
-                "valueUsd": value_usd,
-                "blockTime": transfer.get("blockTime"),
-            })
-    return whale_transfers
+    try:
+        return await whale_feed.query(min_usd=cap, count=count)
+    except aiohttp.ClientResponseError as e:
+        logger.warning(f"Error fetching transfers, status code: {e.status}")
+        return []
 
 async def get_token_price(
     token_mint: str = None,
@@ -115,58 +101,51 @@ async def get_token_price(
     filter_zero_price: bool = True,
 ) -> str:
     """
-    Asynchronously retrieves token price data from the Vybe API.
+    Retrieves token price data from the in-memory token catalog
+    (see services/token_catalog.py), which covers every page of /tokens.
     
     If a token mint address is provided, returns details for that token.
     Otherwise, it returns a formatted string containing details for the first
     `count` tokens (after filtering).
 
     Parameters:
-      token_mint (str, optional): Specific token mint address to filter on.
+      token_mint (str, optional): Mint address, symbol or name of the token to show.
       count (int, optional): Number of tokens to return (default 10).
       sort_by (str, optional): Field name to sort by. One of:
            mintAddress, currentSupply, marketCap, name, price, symbol.
-      page (int, optional): Page number for paginated results.
+      page (int, optional): Page number, `count` tokens per page.
       filter_zero_price (bool, optional): If True, tokens with price 0 are excluded.
-      api_key (str): Your Vybe API key.
     
     Returns:
       str: A formatted string of token details.
     """
-    url = "https://api.vybenetwork.xyz/tokens"
-    headers = {
-        "accept": "application/json",
-        "X-API-KEY": VYBE_API_KEY
-    }
-    params = {"page": page}
-    if sort_by:
-        allowed_fields = {"mintAddress", "currentSupply", "marketCap", "name", "price", "symbol"}
-        if sort_by in allowed_fields:
-            params["sort"] = sort_by
-        else:
-            return f"Invalid sort field '{sort_by}'. Allowed fields are: {', '.join(allowed_fields)}."
+    if sort_by and sort_by not in SORT_FIELDS:
+        return f"Invalid sort field '{sort_by}'. Allowed fields are: {', '.join(SORT_FIELDS)}."
 
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, headers=headers, params=params) as response:
-                if response.status != 200:
-                    return f"Error: Received status code {response.status} from Vybe API."
-                data = await response.json()
+        if token_mint:
+            token = token_catalog.peek(token_mint)
+            if token is None and not MINT_ADDRESS.match(token_mint):
+                token = next(iter(await token_catalog.search(token_mint, limit=1)), None)
+                if token is None:
+                    return f"No token found matching: {token_mint}"
+            if token is None:
+                # Catalog still loading, listed since the last refresh, or not listed at all.
+                try:
+                    token = await vybe.get(f"/token/{token_mint}")
+                except aiohttp.ClientResponseError:
+                    return f"No token found with the mint address: {token_mint}"
+            tokens = [token]
+        else:
+            skip = max(page - 1, 0) * count
+            tokens = (await token_catalog.top(skip + count, sort_by, filter_zero_price))[skip:]
+    except CatalogUnavailable as e:
+        return str(e)
+    except aiohttp.ClientResponseError as e:
+        return f"Error: Received status code {e.status} from Vybe API."
     except Exception as e:
         return f"Error fetching token data: {e}"
 
-    tokens = data.get("data", [])
-    if filter_zero_price:
-        tokens = [token for token in tokens if token.get("price", 0) != 0]
-
-    # If filtering by token mint address, only return matching token(s)
-    if token_mint:
-        tokens = [token for token in tokens if token.get("mintAddress") == token_mint]
-        if not tokens:
-            return f"No token found with the mint address: {token_mint}"
-    else:
-        tokens = tokens[:count]  # Limit to the requested count
-
     if not tokens:
         return "No tokens available."
 
@@ -207,13 +186,8 @@ async def get_token_price(
     
 async def get_token_details(mintAddress: str) -> str:
     """Get token details with formatted output including all available fields"""
-    url = f"{VYBE_BASE_URL}/token/{mintAddress}"
-    headers = {"X-API-KEY": VYBE_API_KEY, "accept": "application/json"}
-    
     try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-        data = response.json()
+        data = await vybe.get(f"/token/{mintAddress}")
 
         # Format timestamp
         update_time = data.get('updateTime')
@@ -263,105 +237,93 @@ async def get_top_token_holders(mint_address: str, count: int = 10):
     Returns:
         list of dict: Top token holders.
     """
-    url = f"https://api.vybenetwork.xyz/token/{mint_address}/top-holders"
-    headers = {
-        "accept": "application/json",
-        "X-API-KEY": VYBE_API_KEY
-    }
-
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url, headers=headers) as response:
-            if response.status != 200:
-                print(f"Error fetching top holders: {response.status}")
-                return []
-            data = await response.json()
+    try:
+        data = await vybe.get(f"/token/{mint_address}/top-holders")
+    except aiohttp.ClientResponseError as e:
+        logger.warning(f"Error fetching top holders for {mint_address}: {e.status}")
+        return []
 
     return data.get("data", [])[:count]
 
 # TEESTING SOMETHING
 async def get_token_name_for_chart(mintAddress):
     """Get token details with formatted output"""
-    url = f"{VYBE_BASE_URL}/token/{mintAddress}"
-    headers = {"X-API-KEY": VYBE_API_KEY, "accept": "application/json"}
-    response = requests.get(url, headers=headers)
-    response.raise_for_status()
-    data = response.json()
+    data = await vybe.get(f"/token/{mintAddress}")
     return f" {data.get('name', 'Unknown Token')}"
 # HISTORICAL CHART
-async def fetch_ohlcv_data(mint_address, resolution, time_start, time_end):
+async def get_price_chart(mint_address, resolution, time_start, time_end):
     """
-    Fetches OHLCV data from Vybe's API asynchronously.
+    Returns a cached candlestick + volume chart for a mint, fetching and
+    rendering it on a miss.
 
     Parameters:
     - mint_address (str): The token's mint address.
-    - resolution (str): Timeframe for each data point (e.g., '1h' for hourly).
+    - resolution (str): Timeframe for each data point (e.g., '1d').
     - time_start (int): Start time in Unix timestamp.
     - time_end (int): End time in Unix timestamp.
 
     Returns:
-    - list: A list of OHLCV data points.
+    - CachedPhoto: The rendered chart, or None if there is no OHLCV data.
     """
-    url = f"{VYBE_API_URL}/{mint_address}/token-ohlcv"
-    headers = {
-        "accept": "application/json",
-        "X-API-KEY": VYBE_API_KEY
-    }
-    params = {
-        "resolution": resolution,
-        "timeStart": time_start,
-        "timeEnd": time_end
-    }
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url, headers=headers, params=params) as response:
-            response.raise_for_status()
-            data = await response.json()
-            return data.get("data", [])
-        
-async def generate_price_chart(ohlcv_data):
+    async def render():
+        columns = await ohlcv_store.query(mint_address, resolution, time_start, time_end)
+        if not len(columns["time"]):
+            return None
+        return await chart_renderer.render("candles", renderers.candle_payload(columns))
+
+    key, ttl = chart_key("candles", mint_address, resolution, time_start, time_end)
+    return await chart_cache.get_or_render(key, ttl, render)
+
+def token_label(mint_address: str) -> str:
+    """Symbol for a mint from the token catalog, or a shortened mint."""
+    token = token_catalog.peek(mint_address)
+    if token and token.get("symbol"):
+        return token["symbol"]
+    return f"{mint_address[:4]}…{mint_address[-4:]}"
+
+async def get_comparison_chart(mint_addresses, resolution, time_start, time_end):
     """
-    Generates a price chart from OHLCV data asynchronously.
+    Returns a cached relative-performance chart overlaying several mints.
 
-    Parameters:
-    - ohlcv_data (list): A list of OHLCV data points.
+    The series are read through the OHLCV store (so already-stored candles
+    aren't refetched), at most CHART_FETCH_CONCURRENCY at a time, then
+    aligned on one time grid. Mints whose series can't be fetched or are
+    empty are left out.
 
     Returns:
-    - BytesIO: In-memory image file of the generated chart.
+    - CachedPhoto: The rendered chart, or None if no mint has data.
     """
-    # Convert timestamps to timezone-aware datetime objects
-    dates = [datetime.fromtimestamp(item['time'], tz=UTC) for item in ohlcv_data]
-    closes = [float(item['close']) for item in ohlcv_data]
-
-    plt.figure(figsize=(10, 5))
-    plt.plot(dates, closes, label='Close Price', color='blue')
-    plt.xlabel('Date')
-    plt.ylabel('Price (USD)')
-    plt.title('Token Price Over Time')
-    plt.legend()
-    plt.grid(True)
-    plt.gca().xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
-    plt.gcf().autofmt_xdate()
-
-    image_stream = BytesIO()
-    plt.savefig(image_stream, format='png')
-    plt.close()
-    image_stream.seek(0)
-    return image_stream
+    async def render():
+        slots = asyncio.Semaphore(CHART_FETCH_CONCURRENCY)
+
+        async def fetch(mint_address):
+            async with slots:
+                return await ohlcv_store.query(mint_address, resolution, time_start, time_end)
+
+        results = await asyncio.gather(*(fetch(m) for m in mint_addresses), return_exceptions=True)
+        series, labels = [], []
+        for mint_address, result in zip(mint_addresses, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Error fetching OHLCV for {mint_address}: {result!r}")
+                continue
+            series.append(result)
+            labels.append(token_label(mint_address))
+        payload = renderers.comparison_payload(series, labels, time_start, time_end, resolution_seconds(resolution))
+        if payload is None:
+            return None
+        return await chart_renderer.render("comparison", payload)
+
+    key, ttl = chart_key("comparison", tuple(mint_addresses), resolution, time_start, time_end)
+    return await chart_cache.get_or_render(key, ttl, render)
 
 # NFT Collection Statistics
 async def fetch_nft_collection_owners(collection_address: str) -> list:
     """Fetch NFT collection owners from Vybe API"""
-    url = f"https://api.vybenetwork.xyz/nft/collection-owners/{collection_address}"
-    headers = {
-        "accept": "application/json",
-        "X-API-KEY": VYBE_API_KEY
-    }
-    
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url, headers=headers) as response:
-            if response.status == 200:
-                data = await response.json()
-                return data.get('data', [])
-            return []
+    try:
+        data = await vybe.get(f"/nft/collection-owners/{collection_address}")
+    except aiohttp.ClientResponseError:
+        return []
+    return data.get('data', [])
 def analyze_nft_owners(owners: list) -> dict:
     """Analyze NFT ownership distribution"""
     if not owners:
@@ -391,7 +353,7 @@ async def get_nft_analysis(collection_address: str) -> dict:
     
     return {
         'text_report': format_nft_report(collection_address, analysis),
-        'chart_image': generate_ownership_chart(analysis)
+        'chart_image': await generate_ownership_chart(analysis)
     }
 
 def format_nft_report(collection_address: str, analysis: dict) -> str:
@@ -416,7 +378,7 @@ def format_nft_report(collection_address: str, analysis: dict) -> str:
 🐳 Top Holder: {analysis.get('top_holder', ('', 0))[1]} NFTs
 """
 
-def generate_ownership_chart(analysis: dict) -> BytesIO:
+async def generate_ownership_chart(analysis: dict) -> BytesIO:
     """Generate ownership distribution chart"""
     if not analysis.get('concentration'):
         return None
@@ -425,15 +387,5 @@ def generate_ownership_chart(analysis: dict) -> BytesIO:
              for addr in analysis['concentration'].keys()]
     values = list(analysis['concentration'].values())
     
-    plt.figure(figsize=(10, 5))
-    plt.bar(labels, values, color='purple')
-    plt.title("Top Holder NFT Distribution")
-    plt.xlabel("Wallet Address")
-    plt.ylabel("Number of NFTs")
-    plt.xticks(rotation=45)
-    
-    buf = BytesIO()
-    plt.savefig(buf, format='png', bbox_inches='tight')
-    plt.close()
-    buf.seek(0)
-    return buf
+    png = await chart_renderer.render("ownership", renderers.bar_payload(labels, values))
+    return BytesIO(png)
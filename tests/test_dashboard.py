@@ -0,0 +1,52 @@
+# tests/test_dashboard.py
+import asyncio
+import pytest
+from favorites_handlers.dashboard import refresh_all
+from services.response_cache import ResponseCache
+from services.vybe_client import vybe
+
+FAST = "FastMint1111111111111111111111111111111111"
+SLOW = "SlowMint1111111111111111111111111111111111"
+BROKEN = "BrokenMint11111111111111111111111111111111"
+CANCELLED = "CancelledMint11111111111111111111111111111"
+
+
+@pytest.fixture(autouse=True)
+def mock_vybe(monkeypatch):
+    async def fake_fetch(path, params=None, timeout=None):
+        if BROKEN in path:
+            raise RuntimeError("boom")
+        if CANCELLED in path:
+            raise asyncio.CancelledError()
+        await asyncio.sleep(0.2 if SLOW in path else 0)
+        return {"symbol": "SLOW" if SLOW in path else "FAST", "price": 1.0, "price1d": 0, "price7d": 0}
+
+    monkeypatch.setattr(vybe, "_fetch", fake_fetch)
+    monkeypatch.setattr(vybe, "cache", ResponseCache())
+
+
+def test_timed_out_rows_do_not_cancel_shared_fetches():
+    async def main():
+        # Another user is already waiting on the slow token's lookup.
+        other_user = asyncio.create_task(vybe.get(f"/token/{SLOW}"))
+        await asyncio.sleep(0)
+        lines = await refresh_all({"tokens": [FAST, SLOW, BROKEN]}, timeout=0.05)
+        return lines, await other_user, vybe.cache.get(vybe.cache_policy(f"/token/{SLOW}")[0])
+
+    lines, other, cached = asyncio.run(main())
+    assert lines[0] == "" and lines[1].startswith("🪙")
+    assert lines[2].startswith("🪙 FAST")
+    assert "timed out" in lines[3]
+    assert "unavailable" in lines[4]
+    assert other["symbol"] == "SLOW"
+    assert cached["symbol"] == "SLOW"
+
+
+def test_lookup_ending_cancelled_does_not_break_the_render():
+    lines = asyncio.run(refresh_all({"tokens": [CANCELLED, FAST]}, timeout=1))
+    assert "timed out" in lines[2]
+    assert lines[3].startswith("🪙 FAST")
+
+
+def test_no_favorites():
+    assert asyncio.run(refresh_all({"accounts": [], "tokens": []})) == []
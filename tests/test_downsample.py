@@ -0,0 +1,88 @@
+# tests/test_downsample.py
+from datetime import datetime, UTC
+import matplotlib.dates as mdates
+import numpy as np
+import pytest
+from charts.downsample import aggregate_ohlc, epoch_to_datenum, lttb
+
+
+def test_epoch_to_datenum_matches_matplotlib():
+    t = 1_745_000_000
+    assert epoch_to_datenum([t])[0] == pytest.approx(mdates.date2num(datetime.fromtimestamp(t, UTC)))
+
+
+def test_short_series_pass_through():
+    x, y = np.arange(10.0), np.arange(10.0) ** 2
+    out_x, out_y = lttb(x, y, 20)
+    assert np.array_equal(out_x, x) and np.array_equal(out_y, y)
+
+
+def test_non_finite_points_are_dropped():
+    x = np.arange(6.0)
+    y = np.array([1, np.nan, 3, np.inf, 5, 6.0])
+    out_x, out_y = lttb(x, y, 100)
+    assert list(out_x) == [0, 2, 4, 5]
+
+
+@pytest.mark.parametrize("n, n_out", [(1000, 100), (100_000, 1000), (50_001, 3), (70_000, 1200)])
+def test_one_input_point_per_bucket(n, n_out):
+    rng = np.random.default_rng(n)
+    x = np.sort(rng.uniform(0, 1e6, n))
+    y = np.cumsum(rng.normal(size=n))
+    out_x, out_y = lttb(x, y, n_out)
+    assert len(out_x) == n_out
+    assert out_x[0] == x[0] and out_x[-1] == x[-1]
+    idx = np.searchsorted(x, out_x)
+    assert np.array_equal(x[idx], out_x) and np.array_equal(y[idx], out_y)
+    # Interior picks fall in consecutive buckets over points 1 .. n-2.
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    buckets = np.searchsorted(edges, idx[1:-1], side="right") - 1
+    assert np.array_equal(buckets, np.arange(n_out - 2))
+
+
+def test_spikes_survive():
+    n = 100_000
+    x = np.arange(n, dtype=float)
+    y = np.sin(x / 5000)
+    spikes = [12_345, 55_555, 87_654]
+    y[spikes] = [50, -50, 80]
+    out_x, out_y = lttb(x, y, 500)
+    for i in spikes:
+        assert i in out_x
+    assert out_y.max() == 80 and out_y.min() == -50
+
+
+def test_aggregate_ohlc_merges_runs():
+    n = 10
+    times = np.arange(n) * 60
+    opens = np.arange(n, dtype=float)
+    highs = opens + 10
+    lows = opens - 10
+    closes = opens + 0.5
+    volumes = np.ones(n)
+    t, o, h, l, c, v = aggregate_ohlc(times, opens, highs, lows, closes, volumes, 3)
+    # Buckets [0, 3), [3, 6), [6, 10)
+    assert list(t) == [0, 180, 360]
+    assert list(o) == [0, 3, 6]
+    assert list(h) == [12, 15, 19]
+    assert list(l) == [-10, -7, -4]
+    assert list(c) == [2.5, 5.5, 9.5]
+    assert list(v) == [3, 3, 4]
+    assert aggregate_ohlc(times, opens, highs, lows, closes, None, 3)[5] is None
+    assert len(aggregate_ohlc(times, opens, highs, lows, closes, volumes, 20)[0]) == n
+
+
+def test_comparison_chart_plots_at_most_one_point_per_pixel():
+    from charts.renderers import ComparisonTemplate
+    template = ComparisonTemplate()
+    n = 20_000
+    times = np.arange(n, dtype=np.int64) * 60
+    rising = np.linspace(0, 50, n)
+    late = np.full(n, np.nan)
+    late[n // 2:] = np.linspace(0, -20, n - n // 2)
+    assert template.render(times, [rising, late], ["A", "B"]).startswith(b"\x89PNG")
+    for line, first in zip(template.lines, (0, n // 2)):
+        x, y = line.get_data()
+        assert len(x) <= template.max_points
+        assert np.isfinite(y).all()
+        assert x[0] == pytest.approx(epoch_to_datenum([times[first]])[0])
@@ -0,0 +1,81 @@
+# tests/test_flow_state.py
+import pytest
+import handlers.state as state_mod
+from handlers.state import FlowState, FlowStateStore
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(state_mod.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_flow_state_mapping_access():
+    state = FlowState(flow="chart", step="input", type="price")
+    assert state["flow"] == "chart"
+    assert state.get("timeframe") is None
+    assert state.get("timeframe", "1d") == "1d"
+    assert "type" in state and "start" not in state
+    state.update({"step": "done"})
+    assert state.as_dict() == {"flow": "chart", "step": "done", "type": "price"}
+    with pytest.raises(KeyError):
+        state["start"]
+    with pytest.raises(KeyError):
+        state["unknown"] = 1
+
+
+def test_dict_values_become_flow_states(clock):
+    store = FlowStateStore(idle_ttl=60, max_users=10)
+    store[1] = {"flow": "pyth", "step": "menu"}
+    assert isinstance(store[1], FlowState)
+    assert store.get(1).get("flow") == "pyth"
+    assert store.get(2) is None
+    with pytest.raises(KeyError):
+        store[2]
+
+
+def test_idle_states_expire(clock):
+    store = FlowStateStore(idle_ttl=60, max_users=10)
+    store[1] = {"flow": "chart"}
+    store[2] = {"flow": "pyth"}
+    clock[0] += 50
+    assert 1 in store            # a read counts as activity
+    clock[0] += 20
+    assert 2 not in store
+    assert store.get(1) is not None
+    assert store.expired == 1
+    assert len(store) == 1
+
+
+def test_size_cap_evicts_least_recently_touched(clock):
+    store = FlowStateStore(idle_ttl=60, max_users=2)
+    store[1] = {"flow": "chart"}
+    clock[0] += 1
+    store[2] = {"flow": "chart"}
+    clock[0] += 1
+    store.get(1)
+    store[3] = {"flow": "chart"}
+    assert 2 not in store
+    assert 1 in store and 3 in store
+    assert store.evicted == 1
+
+
+def test_pop_and_stats(clock):
+    store = FlowStateStore(idle_ttl=60, max_users=10)
+    store[1] = {"flow": "chart"}
+    store[2] = {"flow": "chart"}
+    store[3] = {"flow": "pyth"}
+    assert store.pop(3).flow == "pyth"
+    assert store.pop(3) is None
+    stats = store.stats()
+    assert stats["active"] == 2
+    assert stats["flow_chart"] == 2
+    assert "flow_pyth" not in stats
+
+
+def test_lock_is_shared_while_held():
+    store = FlowStateStore()
+    lock = store.lock(1)
+    assert store.lock(1) is lock
+    assert store.lock(2) is not lock
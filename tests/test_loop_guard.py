@@ -0,0 +1,102 @@
+# tests/test_loop_guard.py
+"""Wallet/token lookups must not block the event loop (see services/loop_guard.py)."""
+import asyncio
+import time
+import pytest
+from services import loop_guard
+from services.loop_guard import BlockingCallError, LoopBlockGuard
+from services.response_cache import ResponseCache
+from services.vybe_client import vybe
+import handlers.accounts as accounts
+import slashcommands.slashutils as slashutils
+
+THRESHOLD_MS = 50
+WALLET = "5Q544fKrFoe6tsEbD7S8EmxGTJYAKtTVhAW5Q5pge4j1"
+MINT = "DezXAZ8z7PnrnRJjz3wXBoRgixCa6xjnB7YaB1pPB263"
+
+RESPONSES = {
+    f"/account/token-balance/{WALLET}": {
+        "date": 1745000000000,
+        "stakedSolBalance": "12.5",
+        "totalTokenCount": 7,
+        "totalTokenValueUsd": "1234.5",
+        "activeStakedSolBalance": "3.25",
+    },
+    f"/token/{MINT}": {
+        "name": "Bonk",
+        "symbol": "BONK",
+        "updateTime": 1745000000,
+        "currentSupply": 88_000_000_000_000.0,
+        "marketCap": 1_500_000_000.0,
+        "usdValueVolume24h": 25_000_000.0,
+        "tokenAmountVolume24h": 1_000_000_000.0,
+        "price": 0.00002,
+        "price1d": 0.00002,
+        "price7d": 0.00002,
+        "decimals": 5,
+        "verified": True,
+    },
+}
+
+
+@pytest.fixture(autouse=True)
+def mock_vybe(monkeypatch):
+    async def fake_fetch(path, params=None, timeout=None):
+        await asyncio.sleep(0.01)   # a network round-trip, without the network
+        return RESPONSES[path]
+
+    monkeypatch.setattr(vybe, "_fetch", fake_fetch)
+    monkeypatch.setattr(vybe, "cache", ResponseCache())
+
+
+def run_guarded(make_coro):
+    """Run make_coro() under a collecting guard; raise BlockingCallError on violations."""
+    guard = LoopBlockGuard(THRESHOLD_MS, fail_fast=False)
+
+    async def main():
+        guard.install()
+        await asyncio.sleep(0)   # debug timing starts with the loop's next step
+        try:
+            return await make_coro()
+        finally:
+            await asyncio.sleep(0)   # let the loop report the last callback
+
+    try:
+        result = asyncio.run(main())
+    finally:
+        guard.uninstall()
+    guard.check()
+    return result
+
+
+def test_guard_catches_blocking_call():
+    async def blocking():
+        time.sleep(THRESHOLD_MS * 2 / 1000)
+
+    with pytest.raises(BlockingCallError):
+        run_guarded(blocking)
+
+
+def test_install_guard_disabled_without_threshold():
+    assert loop_guard.install_guard(0) is None
+
+
+@pytest.mark.parametrize("lookup", [
+    lambda: slashutils.get_wallet_balance(WALLET),
+    lambda: accounts.get_wallet_balance(WALLET),
+    lambda: slashutils.get_token_details(MINT),
+    lambda: slashutils.get_token_name_for_chart(MINT),
+], ids=["slash_balance", "menu_balance", "token_details", "chart_token_name"])
+def test_lookups_do_not_block(lookup):
+    result = run_guarded(lookup)
+    assert "Error" not in result
+
+
+def test_concurrent_lookups_overlap():
+    async def many():
+        started = time.monotonic()
+        await asyncio.gather(*(slashutils.get_wallet_balance(WALLET) for _ in range(20)))
+        return time.monotonic() - started
+
+    # 20 sequential 10 ms fetches would take 200 ms; cached and coalesced they take one.
+    assert run_guarded(many) < 0.1
@@ -0,0 +1,122 @@
+# tests/test_ohlcv_store.py
+import asyncio
+import time
+import pytest
+from services.ohlcv_store import OHLCVStore, Series
+from services.vybe_client import vybe
+
+HOUR = 3600
+T0 = 1_700_000_000 // HOUR * HOUR
+
+
+def candle(t: int, close: float = 1.0) -> dict:
+    return {"time": t, "open": close, "high": close, "low": close, "close": close, "volume": 1, "volumeUsd": close}
+
+
+def test_missing_is_aligned_and_skips_coverage():
+    series = Series(HOUR)
+    assert series.missing(T0 + 10, T0 + 2 * HOUR + 1) == [(T0, T0 + 3 * HOUR)]
+    series.cover(T0 + HOUR, T0 + 2 * HOUR)
+    assert series.missing(T0, T0 + 3 * HOUR) == [(T0, T0 + HOUR), (T0 + 2 * HOUR, T0 + 3 * HOUR)]
+    assert series.missing(T0 + HOUR, T0 + 2 * HOUR) == []
+
+
+def test_cover_merges_touching_and_overlapping_ranges():
+    series = Series(HOUR)
+    series.cover(0, 10)
+    series.cover(20, 30)
+    series.cover(10, 15)
+    assert series.coverage == [(0, 15), (20, 30)]
+    series.cover(12, 25)
+    assert series.coverage == [(0, 30)]
+
+
+def test_merge_replaces_range_in_time_order():
+    series = Series(HOUR)
+    series.merge(T0, T0 + 4 * HOUR, [candle(T0 + 2 * HOUR, 3), candle(T0, 1), candle(T0 + 9 * HOUR, 9)])
+    assert list(series.times) == [T0, T0 + 2 * HOUR]
+    series.merge(T0 + HOUR, T0 + 3 * HOUR, [candle(T0 + HOUR, 2)])
+    assert list(series.times) == [T0, T0 + HOUR]
+    assert list(series.columns["close"]) == [1, 2]
+    series.merge(T0 + 5 * HOUR, T0 + 6 * HOUR, [{"time": T0 + 5 * HOUR, "close": "bad"}])
+    sliced = series.slice(T0 + HOUR, T0 + 5 * HOUR)
+    assert list(sliced["time"]) == [T0 + HOUR, T0 + 5 * HOUR]
+    assert sliced["close"][1] != sliced["close"][1]   # unparseable -> NaN
+
+
+def test_row_round_trip():
+    series = Series(HOUR)
+    series.merge(T0, T0 + 2 * HOUR, [candle(T0, 1), candle(T0 + HOUR, 2)])
+    series.cover(T0, T0 + 2 * HOUR)
+    restored = Series.from_row(HOUR, *series.to_row())
+    assert restored.coverage == series.coverage
+    assert restored.times == series.times
+    assert restored.columns == series.columns
+    coverage, times, _, data = series.to_row()
+    assert len(Series.from_row(HOUR, coverage, times, "open,close", data)) == 0
+
+
+def test_confirm_empty_needs_an_older_empty_response():
+    series = Series(HOUR)
+    assert series.confirm_empty(0, 10 * HOUR, now=100, min_age=60) == []
+    assert series.confirm_empty(0, 10 * HOUR, now=130, min_age=60) == []
+    assert series.confirm_empty(5 * HOUR, 20 * HOUR, now=170, min_age=60) == [(5 * HOUR, 10 * HOUR)]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = OHLCVStore(path=str(tmp_path / "ohlcv.db"), request_limit=24, empty_confirm=60)
+    yield store
+    asyncio.run(store.close())
+
+
+def fake_api(monkeypatch, candles_at, newest_first=False, empty=False):
+    """token-ohlcv over candles_at; timeEnd inclusive and at most `limit` rows, like the API."""
+    calls = []
+
+    async def get(path, params=None, ttl=None):
+        calls.append(dict(params))
+        if empty:
+            return {"data": []}
+        times = [t for t in candles_at if params["timeStart"] <= t <= params["timeEnd"]]
+        if newest_first:
+            times.reverse()
+        return {"data": [candle(t) for t in times[:params["limit"]]]}
+
+    monkeypatch.setattr(vybe, "get", get)
+    return calls
+
+
+def test_long_ranges_are_fetched_in_windows(store, monkeypatch):
+    start, end = T0, T0 + 100 * HOUR
+    calls = fake_api(monkeypatch, range(start, end + 1, HOUR))
+    columns = asyncio.run(store.query("M", "1h", start, end))
+    assert list(columns["time"]) == list(range(start, end + 1, HOUR))
+    assert all(c["timeEnd"] - c["timeStart"] <= 24 * HOUR for c in calls)
+    calls.clear()
+    asyncio.run(store.query("M", "1h", start, end))
+    assert calls == []
+
+
+def test_truncated_response_fetches_the_rest(store, monkeypatch):
+    start, end = T0, T0 + 47 * HOUR
+    # Newest first with an inclusive timeEnd: each full window drops its oldest candle.
+    fake_api(monkeypatch, range(start, end + 1, HOUR), newest_first=True)
+    columns = asyncio.run(store.query("M", "1h", start, end))
+    assert list(columns["time"]) == list(range(start, end + 1, HOUR))
+    assert store.stats()["truncated"] > 0
+
+
+def test_empty_response_is_not_covered_until_confirmed(store, monkeypatch):
+    start, end = T0, T0 + 10 * HOUR
+    now = [time.time()]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    calls = fake_api(monkeypatch, [], empty=True)
+    asyncio.run(store.query("M", "1h", start, end))
+    asyncio.run(store.query("M", "1h", start, end))
+    assert len(calls) == 2                 # a transient empty answer is asked again
+    now[0] += 61
+    asyncio.run(store.query("M", "1h", start, end))
+    calls.clear()
+    asyncio.run(store.query("M", "1h", start, end))
+    assert calls == []                     # empty twice, a minute apart: no trades
@@ -0,0 +1,95 @@
+# tests/test_response_cache.py
+import asyncio
+import pytest
+from services.response_cache import ResponseCache
+
+
+def test_concurrent_callers_share_one_fetch():
+    cache = ResponseCache()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"ok": True}
+
+    async def main():
+        results = await asyncio.gather(*(cache.get_or_fetch("k", 60, fetch) for _ in range(5)))
+        again = await cache.get_or_fetch("k", 60, fetch)
+        return results, again
+
+    results, again = asyncio.run(main())
+    assert len(calls) == 1
+    assert all(r == {"ok": True} for r in results) and again == {"ok": True}
+    stats = cache.stats()
+    assert (stats["misses"], stats["coalesced"], stats["hits"], stats["inflight"]) == (1, 4, 1, 0)
+
+
+def test_cancelled_first_caller_does_not_abort_other_waiters():
+    cache = ResponseCache()
+    async def main():
+        gate = asyncio.Event()
+
+        async def fetch():
+            await gate.wait()
+            return "value"
+
+        first = asyncio.create_task(cache.get_or_fetch("k", 60, fetch))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(cache.get_or_fetch("k", 60, fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        gate.set()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second, cache.get("k")
+
+    assert asyncio.run(main()) == ("value", "value")
+
+
+def test_fetch_completes_and_caches_when_every_caller_gives_up():
+    cache = ResponseCache()
+
+    async def main():
+        async def fetch():
+            await asyncio.sleep(0.01)
+            return "value"
+
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(cache.get_or_fetch("k", 60, fetch), 0.001)
+        await asyncio.sleep(0.02)
+        return cache.get("k")
+
+    assert asyncio.run(main()) == "value"
+
+
+def test_failures_reach_every_waiter_and_are_not_cached():
+    cache = ResponseCache()
+    calls = []
+
+    async def main():
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            raise RuntimeError("boom")
+
+        results = await asyncio.gather(*(cache.get_or_fetch("k", 60, fetch) for _ in range(3)),
+                                       return_exceptions=True)
+        assert all(isinstance(r, RuntimeError) for r in results)
+        with pytest.raises(RuntimeError):
+            await cache.get_or_fetch("k", 60, fetch)
+
+    asyncio.run(main())
+    assert len(calls) == 2
+    assert cache.get("k") is None
+
+
+def test_ttl_zero_is_not_stored():
+    cache = ResponseCache()
+
+    async def fetch():
+        return "value"
+
+    assert asyncio.run(cache.get_or_fetch("k", 0, fetch)) == "value"
+    assert cache.get("k") is None
@@ -0,0 +1,101 @@
+# tests/test_router.py
+import asyncio
+import re
+from types import SimpleNamespace
+import pytest
+from telegram.ext import ApplicationHandlerStop
+import handlers.router as router
+import handlers.pyth as pyth_h
+from handlers.router import CallbackRouter, TextRouter
+from handlers.state import USER_STATE
+
+
+async def a(update, context): pass
+async def b(update, context): pass
+async def c(update, context): pass
+
+
+def text_update(uid: int, text: str):
+    return SimpleNamespace(effective_user=SimpleNamespace(id=uid), message=SimpleNamespace(text=text))
+
+
+@pytest.fixture(autouse=True)
+def clean_state():
+    yield
+    for uid in (101, 102):
+        USER_STATE.pop(uid)
+
+
+def test_exact_key_beats_prefix():
+    routes = CallbackRouter()
+    routes.add("chart_", a)
+    routes.add("chart_1d", b)
+    assert routes.resolve("chart_1d") is b
+    assert routes.resolve("chart_7d") is a
+
+
+def test_longest_prefix_wins():
+    routes = CallbackRouter()
+    routes.add("fav_", a)
+    routes.add("fav_token:", b)
+    assert routes.resolve("fav_token:abc") is b
+    assert routes.resolve("fav_account:abc") is a
+    assert routes.resolve("other") is None
+
+
+def test_prefix_needs_separator():
+    routes = CallbackRouter()
+    routes.add("menu", a)
+    assert routes.resolve("menu") is a
+    assert routes.resolve("menu_pyth") is None
+
+
+def test_flow_scoped_route_preferred():
+    routes = CallbackRouter()
+    routes.add("cancel_operation", a)
+    routes.add("cancel_operation", b, flow="pyth")
+    assert routes.resolve("cancel_operation", "pyth") is b
+    assert routes.resolve("cancel_operation", "chart") is a
+    assert routes.resolve("cancel_operation") is a
+
+
+def test_first_registration_wins():
+    routes = CallbackRouter()
+    routes.add("tutorial_", a)
+    routes.add("tutorial_", b)
+    routes.add("tutorial_", c, flow="tutorial")
+    assert routes.resolve("tutorial_next") is a
+    assert routes.resolve("tutorial_next", "tutorial") is c
+
+
+def test_bot_routing_table():
+    resolve = router.callback_router.resolve
+    assert resolve("menu_pyth") is pyth_h.start_pyth
+    assert resolve("pyth_price") is pyth_h.pyth_callback
+    assert resolve("cancel_operation", "pyth") is pyth_h.cancel_operation
+    assert resolve("cancel_operation") is router.cancel_operation
+
+
+def test_text_router_dispatches_active_flow_only():
+    seen = []
+
+    async def handler(update, context):
+        seen.append(update.message.text)
+
+    routes = TextRouter()
+    routes.add("chart", re.compile(r"^\d+$"), handler)
+    # No flow: left for later handler groups.
+    asyncio.run(routes.dispatch(text_update(101, "42"), None))
+    USER_STATE[101] = {"flow": "chart", "step": "input"}
+    asyncio.run(routes.dispatch(text_update(101, "not a number"), None))
+    assert routes.unmatched == 1
+    with pytest.raises(ApplicationHandlerStop):
+        asyncio.run(routes.dispatch(text_update(101, "42"), None))
+    assert seen == ["42"]
+
+
+def test_pyth_menu_text_does_not_crash():
+    USER_STATE[102] = {"flow": "pyth", "step": "menu"}
+    assert router.text_router._routes["pyth"][0].match("hi")
+    assert asyncio.run(pyth_h.handle_pyth_input(text_update(102, "hi"), None)) is False
+    assert USER_STATE.get(102) is not None
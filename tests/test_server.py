@@ -0,0 +1,20 @@
+# tests/test_server.py
+import pytest
+import services.server as server
+
+
+@pytest.mark.parametrize("url, secret, ok", [
+    ("", "", True),                                   # polling needs no secret
+    ("https://bot.example", "", False),
+    ("https://bot.example", "has spaces", False),
+    ("https://bot.example", "x" * 257, False),
+    ("https://bot.example", "Shared_secret-123", True),
+])
+def test_webhook_mode_requires_a_shared_secret(monkeypatch, url, secret, ok):
+    monkeypatch.setattr(server, "WEBHOOK_URL", url)
+    monkeypatch.setattr(server, "WEBHOOK_SECRET", secret)
+    if ok:
+        server.check_config()
+    else:
+        with pytest.raises(RuntimeError):
+            server.check_config()
@@ -0,0 +1,114 @@
+# tests/test_token_catalog.py
+import asyncio
+import pytest
+from services.token_catalog import TokenCatalog, CatalogUnavailable
+from services.vybe_client import vybe
+
+MINT = "So11111111111111111111111111111111111111112"
+
+
+def token(mint: str, symbol: str, cap: float) -> dict:
+    return {"mintAddress": mint, "symbol": symbol, "name": symbol, "price": 1, "marketCap": cap}
+
+
+TOKENS = [token(MINT, "SOL", 100), token("EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v", "USDC", 50)]
+
+
+def serve(monkeypatch, responses: list, calls: list = None):
+    """Fake vybe.get: pops one response (a list or an exception) per /tokens page."""
+    async def fake_get(path, params=None, ttl=None):
+        if calls is not None:
+            calls.append(path)
+        item = responses.pop(0) if len(responses) > 1 else responses[0]
+        if isinstance(item, Exception):
+            raise item
+        await asyncio.sleep(0)
+        return {"data": item}
+    monkeypatch.setattr(vybe, "get", fake_get)
+
+
+def test_lookups_wait_for_the_background_load(monkeypatch):
+    serve(monkeypatch, [TOKENS])
+
+    async def main():
+        catalog = TokenCatalog(wait_secs=1)
+        try:
+            assert catalog.peek(MINT) is None
+            matches = await catalog.search("usd")
+            assert [t["symbol"] for t in matches] == ["USDC"]
+            assert catalog.peek(MINT)["symbol"] == "SOL"
+            assert await catalog.resolve("sol") == MINT
+        finally:
+            await catalog.close()
+    asyncio.run(main())
+
+
+def test_requests_never_refresh_inline(monkeypatch):
+    calls = []
+    serve(monkeypatch, [TOKENS], calls)
+
+    async def main():
+        catalog = TokenCatalog(wait_secs=1)
+        try:
+            await asyncio.gather(*(catalog.top(1) for _ in range(10)))
+            assert calls == ["/tokens"]      # one background pass, not one per request
+        finally:
+            await catalog.close()
+    asyncio.run(main())
+
+
+def test_slow_first_load_times_out(monkeypatch):
+    async def slow_get(path, params=None, ttl=None):
+        await asyncio.sleep(10)
+    monkeypatch.setattr(vybe, "get", slow_get)
+
+    async def main():
+        catalog = TokenCatalog(wait_secs=0.05)
+        try:
+            with pytest.raises(CatalogUnavailable):
+                await catalog.top(5)
+        finally:
+            await catalog.close()
+    asyncio.run(main())
+
+
+def test_failed_load_backs_off_and_fails_fast(monkeypatch):
+    calls = []
+    serve(monkeypatch, [RuntimeError("down"), RuntimeError("down"), TOKENS], calls)
+
+    async def main():
+        catalog = TokenCatalog(retry=0.05, wait_secs=1)
+        try:
+            catalog.start()
+            await asyncio.sleep(0.01)
+            assert catalog.failures == 1
+            # Backing off: requests fail straight away instead of refetching.
+            for _ in range(5):
+                with pytest.raises(CatalogUnavailable):
+                    await catalog.top(1)
+            assert len(calls) == 1
+            await asyncio.sleep(0.25)         # retries after 0.05s, then 0.1s
+            assert catalog.failures == 0
+            assert len(await catalog.top(5)) == 2
+            assert catalog.stats()["errors"] == 2
+        finally:
+            await catalog.close()
+    asyncio.run(main())
+
+
+def test_backoff_is_capped_at_the_refresh_interval(monkeypatch):
+    serve(monkeypatch, [RuntimeError("down")])
+    delays = []
+
+    async def fake_sleep(delay):
+        delays.append(delay)
+        if len(delays) == 6:
+            raise asyncio.CancelledError
+
+    async def main():
+        catalog = TokenCatalog(interval=30, retry=5)
+        monkeypatch.setattr(asyncio, "sleep", fake_sleep)
+        with pytest.raises(asyncio.CancelledError):
+            await catalog._run()
+    asyncio.run(main())
+    assert delays == [5, 10, 20, 30, 30, 30]
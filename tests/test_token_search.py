@@ -0,0 +1,82 @@
+# tests/test_token_search.py
+import random
+import string
+from services.token_search import TokenSearchIndex, normalize, token_terms, SYMBOL, NAME, NAME_WORD
+
+
+def token(mint, symbol, name, market_cap=0):
+    return {"mintAddress": mint, "symbol": symbol, "name": name, "marketCap": market_cap}
+
+
+CATALOG = {t["mintAddress"]: t for t in [
+    token("m_bonk", "BONK", "Bonk", 1_500_000_000),
+    token("m_bonkfork", "BONKF", "Bonk Fork", 10_000),
+    token("m_jup", "JUP", "Jupiter", 2_000_000_000),
+    token("m_jupsol", "JUPSOL", "Jupiter Staked SOL", 300_000_000),
+    token("m_wif", "WIF", "dogwifhat", 800_000_000),
+    token("m_sol", "SOL", "Wrapped SOL", 90_000_000_000),
+]}
+
+
+def mints(results):
+    return [t["mintAddress"] for t in results]
+
+
+def test_terms():
+    assert normalize("  Jupiter-Staked  SOL! ") == "jupiter staked sol"
+    assert token_terms(token("m", "$WIF", "dog wif hat")) == {
+        ("wif", SYMBOL), ("dog wif hat", NAME), ("dog", NAME_WORD), ("wif", NAME_WORD), ("hat", NAME_WORD)}
+
+
+def test_prefix_is_a_contiguous_slice():
+    index = TokenSearchIndex.build(CATALOG)
+    assert {term for term, _, _ in index.prefix("jup")} == {"jup", "jupsol", "jupiter", "jupiter staked sol"}
+    assert index.prefix("zzz") == []
+
+
+def test_exact_then_symbol_then_market_cap():
+    index = TokenSearchIndex.build(CATALOG)
+    assert mints(index.search("bonk", CATALOG)) == ["m_bonk", "m_bonkfork"]
+    assert mints(index.search("jup", CATALOG))[:2] == ["m_jup", "m_jupsol"]
+    # "sol": exact symbol first, then the name word of larger tokens.
+    assert mints(index.search("SOL", CATALOG, limit=1)) == ["m_sol"]
+    assert mints(index.search("staked", CATALOG)) == ["m_jupsol"]
+    assert index.search("", CATALOG) == []
+
+
+def test_fuzzy_fallback_for_typos():
+    index = TokenSearchIndex.build(CATALOG)
+    assert mints(index.search("jupitr", CATALOG, limit=1)) == ["m_jup"]
+    assert mints(index.search("dogwifaht", CATALOG, limit=1)) == ["m_wif"]
+    assert index.search("qqqqqq", CATALOG) == []
+
+
+def test_incremental_update_matches_rebuild():
+    rng = random.Random(11)
+    words = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(2, 6))) for _ in range(60)]
+
+    def catalog(n):
+        return {f"m{i}": token(f"m{i}", rng.choice(words).upper(),
+                               " ".join(rng.choices(words, k=rng.randint(1, 3))), rng.random())
+                for i in rng.sample(range(400), n)}
+
+    index = TokenSearchIndex.build(catalog(200))
+    for _ in range(5):
+        current = catalog(200)
+        changes = index.diff(current)
+        index.apply(changes)
+        rebuilt = TokenSearchIndex.build(current)
+        assert index._entries == rebuilt._entries
+        assert index._terms_by_mint == rebuilt._terms_by_mint
+        assert index._term_refs == rebuilt._term_refs
+        assert {g: t for g, t in index._grams.items() if t} == {g: t for g, t in rebuilt._grams.items() if t}
+
+
+def test_large_prefix_walks_by_market_cap():
+    many = {f"m{i}": token(f"m{i}", f"A{i}", f"Alpha {i}", i) for i in range(2000)}
+    many["exact"] = token("exact", "A", "Exact A", -1)
+    index = TokenSearchIndex.build(many)
+    by_market_cap = sorted(many.values(), key=lambda t: t["marketCap"], reverse=True)
+    results = index.search("a", many, limit=3, by_market_cap=by_market_cap)
+    # The exact symbol match comes first despite its market cap, then the largest tokens.
+    assert mints(results) == ["exact", "m1999", "m1998"]
@@ -0,0 +1,65 @@
+# tests/test_transfer_buffer.py
+import random
+from services.whale_feed import TransferBuffer, transfer_record
+
+MINTS = ["SOL", "BONK", "JUP"]
+
+
+def record(i: int, value_usd: float, mint: str = "SOL", signature: str = None) -> dict:
+    return {"signature": signature or f"sig{i}", "mintAddress": mint, "valueUsd": value_usd, "blockTime": i}
+
+
+def reference(records: list, capacity: int, min_usd=0.0, count=None, mint=None) -> list:
+    """What query() should return: a plain newest-first scan of the last `capacity` unique records."""
+    kept, seen = [], set()
+    for r in records:
+        if r["signature"] in seen:
+            continue
+        seen.add(r["signature"])
+        kept.append(r)
+        if len(kept) > capacity:
+            seen.discard(kept.pop(0)["signature"])
+    matches = [r for r in reversed(kept) if r["valueUsd"] >= min_usd and (mint is None or r["mintAddress"] == mint)]
+    return matches if count is None else matches[:count]
+
+
+def test_transfer_record_rejects_unusable_values():
+    assert transfer_record({"valueUsd": "12.5"})["valueUsd"] == 12.5
+    assert transfer_record({"valueUsd": "abc"}) is None
+    assert transfer_record({"valueUsd": None}) is None
+    assert transfer_record({"valueUsd": "nan"}) is None
+    assert transfer_record({"valueUsd": "inf"}) is None
+
+
+def test_duplicate_signatures_are_dropped():
+    buffer = TransferBuffer(capacity=10)
+    assert buffer.add(record(1, 100))
+    assert not buffer.add(record(2, 500, signature="sig1"))
+    assert len(buffer) == 1
+
+
+def test_eviction_keeps_indexes_consistent():
+    buffer = TransferBuffer(capacity=3)
+    for i in range(5):
+        buffer.add(record(i, 100 * i, MINTS[i % 2]))
+    assert len(buffer) == 3
+    assert [r["blockTime"] for r in buffer.query()] == [4, 3, 2]
+    assert [r["blockTime"] for r in buffer.query(mint="SOL")] == [4, 2]
+    assert buffer.query(min_usd=0, mint="JUP") == []
+    # An evicted signature can be buffered again.
+    assert buffer.add(record(5, 1, signature="sig0"))
+
+
+def test_queries_match_a_linear_scan():
+    rng = random.Random(7)
+    records = [record(i, round(rng.lognormvariate(6, 2), 2), rng.choice(MINTS),
+                      signature=f"sig{rng.randrange(400)}")
+               for i in range(600)]
+    buffer = TransferBuffer(capacity=200)
+    for r in records:
+        buffer.add(r)
+    # Low thresholds take the dense (ring walk) path, high ones the value index.
+    for min_usd in (0, 50, 400, 5000, 1e6):
+        for count in (None, 1, 5, 50):
+            for mint in (None, "BONK"):
+                assert buffer.query(min_usd, count, mint) == reference(records, 200, min_usd, count, mint)
@@ -0,0 +1,62 @@
+# tests/test_whale_push.py
+import asyncio
+import random
+from types import SimpleNamespace
+from handlers.whale_subscriptions import whale_subscribe
+from services.whale_push import SubscriptionIndex, format_alert, whale_pusher
+
+
+def test_matching_is_every_threshold_at_or_below_value():
+    index = SubscriptionIndex()
+    index.set(1, 1000)
+    index.set(2, 50_000)
+    index.set(3, 1000)
+    assert sorted(index.matching(999.99)) == []
+    assert sorted(index.matching(1000)) == [1, 3]
+    assert sorted(index.matching(50_000)) == [1, 2, 3]
+
+
+def test_set_replaces_and_remove_forgets():
+    index = SubscriptionIndex()
+    index.set(1, 1000)
+    index.set(1, 10_000)
+    assert len(index) == 1
+    assert index.get(1) == 10_000
+    assert index.matching(5000) == []
+    assert index.remove(1)
+    assert not index.remove(1)
+    assert index.matching(1e12) == []
+
+
+def test_matches_a_linear_scan_after_random_updates():
+    rng = random.Random(3)
+    index, thresholds = SubscriptionIndex(), {}
+    for _ in range(2000):
+        chat_id = rng.randrange(50)
+        if rng.random() < 0.3:
+            assert index.remove(chat_id) == (thresholds.pop(chat_id, None) is not None)
+        else:
+            thresholds[chat_id] = rng.choice([1000, 5000, 25_000, rng.uniform(1000, 1e6)])
+            index.set(chat_id, thresholds[chat_id])
+    assert len(index) == len(thresholds)
+    for value in (0, 1000, 4999, 5000, 30_000, 2e6):
+        assert sorted(index.matching(value)) == sorted(c for c, t in thresholds.items() if t <= value)
+
+
+def test_format_alert_tolerates_missing_fields():
+    text = format_alert({"valueUsd": 123456.789})
+    assert "$123,456.79" in text
+    assert "N/A" in text
+
+
+def test_whalesubscribe_rejects_non_finite_thresholds():
+    replies = []
+
+    async def reply_text(text, **kwargs):
+        replies.append(text)
+
+    for arg in ("nan", "inf", "-inf"):
+        update = SimpleNamespace(effective_chat=SimpleNamespace(id=77), message=SimpleNamespace(reply_text=reply_text))
+        asyncio.run(whale_subscribe(update, SimpleNamespace(args=[arg])))
+    assert all(text.startswith("❌") for text in replies)
+    assert whale_pusher.index.get(77) is None